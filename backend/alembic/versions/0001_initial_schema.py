@@ -0,0 +1,119 @@
+"""Initial schema, as Base.metadata.create_all built it before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 14:13:23.201564
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('organizers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_organizers_email'), 'organizers', ['email'], unique=True)
+    op.create_index(op.f('ix_organizers_id'), 'organizers', ['id'], unique=False)
+    op.create_table('participants',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('world_id_hash', sa.String(), nullable=False),
+    sa.Column('wallet_address', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('wallet_address', name='uq_wallet_address'),
+    sa.UniqueConstraint('world_id_hash', name='uq_world_id_hash')
+    )
+    op.create_index(op.f('ix_participants_id'), 'participants', ['id'], unique=False)
+    op.create_index(op.f('ix_participants_wallet_address'), 'participants', ['wallet_address'], unique=True)
+    op.create_index(op.f('ix_participants_world_id_hash'), 'participants', ['world_id_hash'], unique=True)
+    op.create_table('events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organizer_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('start_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('end_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['organizer_id'], ['organizers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_events_id'), 'events', ['id'], unique=False)
+    op.create_table('event_participants',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('participant_id', sa.Integer(), nullable=False),
+    sa.Column('joined_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ),
+    sa.ForeignKeyConstraint(['participant_id'], ['participants.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_id', 'participant_id', name='uq_event_participant')
+    )
+    op.create_index(op.f('ix_event_participants_id'), 'event_participants', ['id'], unique=False)
+    op.create_table('rewards',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('reward_type', sa.Enum('ERC20', 'ERC721', 'ERC1155', name='rewardtype'), nullable=False),
+    sa.Column('token_address', sa.String(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=36, scale=18), nullable=True),
+    sa.Column('token_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rewards_id'), 'rewards', ['id'], unique=False)
+    op.create_table('claims',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('participant_id', sa.Integer(), nullable=False),
+    sa.Column('reward_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'PROCESSING', 'COMPLETED', 'FAILED', name='claimstatus'), nullable=True),
+    sa.Column('transaction_hash', sa.String(), nullable=True),
+    sa.Column('error_message', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ),
+    sa.ForeignKeyConstraint(['participant_id'], ['participants.id'], ),
+    sa.ForeignKeyConstraint(['reward_id'], ['rewards.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_id', 'participant_id', 'reward_id', name='uq_event_participant_reward')
+    )
+    op.create_index(op.f('ix_claims_id'), 'claims', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_claims_id'), table_name='claims')
+    op.drop_table('claims')
+    op.drop_index(op.f('ix_rewards_id'), table_name='rewards')
+    op.drop_table('rewards')
+    op.drop_index(op.f('ix_event_participants_id'), table_name='event_participants')
+    op.drop_table('event_participants')
+    op.drop_index(op.f('ix_events_id'), table_name='events')
+    op.drop_table('events')
+    op.drop_index(op.f('ix_participants_world_id_hash'), table_name='participants')
+    op.drop_index(op.f('ix_participants_wallet_address'), table_name='participants')
+    op.drop_index(op.f('ix_participants_id'), table_name='participants')
+    op.drop_table('participants')
+    op.drop_index(op.f('ix_organizers_id'), table_name='organizers')
+    op.drop_index(op.f('ix_organizers_email'), table_name='organizers')
+    op.drop_table('organizers')
+    sa.Enum(name='claimstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='rewardtype').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,80 @@
+"""Claim sending state, work-queue leases and the reward inventory
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 18:40:12.904118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+CLAIMABLE = sa.text("status IN ('PENDING', 'PROCESSING')")
+
+
+def claim_columns():
+    """Fresh Column objects each call: a Column can only be attached to one table"""
+    return [
+        sa.Column('token_id', sa.Numeric(precision=78, scale=0), nullable=True),
+        sa.Column('sender_address', sa.String(), nullable=True),
+        sa.Column('nonce', sa.Integer(), nullable=True),
+        sa.Column('gas_price', sa.BigInteger(), nullable=True),
+        sa.Column('replaced_transaction_hashes', sa.JSON(), nullable=True),
+        sa.Column('lease_owner', sa.String(), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    # Databases stamped at 0001 were built by create_all, possibly by a release
+    # that already had some of these, so only what is missing is created
+    inspector = sa.inspect(op.get_bind())
+    existing_columns = {column['name'] for column in inspector.get_columns('claims')}
+    claim_indexes = {index['name'] for index in inspector.get_indexes('claims')}
+
+    for column in claim_columns():
+        if column.name not in existing_columns:
+            op.add_column('claims', column)
+    if 'ix_claims_claimable' not in claim_indexes:
+        op.create_index('ix_claims_claimable', 'claims', ['id'], unique=False, postgresql_where=CLAIMABLE)
+    if 'ix_claims_sender_nonce' not in claim_indexes:
+        op.create_index('ix_claims_sender_nonce', 'claims', ['sender_address', 'nonce'], unique=False)
+
+    if not inspector.has_table('reward_inventory'):
+        op.create_table('reward_inventory',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('reward_id', sa.Integer(), nullable=False),
+        sa.Column('token_id', sa.Numeric(precision=78, scale=0), nullable=False),
+        sa.Column('claim_id', sa.Integer(), nullable=True),
+        sa.Column('reserved_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['claim_id'], ['claims.id'], ),
+        sa.ForeignKeyConstraint(['reward_id'], ['rewards.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('claim_id'),
+        sa.UniqueConstraint('reward_id', 'token_id', name='uq_reward_token_id')
+        )
+        inventory_indexes = set()
+    else:
+        inventory_indexes = {index['name'] for index in inspector.get_indexes('reward_inventory')}
+    if 'ix_reward_inventory_available' not in inventory_indexes:
+        op.create_index('ix_reward_inventory_available', 'reward_inventory', ['reward_id', 'id'], unique=False, postgresql_where=sa.text('claim_id IS NULL'))
+    if op.f('ix_reward_inventory_id') not in inventory_indexes:
+        op.create_index(op.f('ix_reward_inventory_id'), 'reward_inventory', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_reward_inventory_id'), table_name='reward_inventory')
+    op.drop_index('ix_reward_inventory_available', table_name='reward_inventory', postgresql_where=sa.text('claim_id IS NULL'))
+    op.drop_table('reward_inventory')
+    op.drop_index('ix_claims_sender_nonce', table_name='claims')
+    op.drop_index('ix_claims_claimable', table_name='claims', postgresql_where=CLAIMABLE)
+    with op.batch_alter_table('claims') as batch_op:
+        for column in reversed(claim_columns()):
+            batch_op.drop_column(column.name)
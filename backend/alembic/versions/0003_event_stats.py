@@ -0,0 +1,58 @@
+"""Event stats
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 14:17:06.421217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('event_stats',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.Integer(), nullable=False),
+    sa.Column('participant_count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('claims_pending', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('claims_processing', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('claims_completed', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('claims_failed', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('tokens_distributed', sa.Numeric(precision=78, scale=18), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'shard')
+    )
+
+    # Backfill existing events into shard 0; from here on the app keeps the counters current
+    op.execute("""
+        INSERT INTO event_stats (
+            event_id, shard, participant_count,
+            claims_pending, claims_processing, claims_completed, claims_failed, tokens_distributed
+        )
+        SELECT
+            e.id,
+            0,
+            (SELECT count(*) FROM event_participants ep WHERE ep.event_id = e.id),
+            (SELECT count(*) FROM claims c WHERE c.event_id = e.id AND c.status = 'PENDING'),
+            (SELECT count(*) FROM claims c WHERE c.event_id = e.id AND c.status = 'PROCESSING'),
+            (SELECT count(*) FROM claims c WHERE c.event_id = e.id AND c.status = 'COMPLETED'),
+            (SELECT count(*) FROM claims c WHERE c.event_id = e.id AND c.status = 'FAILED'),
+            (
+                SELECT coalesce(sum(CASE WHEN r.reward_type = 'ERC20' THEN coalesce(r.amount, 0) ELSE 1 END), 0)
+                FROM claims c JOIN rewards r ON r.id = c.reward_id
+                WHERE c.event_id = e.id AND c.status = 'COMPLETED'
+            )
+        FROM events e
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('event_stats')
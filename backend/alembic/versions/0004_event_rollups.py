@@ -0,0 +1,71 @@
+"""Event rollups
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 14:18:16.234844
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('event_rollups',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(length=8), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('shard', sa.Integer(), nullable=False),
+    sa.Column('joins', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('claims_pending', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('claims_processing', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('claims_completed', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('claims_failed', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('tokens_distributed', sa.Numeric(precision=78, scale=18), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'granularity', 'bucket_start', 'shard')
+    )
+
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # Backfill history from the fact tables once; the app maintains the buckets from here on
+    for granularity in ("minute", "hour"):
+        op.execute(f"""
+            INSERT INTO event_rollups (
+                event_id, granularity, bucket_start, shard,
+                joins, claims_pending, claims_completed, claims_failed, tokens_distributed
+            )
+            SELECT event_id, '{granularity}', bucket, 0,
+                sum(joins), sum(pending), sum(completed), sum(failed), sum(distributed)
+            FROM (
+                SELECT event_id, date_trunc('{granularity}', joined_at) AS bucket,
+                    1 AS joins, 0 AS pending, 0 AS completed, 0 AS failed, 0 AS distributed
+                FROM event_participants WHERE joined_at IS NOT NULL
+                UNION ALL
+                SELECT event_id, date_trunc('{granularity}', created_at), 0, 1, 0, 0, 0
+                FROM claims WHERE created_at IS NOT NULL
+                UNION ALL
+                SELECT c.event_id, date_trunc('{granularity}', coalesce(c.updated_at, c.created_at)), 0, 0,
+                    CASE WHEN c.status = 'COMPLETED' THEN 1 ELSE 0 END,
+                    CASE WHEN c.status = 'FAILED' THEN 1 ELSE 0 END,
+                    CASE
+                        WHEN c.status != 'COMPLETED' THEN 0
+                        WHEN r.reward_type = 'ERC20' THEN coalesce(r.amount, 0)
+                        ELSE 1
+                    END
+                FROM claims c JOIN rewards r ON r.id = c.reward_id
+                WHERE c.status IN ('COMPLETED', 'FAILED') AND coalesce(c.updated_at, c.created_at) IS NOT NULL
+            ) activity
+            GROUP BY event_id, bucket
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table('event_rollups')
@@ -0,0 +1,96 @@
+"""Partition claims by event and add event archival
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 14:41:07.512390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+# Must match CLAIM_PARTITION_SIZE in app/services/archive_service.py
+CLAIM_PARTITION_SIZE = 1000
+CLAIM_PARTITIONS_AHEAD = 10
+
+INVENTORY_CLAIM_FK_SQLITE = 'fk_reward_inventory_claim_id_claims'
+SQLITE_NAMING = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _create_claim_constraints(primary_key) -> None:
+    op.create_primary_key('claims_pkey', 'claims', primary_key)
+    op.create_unique_constraint('uq_event_participant_reward', 'claims', ['event_id', 'participant_id', 'reward_id'])
+    op.create_foreign_key('claims_event_id_fkey', 'claims', 'events', ['event_id'], ['id'])
+    op.create_foreign_key('claims_participant_id_fkey', 'claims', 'participants', ['participant_id'], ['id'])
+    op.create_foreign_key('claims_reward_id_fkey', 'claims', 'rewards', ['reward_id'], ['id'])
+    op.create_index('ix_claims_claimable', 'claims', ['id'], unique=False, postgresql_where=sa.text("status IN ('PENDING', 'PROCESSING')"))
+    op.create_index(op.f('ix_claims_id'), 'claims', ['id'], unique=False)
+    op.create_index('ix_claims_sender_nonce', 'claims', ['sender_address', 'nonce'], unique=False)
+
+
+def _rebuild_claims(partitioned: bool) -> None:
+    """Copy claims into a fresh table (partitioned or not) that takes over its name and sequence"""
+    op.execute("ALTER SEQUENCE claims_id_seq OWNED BY NONE")
+    op.execute(
+        "CREATE TABLE claims_new (LIKE claims INCLUDING DEFAULTS)"
+        + (" PARTITION BY RANGE (event_id)" if partitioned else "")
+    )
+    if partitioned:
+        # Partitions up to CLAIM_PARTITIONS_AHEAD past the newest event; the
+        # archiver keeps creating them as events are added
+        op.execute(f"""
+            DO $$
+            DECLARE
+                bound bigint := 0;
+                newest bigint;
+            BEGIN
+                SELECT coalesce(max(id), 0) INTO newest FROM events;
+                WHILE bound <= newest + {CLAIM_PARTITIONS_AHEAD * CLAIM_PARTITION_SIZE} LOOP
+                    EXECUTE format(
+                        'CREATE TABLE claims_p%s PARTITION OF claims_new FOR VALUES FROM (%s) TO (%s)',
+                        bound, bound, bound + {CLAIM_PARTITION_SIZE}
+                    );
+                    bound := bound + {CLAIM_PARTITION_SIZE};
+                END LOOP;
+            END $$
+        """)
+        op.execute("CREATE TABLE claims_default PARTITION OF claims_new DEFAULT")
+    op.execute("INSERT INTO claims_new SELECT * FROM claims")
+    op.execute("DROP TABLE claims")
+    op.execute("ALTER TABLE claims_new RENAME TO claims")
+    op.execute("ALTER SEQUENCE claims_id_seq OWNED BY claims.id")
+    _create_claim_constraints(['id', 'event_id'] if partitioned else ['id'])
+
+
+def upgrade() -> None:
+    op.add_column('events', sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True))
+
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('reward_inventory', naming_convention=SQLITE_NAMING) as batch_op:
+            batch_op.drop_constraint(INVENTORY_CLAIM_FK_SQLITE, type_='foreignkey')
+        return
+
+    # A foreign key must reference a unique key, and claims.id alone no longer is one
+    op.drop_constraint('reward_inventory_claim_id_fkey', 'reward_inventory', type_='foreignkey')
+    _rebuild_claims(partitioned=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('reward_inventory', naming_convention=SQLITE_NAMING) as batch_op:
+            batch_op.create_foreign_key(INVENTORY_CLAIM_FK_SQLITE, 'claims', ['claim_id'], ['id'])
+    else:
+        _rebuild_claims(partitioned=False)
+        # NOT VALID: inventory of archived events still points at claims that are gone
+        op.execute(
+            "ALTER TABLE reward_inventory ADD CONSTRAINT reward_inventory_claim_id_fkey "
+            "FOREIGN KEY (claim_id) REFERENCES claims (id) NOT VALID"
+        )
+
+    op.drop_column('events', 'archived_at')
@@ -0,0 +1,53 @@
+"""Cascade event deletes in the database
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 14:23:12.553233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+# (table, column, referred table) of every foreign key that now cascades
+CASCADING_FKS = [
+    ('rewards', 'event_id', 'events'),
+    ('event_participants', 'event_id', 'events'),
+    ('claims', 'event_id', 'events'),
+    ('claims', 'reward_id', 'rewards'),
+    ('reward_inventory', 'reward_id', 'rewards'),
+]
+
+# SQLite foreign keys are unnamed; batch mode names them by this convention
+SQLITE_NAMING = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _set_ondelete(ondelete) -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        for table, column, referred in CASCADING_FKS:
+            name = f'fk_{table}_{column}_{referred}'
+            with op.batch_alter_table(table, naming_convention=SQLITE_NAMING) as batch_op:
+                batch_op.drop_constraint(name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+        return
+
+    for table, column, referred in CASCADING_FKS:
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    op.add_column('events', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    _set_ondelete('CASCADE')
+
+
+def downgrade() -> None:
+    _set_ondelete(None)
+    op.drop_column('events', 'deleted_at')
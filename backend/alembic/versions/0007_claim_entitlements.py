@@ -0,0 +1,39 @@
+"""Precomputed claim entitlements
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 16:05:41.218734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# Tables counting claims per status
+COUNTER_TABLES = ('event_stats', 'event_rollups')
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # ADD VALUE may not run inside a transaction block before PostgreSQL 12
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE claimstatus ADD VALUE IF NOT EXISTS 'ENTITLED' BEFORE 'PENDING'")
+
+    op.add_column('events', sa.Column('entitlements_snapshot_at', sa.DateTime(timezone=True), nullable=True))
+    for table in COUNTER_TABLES:
+        op.add_column(table, sa.Column('claims_entitled', sa.BigInteger(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    # Entitlements are derived from the joins; unclaimed ones are simply dropped.
+    # PostgreSQL cannot remove an enum value, so ENTITLED stays in claimstatus unused.
+    op.execute("DELETE FROM claims WHERE status = 'ENTITLED'")
+    for table in COUNTER_TABLES:
+        op.drop_column(table, 'claims_entitled')
+    op.drop_column('events', 'entitlements_snapshot_at')
@@ -0,0 +1,24 @@
+"""Store the signed transaction of a claim before broadcasting it
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 17:12:08.402615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('claims', sa.Column('signed_transaction', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('claims', 'signed_transaction')
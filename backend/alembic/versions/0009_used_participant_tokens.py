@@ -0,0 +1,30 @@
+"""Redeemed participant session tokens
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 17:40:27.915302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('used_participant_tokens',
+    sa.Column('jti', sa.String(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index(op.f('ix_used_participant_tokens_expires_at'), 'used_participant_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_used_participant_tokens_expires_at'), table_name='used_participant_tokens')
+    op.drop_table('used_participant_tokens')
@@ -0,0 +1,29 @@
+"""Index claimable claims per event
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 18:02:51.630148
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+CLAIMABLE = sa.text("status IN ('PENDING', 'PROCESSING')")
+
+
+def upgrade() -> None:
+    # Leasing reads the oldest claimable claims of each event in turn
+    op.drop_index('ix_claims_claimable', table_name='claims', postgresql_where=CLAIMABLE)
+    op.create_index('ix_claims_claimable', 'claims', ['event_id', 'id'], unique=False, postgresql_where=CLAIMABLE)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_claims_claimable', table_name='claims', postgresql_where=CLAIMABLE)
+    op.create_index('ix_claims_claimable', 'claims', ['id'], unique=False, postgresql_where=CLAIMABLE)
@@ -1,23 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import os
+from collections import defaultdict
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from app.config.database import get_db
+from datetime import datetime, timezone
+from typing import List, Optional
+from app.config.database import get_db, get_read_db, stick_to_primary
 from app.models.organizer import Organizer
 from app.models.event import Event
 from app.models.reward import Reward, RewardType
 from app.models.participant import Participant
+from app.models.event_participant import EventParticipant
 from app.models.claim import Claim
-from app.schemas.event import EventCreate, EventUpdate, EventResponse, EventListResponse
-from app.schemas.reward import RewardResponse
+from app.schemas.event import (
+    EventCreate,
+    EventUpdate,
+    EventResponse,
+    EventListResponse,
+    EventStatsResponse,
+    EventTimeseriesResponse
+)
+from app.schemas.reward import RewardResponse, RewardInventoryLoad, RewardInventoryResponse
+from app.services.archive_service import ArchiveService, ARCHIVE_TABLES, gzip_ndjson
+from app.services.entitlement_service import EntitlementService
+from app.services.event_deletion_service import EventDeletionService
+from app.services.inventory_service import InventoryService
+from app.services.stats_service import StatsService, GRANULARITIES
 from app.middleware.auth import get_current_organizer
+from app.workers.claim_worker import wake_local_worker
 from decimal import Decimal
 
 router = APIRouter()
 
+# List endpoints below read plain column tuples and hand them straight to orjson:
+# no ORM object hydration, no lazy relationship loads, no per-row Pydantic validation
+
+
+def _reward_row(reward) -> dict:
+    """RewardResponse-shaped dict from a reward column tuple"""
+    return {
+        "id": reward.id,
+        "event_id": reward.event_id,
+        "reward_type": reward.reward_type,
+        "token_address": reward.token_address,
+        "amount": float(reward.amount) if reward.amount is not None else None,
+        "token_id": reward.token_id,
+        "name": reward.name,
+        "description": reward.description
+    }
+
 
 @router.post("", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
 async def create_event(
     event_data: EventCreate,
+    response: Response,
     current_organizer: Organizer = Depends(get_current_organizer),
     db: Session = Depends(get_db)
 ):
@@ -48,6 +84,7 @@ async def create_event(
     
     db.commit()
     db.refresh(event)
+    stick_to_primary(response)
     
     return event
 
@@ -55,23 +92,60 @@ async def create_event(
 @router.get("", response_model=List[EventResponse])
 async def get_organizer_events(
     current_organizer: Organizer = Depends(get_current_organizer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all events for the current organizer"""
-    events = db.query(Event).filter(Event.organizer_id == current_organizer.id).all()
-    return events
+    events = db.query(
+        Event.id,
+        Event.organizer_id,
+        Event.name,
+        Event.description,
+        Event.start_date,
+        Event.end_date,
+        Event.is_active,
+        Event.archived_at,
+        Event.entitlements_snapshot_at,
+        Event.created_at
+    ).filter(
+        Event.organizer_id == current_organizer.id,
+        Event.deleted_at.is_(None)
+    ).order_by(Event.id).all()
+    
+    # All rewards of all the organizer's events in one query
+    rewards_by_event = defaultdict(list)
+    rewards = db.query(
+        Reward.id,
+        Reward.event_id,
+        Reward.reward_type,
+        Reward.token_address,
+        Reward.amount,
+        Reward.token_id,
+        Reward.name,
+        Reward.description
+    ).join(Event).filter(
+        Event.organizer_id == current_organizer.id,
+        Event.deleted_at.is_(None)
+    ).order_by(Reward.id)
+    for reward in rewards:
+        rewards_by_event[reward.event_id].append(_reward_row(reward))
+    
+    return ORJSONResponse([
+        {**event._asdict(), "rewards": rewards_by_event[event.id]}
+        for event in events
+    ])
 
 
 @router.get("/{event_id}", response_model=EventResponse)
 async def get_event(
     event_id: int,
     current_organizer: Organizer = Depends(get_current_organizer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific event"""
     event = db.query(Event).filter(
         Event.id == event_id,
-        Event.organizer_id == current_organizer.id
+        Event.organizer_id == current_organizer.id,
+        Event.deleted_at.is_(None)
     ).first()
     
     if not event:
@@ -87,13 +161,15 @@ async def get_event(
 async def update_event(
     event_id: int,
     event_data: EventUpdate,
+    response: Response,
     current_organizer: Organizer = Depends(get_current_organizer),
     db: Session = Depends(get_db)
 ):
     """Update an event"""
     event = db.query(Event).filter(
         Event.id == event_id,
-        Event.organizer_id == current_organizer.id
+        Event.organizer_id == current_organizer.id,
+        Event.deleted_at.is_(None)
     ).first()
     
     if not event:
@@ -116,17 +192,20 @@ async def update_event(
     
     db.commit()
     db.refresh(event)
+    stick_to_primary(response)
     
     return event
 
 
-@router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{event_id}", status_code=status.HTTP_202_ACCEPTED)
 async def delete_event(
     event_id: int,
+    background_tasks: BackgroundTasks,
+    response: Response,
     current_organizer: Organizer = Depends(get_current_organizer),
     db: Session = Depends(get_db)
 ):
-    """Delete an event"""
+    """Delete an event; its rows are removed in the background (see /deletion)"""
     event = db.query(Event).filter(
         Event.id == event_id,
         Event.organizer_id == current_organizer.id
@@ -138,17 +217,117 @@ async def delete_event(
             detail="Event not found"
         )
     
-    db.delete(event)
+    EventDeletionService.request_deletion(db, event)
+    background_tasks.add_task(EventDeletionService.delete_event, event_id)
+    stick_to_primary(response)
+    
+    return {"event_id": event_id, "status": "deleting"}
+
+
+@router.get("/{event_id}/deletion")
+async def get_event_deletion(
+    event_id: int,
+    current_organizer: Organizer = Depends(get_current_organizer),
+    db: Session = Depends(get_db)
+):
+    """Get the progress of an event's deletion (404 once it is complete)"""
+    event = db.query(Event.id, Event.deleted_at).filter(
+        Event.id == event_id,
+        Event.organizer_id == current_organizer.id
+    ).first()
+    
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    if event.deleted_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Event deletion was not requested"
+        )
+    
+    return {
+        "event_id": event_id,
+        "status": "deleting",
+        "deleted_at": event.deleted_at,
+        "remaining": EventDeletionService.remaining(db, event_id)
+    }
+
+
+def _owned_live_event(db: Session, event_id: int, organizer: Organizer) -> Event:
+    """The organizer's event; 404 if missing or deleted, 409 once archived"""
+    event = db.query(Event).filter(
+        Event.id == event_id,
+        Event.organizer_id == organizer.id,
+        Event.deleted_at.is_(None)
+    ).first()
+    
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    if event.archived_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Event is archived"
+        )
+    return event
+
+
+@router.post("/{event_id}/entitlements")
+async def snapshot_entitlements(
+    event_id: int,
+    response: Response,
+    current_organizer: Organizer = Depends(get_current_organizer),
+    db: Session = Depends(get_db)
+):
+    """Precompute every joined participant's claims as ENTITLED (re-run to add later joins)"""
+    event = _owned_live_event(db, event_id, current_organizer)
+    created = EntitlementService.snapshot_event(db, event.id)
+    db.refresh(event)
+    stick_to_primary(response)
+    
+    return {
+        "event_id": event_id,
+        "entitlements_created": created,
+        "entitlements_snapshot_at": event.entitlements_snapshot_at
+    }
+
+
+@router.post("/{event_id}/entitlements/dispatch")
+async def dispatch_entitlements(
+    event_id: int,
+    response: Response,
+    current_organizer: Organizer = Depends(get_current_organizer),
+    db: Session = Depends(get_db)
+):
+    """Send every participant's rewards now instead of waiting for them to claim"""
+    event = _owned_live_event(db, event_id, current_organizer)
+    if not event.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Event is inactive"
+        )
+    
+    if event.entitlements_snapshot_at is None:
+        EntitlementService.snapshot_event(db, event.id)
+    queued = EntitlementService.dispatch(db, event.id)
     db.commit()
+    wake_local_worker()
+    stick_to_primary(response)
     
-    return None
+    return {"event_id": event_id, "queued": queued}
 
 
 @router.get("/{event_id}/participants")
 async def get_event_participants(
     event_id: int,
     current_organizer: Organizer = Depends(get_current_organizer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all participants for an event"""
     event = db.query(Event).filter(
@@ -162,23 +341,30 @@ async def get_event_participants(
             detail="Event not found"
         )
     
+    if event.archived_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Event is archived; download its participants from /export?table=participants"
+        )
+    
     participants = [
-        {
-            "id": ep.participant.id,
-            "wallet_address": ep.participant.wallet_address,
-            "joined_at": ep.joined_at
-        }
-        for ep in event.event_participants
+        row._asdict() for row in db.query(
+            Participant.id,
+            Participant.wallet_address,
+            EventParticipant.joined_at
+        ).join(EventParticipant, EventParticipant.participant_id == Participant.id).filter(
+            EventParticipant.event_id == event_id
+        ).order_by(EventParticipant.id)
     ]
     
-    return {"event_id": event_id, "participants": participants, "count": len(participants)}
+    return ORJSONResponse({"event_id": event_id, "participants": participants, "count": len(participants)})
 
 
 @router.get("/{event_id}/claims")
 async def get_event_claims(
     event_id: int,
     current_organizer: Organizer = Depends(get_current_organizer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all claims for an event"""
     event = db.query(Event).filter(
@@ -192,21 +378,232 @@ async def get_event_claims(
             detail="Event not found"
         )
     
-    claims = db.query(Claim).filter(Claim.event_id == event_id).all()
+    if event.archived_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Event is archived; download its claims from /export?table=claims"
+        )
+    
+    claims = [
+        row._asdict() for row in db.query(
+            Claim.id,
+            Claim.participant_id,
+            Participant.wallet_address,
+            Claim.reward_id,
+            Claim.status,
+            Claim.transaction_hash,
+            Claim.created_at
+        ).join(Participant, Participant.id == Claim.participant_id).filter(
+            Claim.event_id == event_id
+        ).order_by(Claim.id)
+    ]
+    
+    return ORJSONResponse({"event_id": event_id, "claims": claims, "count": len(claims)})
+
+
+@router.get("/{event_id}/export")
+async def export_event(
+    event_id: int,
+    table: str = "claims",
+    current_organizer: Organizer = Depends(get_current_organizer),
+    db: Session = Depends(get_read_db)
+):
+    """Download an event's claims or participants as gzip'd NDJSON, archived or not"""
+    event = db.query(Event.id, Event.archived_at).filter(
+        Event.id == event_id,
+        Event.organizer_id == current_organizer.id
+    ).first()
+    
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    if table not in ARCHIVE_TABLES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"table must be one of: {', '.join(ARCHIVE_TABLES)}"
+        )
+    
+    headers = {"Content-Disposition": f'attachment; filename="event_{event_id}_{table}.ndjson.gz"'}
+    if event.archived_at is None:
+        return StreamingResponse(
+            gzip_ndjson(ArchiveService.export_rows(db, event_id, table)),
+            media_type="application/gzip",
+            headers=headers
+        )
+    
+    path = ArchiveService.archive_path(event_id, table)
+    if not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archive file not found"
+        )
+    return FileResponse(path, media_type="application/gzip", headers=headers)
+
+
+@router.get("/{event_id}/stats", response_model=EventStatsResponse)
+async def get_event_stats(
+    event_id: int,
+    current_organizer: Organizer = Depends(get_current_organizer),
+    db: Session = Depends(get_read_db)
+):
+    """Get join and claim counters for an event"""
+    event = db.query(Event.id).filter(
+        Event.id == event_id,
+        Event.organizer_id == current_organizer.id
+    ).first()
+    
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    return StatsService.get_event_stats(db, event_id)
+
+
+# Most buckets returned by one time series request (a week of minutes)
+MAX_TIMESERIES_BUCKETS = 10_080
+
+
+@router.get("/{event_id}/timeseries", response_model=EventTimeseriesResponse)
+async def get_event_timeseries(
+    event_id: int,
+    granularity: str = "minute",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_organizer: Organizer = Depends(get_current_organizer),
+    db: Session = Depends(get_read_db)
+):
+    """Get join and claim activity over time for an event"""
+    event = db.query(Event.id).filter(
+        Event.id == event_id,
+        Event.organizer_id == current_organizer.id
+    ).first()
+    
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"granularity must be one of: {', '.join(GRANULARITIES)}"
+        )
+    
+    # Naive timestamps are taken as UTC; by default show the last 60 buckets
+    if end is None:
+        end = datetime.now(timezone.utc)
+    elif end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start is None:
+        start = end - GRANULARITIES[granularity] * 59
+    elif start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    
+    if start > end or (end - start) / GRANULARITIES[granularity] >= MAX_TIMESERIES_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid range (at most {MAX_TIMESERIES_BUCKETS} buckets per request)"
+        )
     
     return {
         "event_id": event_id,
-        "claims": [
-            {
-                "id": claim.id,
-                "participant_id": claim.participant_id,
-                "wallet_address": claim.participant.wallet_address,
-                "reward_id": claim.reward_id,
-                "status": claim.status,
-                "transaction_hash": claim.transaction_hash,
-                "created_at": claim.created_at
-            }
-            for claim in claims
-        ],
-        "count": len(claims)
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "buckets": StatsService.get_event_timeseries(db, event_id, granularity, start, end)
+    }
+
+
+# Largest token ID range accepted in one inventory load
+MAX_INVENTORY_LOAD = 1_000_000
+
+
+@router.post("/{event_id}/rewards/{reward_id}/inventory", response_model=RewardInventoryResponse)
+async def load_reward_inventory(
+    event_id: int,
+    reward_id: int,
+    inventory_data: RewardInventoryLoad,
+    response: Response,
+    current_organizer: Organizer = Depends(get_current_organizer),
+    db: Session = Depends(get_db)
+):
+    """Stock NFT token IDs that claims of a reward are allocated from"""
+    reward = db.query(Reward).join(Event).filter(
+        Reward.id == reward_id,
+        Reward.event_id == event_id,
+        Event.organizer_id == current_organizer.id
+    ).first()
+    
+    if not reward:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reward not found"
+        )
+    
+    if reward.reward_type == RewardType.ERC20:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Token inventory only applies to NFT rewards"
+        )
+    
+    if inventory_data.token_ids is not None:
+        if len(inventory_data.token_ids) > MAX_INVENTORY_LOAD:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {MAX_INVENTORY_LOAD} token IDs per request"
+            )
+        loaded = InventoryService.load_ids(db, reward.id, inventory_data.token_ids)
+    elif inventory_data.start_token_id is not None and inventory_data.end_token_id is not None:
+        start, end = inventory_data.start_token_id, inventory_data.end_token_id
+        if start < 0 or end < start or end - start + 1 > MAX_INVENTORY_LOAD:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid token ID range (at most {MAX_INVENTORY_LOAD} IDs per request)"
+            )
+        loaded = InventoryService.load_range(db, reward.id, start, end)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide start_token_id and end_token_id, or token_ids"
+        )
+    
+    db.commit()
+    stick_to_primary(response)
+    
+    return {
+        "reward_id": reward.id,
+        "loaded": loaded,
+        "available": InventoryService.available_count(db, reward.id)
+    }
+
+
+@router.get("/{event_id}/rewards/{reward_id}/inventory", response_model=RewardInventoryResponse)
+async def get_reward_inventory(
+    event_id: int,
+    reward_id: int,
+    current_organizer: Organizer = Depends(get_current_organizer),
+    db: Session = Depends(get_read_db)
+):
+    """Get the number of unallocated NFT token IDs for a reward"""
+    reward = db.query(Reward).join(Event).filter(
+        Reward.id == reward_id,
+        Reward.event_id == event_id,
+        Event.organizer_id == current_organizer.id
+    ).first()
+    
+    if not reward:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reward not found"
+        )
+    
+    return {
+        "reward_id": reward.id,
+        "available": InventoryService.available_count(db, reward.id)
     }
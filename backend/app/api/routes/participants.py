@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
-from app.config.database import get_db
+from app.config.database import get_db, get_read_db, stick_to_primary
 from app.middleware.rate_limit import rate_limit
+from app.middleware.auth import (
+    create_participant_token,
+    verify_participant_token,
+    redeem_participant_token,
+    PARTICIPANT_TOKEN_EXPIRE_SECONDS,
+)
 from app.models.event import Event
 from app.models.participant import Participant
 from app.models.event_participant import EventParticipant
@@ -12,16 +21,32 @@ from app.schemas.participant import ParticipantJoinEvent, ParticipantResponse
 from app.schemas.event import EventListResponse
 from app.schemas.claim import ClaimRequest, ClaimResponse
 from app.services.worldid_service import WorldIDService
+from app.services.container import get_worldid_service
 from app.services.wallet_service import WalletService
-from app.services.blockchain_service import BlockchainService
+from app.services.claim_events import claim_event_hub, claim_event
+from app.services.stats_service import StatsService
+from app.services.entitlement_service import EntitlementService
+from app.workers.claim_worker import wake_local_worker
 from app.config.logging import logger
-from decimal import Decimal
 
 router = APIRouter()
 
+# Seconds between keepalive comments on an idle claim status stream
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def _raise_verifier_unavailable(verification_result: dict):
+    """503 for a verifier that is down or behind an open circuit breaker (not the proof's fault)"""
+    logger.warning(f"WorldID verifier unavailable: {verification_result['message']}")
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=verification_result["message"],
+        headers={"Retry-After": str(max(1, round(verification_result.get("retry_after", 1))))}
+    )
+
 
 @router.get("", response_model=List[EventListResponse])
-async def browse_events(db: Session = Depends(get_db)):
+async def browse_events(db: Session = Depends(get_read_db)):
     """Browse all available active events"""
     events = db.query(Event).filter(Event.is_active == True).all()
     
@@ -43,7 +68,7 @@ async def browse_events(db: Session = Depends(get_db)):
 
 
 @router.get("/{event_id}", response_model=EventListResponse)
-async def get_event_details(event_id: int, db: Session = Depends(get_db)):
+async def get_event_details(event_id: int, db: Session = Depends(get_read_db)):
     """Get event details"""
     event = db.query(Event).filter(Event.id == event_id, Event.is_active == True).first()
     
@@ -72,7 +97,9 @@ async def join_event(
     event_id: int,
     join_data: ParticipantJoinEvent,
     request: Request,
+    response: Response,
     db: Session = Depends(get_db),
+    worldid_service: WorldIDService = Depends(get_worldid_service),
     _: int = Depends(rate_limit(max_requests=5, window_seconds=60))
 ):
     """Join an event with WorldID verification"""
@@ -93,12 +120,13 @@ async def join_event(
         )
     
     # Verify WorldID proof
-    worldid_service = WorldIDService()
     verification_result = worldid_service.verify_proof(
         join_data.world_id_proof,
         signal=wallet_address
     )
     
+    if verification_result.get("unavailable"):
+        _raise_verifier_unavailable(verification_result)
     if not verification_result["success"]:
         logger.warning(f"WorldID verification failed for event {event_id}: {verification_result['message']}")
         raise HTTPException(
@@ -146,27 +174,49 @@ async def join_event(
     ).first()
     
     if existing_join:
-        return {
+        result = {
             "message": "Already joined this event",
             "event_id": event_id,
             "participant_id": participant.id
         }
+    else:
+        # Register participant for event
+        event_participant = EventParticipant(
+            event_id=event_id,
+            participant_id=participant.id
+        )
+        db.add(event_participant)
+        StatsService.record_join(db, event_id)
+        if event.entitlements_snapshot_at is not None:
+            # Joined after the snapshot: precompute this participant's claims too
+            db.flush()
+            EntitlementService.snapshot(db, event_id, participant.id)
+        db.commit()
+        
+        logger.info(f"Participant {participant.id} joined event {event_id}")
+        
+        result = {
+            "message": "Successfully joined event",
+            "event_id": event_id,
+            "participant_id": participant.id
+        }
     
-    # Register participant for event
-    event_participant = EventParticipant(
-        event_id=event_id,
-        participant_id=participant.id
-    )
-    db.add(event_participant)
-    db.commit()
-    
-    logger.info(f"Participant {participant.id} joined event {event_id}")
+    if join_data.issue_session_token:
+        result["session_token"] = create_participant_token(world_id_hash, wallet_address, event_id)
+        result["session_token_expires_in"] = PARTICIPANT_TOKEN_EXPIRE_SECONDS
     
-    return {
-        "message": "Successfully joined event",
-        "event_id": event_id,
-        "participant_id": participant.id
-    }
+    stick_to_primary(response)
+    return result
+
+
+def _redeem_session_token(db: Session, session: dict) -> None:
+    """Use up the session token of an accepted claim, in the claim's transaction"""
+    if not redeem_participant_token(db, session):
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session token was already used"
+        )
 
 
 @router.post("/{event_id}/claim", response_model=List[ClaimResponse])
@@ -174,7 +224,9 @@ async def claim_rewards(
     event_id: int,
     claim_data: ClaimRequest,
     request: Request,
+    response: Response,
     db: Session = Depends(get_db),
+    worldid_service: WorldIDService = Depends(get_worldid_service),
     _: int = Depends(rate_limit(max_requests=3, window_seconds=60))
 ):
     """Claim rewards from an event"""
@@ -186,28 +238,64 @@ async def claim_rewards(
             detail="Event not found or inactive"
         )
     
-    # Verify WorldID proof
-    worldid_service = WorldIDService()
-    verification_result = worldid_service.verify_proof(claim_data.world_id_proof)
-    
-    if not verification_result["success"]:
-        logger.warning(f"WorldID verification failed for claim on event {event_id}: {verification_result['message']}")
+    if claim_data.session_token:
+        # Participant verified with WorldID on join; check the token locally instead
+        session = verify_participant_token(claim_data.session_token, event_id)
+        if not session:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired session token"
+            )
+        world_id_hash = session["world_id_hash"]
+    elif claim_data.world_id_proof:
+        # Verify WorldID proof
+        verification_result = worldid_service.verify_proof(claim_data.world_id_proof)
+        
+        if verification_result.get("unavailable"):
+            _raise_verifier_unavailable(verification_result)
+        if not verification_result["success"]:
+            logger.warning(f"WorldID verification failed for claim on event {event_id}: {verification_result['message']}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"WorldID verification failed: {verification_result['message']}"
+            )
+        
+        logger.info(f"WorldID verification successful for claim on event {event_id}")
+        
+        # Get nullifier hash
+        nullifier_hash = worldid_service.get_nullifier_hash(claim_data.world_id_proof)
+        if not nullifier_hash:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid WorldID proof: missing nullifier hash"
+            )
+        
+        world_id_hash = worldid_service.hash_world_id(nullifier_hash)
+    else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"WorldID verification failed: {verification_result['message']}"
+            detail="Either world_id_proof or session_token is required"
         )
     
-    logger.info(f"WorldID verification successful for claim on event {event_id}")
-    
-    # Get nullifier hash and find participant
-    nullifier_hash = worldid_service.get_nullifier_hash(claim_data.world_id_proof)
-    if not nullifier_hash:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid WorldID proof: missing nullifier hash"
+    if event.entitlements_snapshot_at is not None:
+        # Precomputed entitlements: one UPDATE queues the claims; anything else takes the full checks below
+        entitled_claims = EntitlementService.claim(
+            db,
+            event_id,
+            world_id_hash,
+            wallet_address=session["wallet_address"] if claim_data.session_token else None
         )
+        if entitled_claims:
+            if claim_data.session_token:
+                _redeem_session_token(db, session)
+            claim_event_hub.publish(db, [claim_event(claim) for claim in entitled_claims])
+            db.commit()
+            wake_local_worker()
+            stick_to_primary(response)
+            logger.info(f"Queued {len(entitled_claims)} entitled reward claims on event {event_id}")
+            return entitled_claims
     
-    world_id_hash = worldid_service.hash_world_id(nullifier_hash)
+    # Find participant
     participant = db.query(Participant).filter(
         Participant.world_id_hash == world_id_hash
     ).first()
@@ -218,6 +306,12 @@ async def claim_rewards(
             detail="Participant not found. Please join the event first."
         )
     
+    if claim_data.session_token and participant.wallet_address.lower() != session["wallet_address"].lower():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session token does not match the participant's wallet"
+        )
+    
     # Check if participant joined the event
     event_participant = db.query(EventParticipant).filter(
         EventParticipant.event_id == event_id,
@@ -254,9 +348,10 @@ async def claim_rewards(
                 detail="Rewards for this event have already been claimed"
             )
     
-    # Create claims and process blockchain transactions
-    blockchain_service = BlockchainService()
+    # Create pending claims; the claim workers pick them up and send the rewards
     created_claims = []
+    queued_claims = []
+    transitions = []
     
     for reward in rewards:
         # Check if claim already exists for this reward
@@ -267,6 +362,13 @@ async def claim_rewards(
         ).first()
         
         if existing_claim:
+            if existing_claim.status in (ClaimStatus.FAILED, ClaimStatus.ENTITLED):
+                # Re-queue a failed claim for another attempt, or queue a precomputed one
+                transitions.append((event_id, existing_claim.status, ClaimStatus.PENDING, None))
+                existing_claim.status = ClaimStatus.PENDING
+                existing_claim.error_message = None
+                existing_claim.attempts = 0
+                queued_claims.append(existing_claim)
             created_claims.append(existing_claim)
             continue
         
@@ -278,62 +380,89 @@ async def claim_rewards(
             status=ClaimStatus.PENDING
         )
         db.add(claim)
-        db.flush()
-        
-        # Process blockchain transaction
-        try:
-            claim.status = ClaimStatus.PROCESSING
-            db.commit()
-            
-            if reward.reward_type == RewardType.ERC20:
-                # Convert amount to wei (assuming 18 decimals)
-                amount_wei = int(Decimal(str(reward.amount)) * Decimal(10**18))
-                result = blockchain_service.send_erc20_token(
-                    reward.token_address,
-                    participant.wallet_address,
-                    amount_wei
-                )
-            elif reward.reward_type == RewardType.ERC721:
-                result = blockchain_service.send_erc721_nft(
-                    reward.token_address,
-                    participant.wallet_address,
-                    reward.token_id
-                )
-            elif reward.reward_type == RewardType.ERC1155:
-                result = blockchain_service.send_erc1155_nft(
-                    reward.token_address,
-                    participant.wallet_address,
-                    reward.token_id
-                )
-            else:
-                result = {"success": False, "error": "Unknown reward type"}
-            
-            if result.get("success"):
-                claim.status = ClaimStatus.COMPLETED
-                claim.transaction_hash = result.get("transaction_hash")
-                logger.info(f"Reward claim {claim.id} completed: {result.get('transaction_hash')}")
-            else:
-                claim.status = ClaimStatus.FAILED
-                claim.error_message = result.get("error", "Unknown error")
-                logger.error(f"Reward claim {claim.id} failed: {result.get('error')}")
-            
-            db.commit()
-            created_claims.append(claim)
-            
-        except Exception as e:
-            claim.status = ClaimStatus.FAILED
-            claim.error_message = str(e)
-            logger.error(f"Exception processing claim {claim.id}: {str(e)}")
-            db.commit()
-            created_claims.append(claim)
+        created_claims.append(claim)
+        queued_claims.append(claim)
+        transitions.append((event_id, None, ClaimStatus.PENDING, None))
+    
+    db.flush()
+    if claim_data.session_token:
+        _redeem_session_token(db, session)
+    claim_event_hub.publish(db, [claim_event(claim) for claim in queued_claims])
+    StatsService.record_claim_transitions(db, transitions)
+    db.commit()
+    for claim in created_claims:
+        db.refresh(claim)
+    wake_local_worker()
+    stick_to_primary(response)
+    
+    logger.info(f"Queued {len(created_claims)} reward claims for participant {participant.id} on event {event_id}")
     
     return created_claims
 
 
+@router.get("/{event_id}/claims/stream")
+async def stream_claim_status(
+    event_id: int,
+    wallet_address: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Stream claim status changes for a participant as server-sent events"""
+    wallet_address = WalletService.to_checksum_address(wallet_address)
+    if not wallet_address:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid wallet address"
+        )
+    
+    participant = db.query(Participant).filter(
+        Participant.wallet_address == wallet_address
+    ).first()
+    
+    if not participant:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Participant not found"
+        )
+    
+    participant_id = participant.id
+    # Subscribe before reading the current state so no transition falls in between
+    queue = claim_event_hub.subscribe(event_id, participant_id)
+    current = [
+        claim_event(claim) for claim in db.query(Claim).filter(
+            Claim.event_id == event_id,
+            Claim.participant_id == participant_id
+        ).order_by(Claim.id)
+    ]
+    # Don't hold a pooled connection for the lifetime of the stream
+    db.close()
+    
+    async def events():
+        try:
+            for payload in current:
+                yield f"event: claim\ndata: {json.dumps(payload)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line: keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: claim\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            claim_event_hub.unsubscribe(event_id, participant_id, queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/profile/{wallet_address}", response_model=ParticipantResponse)
 async def get_participant_profile(
     wallet_address: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get participant profile by wallet address"""
     wallet_address = WalletService.to_checksum_address(wallet_address)
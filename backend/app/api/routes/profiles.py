@@ -0,0 +1,51 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from app.config.profiling import profile_store
+from app.middleware.profiling import valid_profiling_token
+
+router = APIRouter()
+
+PROFILE_FORMATS = ("speedscope", "collapsed")
+
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(None)):
+    """Only callers holding the PROFILING_TOKEN may read profiles"""
+    if not valid_profiling_token(x_profile_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="A valid X-Profile-Token header is required"
+        )
+
+
+@router.get("", dependencies=[Depends(require_profiling_token)])
+async def list_profiles():
+    """Latest request profiles, newest first"""
+    return ORJSONResponse({"profiles": [profile.summary() for profile in profile_store.list()]})
+
+
+@router.get("/{profile_id}", dependencies=[Depends(require_profiling_token)])
+async def get_profile(profile_id: str, format: str = "speedscope"):
+    """Download a profile as a speedscope file or as folded stacks for flamegraph.pl"""
+    if format not in PROFILE_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"format must be one of: {', '.join(PROFILE_FORMATS)}"
+        )
+
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found (it may have been dropped from the buffer)"
+        )
+
+    if format == "collapsed":
+        return PlainTextResponse(
+            profile.to_collapsed(),
+            headers={"Content-Disposition": f'attachment; filename="profile_{profile_id}.folded"'}
+        )
+    return ORJSONResponse(
+        profile.to_speedscope(),
+        headers={"Content-Disposition": f'attachment; filename="profile_{profile_id}.speedscope.json"'}
+    )
@@ -0,0 +1,47 @@
+from pydantic_settings import BaseSettings
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class BlockchainSettings(BaseSettings):
+    ETHEREUM_RPC_URL: str = os.getenv("ETHEREUM_RPC_URL", "https://eth-mainnet.g.alchemy.com/v2/demo")
+    ETHEREUM_RPC_TIMEOUT_SECONDS: float = float(os.getenv("ETHEREUM_RPC_TIMEOUT_SECONDS", "10"))
+    # RPC calls slower than this count against the circuit breaker
+    ETHEREUM_RPC_SLOW_CALL_SECONDS: float = float(os.getenv("ETHEREUM_RPC_SLOW_CALL_SECONDS", "5"))
+    # Comma-separated RPC providers routed by latency; defaults to ETHEREUM_RPC_URL alone
+    ETHEREUM_RPC_URLS: str = os.getenv("ETHEREUM_RPC_URLS", "")
+    # Reads still unanswered after the endpoint's p95 (clamped to these bounds) go to a second endpoint
+    RPC_HEDGE_MIN_DELAY_MS: int = int(os.getenv("RPC_HEDGE_MIN_DELAY_MS", "50"))
+    RPC_HEDGE_MAX_DELAY_MS: int = int(os.getenv("RPC_HEDGE_MAX_DELAY_MS", "1000"))
+    RPC_ENDPOINT_FAILURE_THRESHOLD: int = int(os.getenv("RPC_ENDPOINT_FAILURE_THRESHOLD", "3"))
+    RPC_ENDPOINT_COOLDOWN_SECONDS: int = int(os.getenv("RPC_ENDPOINT_COOLDOWN_SECONDS", "15"))
+    PRIVATE_KEY: str = os.getenv("PRIVATE_KEY", "")
+    # Comma-separated hot wallet keys; each key gets its own nonce lane
+    PRIVATE_KEYS: str = os.getenv("PRIVATE_KEYS", "")
+    # "least_loaded" or "hash" (stable lane per affinity key)
+    SIGNER_STRATEGY: str = os.getenv("SIGNER_STRATEGY", "least_loaded")
+    SIGNER_MIN_BALANCE_WEI: int = int(os.getenv("SIGNER_MIN_BALANCE_WEI", str(10**15)))
+    SIGNER_BALANCE_CHECK_SECONDS: int = int(os.getenv("SIGNER_BALANCE_CHECK_SECONDS", "60"))
+    SIGNER_FAILURE_THRESHOLD: int = int(os.getenv("SIGNER_FAILURE_THRESHOLD", "3"))
+    SIGNER_COOLDOWN_SECONDS: int = int(os.getenv("SIGNER_COOLDOWN_SECONDS", "30"))
+    # Signing/broadcast pipeline
+    TX_SIGNING_WORKERS: int = int(os.getenv("TX_SIGNING_WORKERS", "4"))
+    # "thread" or "process"
+    TX_SIGNING_POOL: str = os.getenv("TX_SIGNING_POOL", "thread")
+    TX_PIPELINE_QUEUE_SIZE: int = int(os.getenv("TX_PIPELINE_QUEUE_SIZE", "256"))
+    TX_BROADCAST_BATCH_SIZE: int = int(os.getenv("TX_BROADCAST_BATCH_SIZE", "50"))
+    TX_BROADCAST_BATCH_WAIT_MS: int = int(os.getenv("TX_BROADCAST_BATCH_WAIT_MS", "20"))
+    # Stuck transaction watchdog
+    TX_WATCHDOG_ENABLED: bool = os.getenv("TX_WATCHDOG_ENABLED", "true").lower() == "true"
+    TX_WATCHDOG_INTERVAL_SECONDS: int = int(os.getenv("TX_WATCHDOG_INTERVAL_SECONDS", "15"))
+    TX_STUCK_AFTER_SECONDS: int = int(os.getenv("TX_STUCK_AFTER_SECONDS", "90"))
+    # Nodes reject replacements below +10%
+    TX_FEE_BUMP_PERCENT: int = int(os.getenv("TX_FEE_BUMP_PERCENT", "15"))
+    TX_MAX_GAS_PRICE_WEI: int = int(os.getenv("TX_MAX_GAS_PRICE_WEI", str(500 * 10**9)))
+    TX_MAX_REPLACEMENTS: int = int(os.getenv("TX_MAX_REPLACEMENTS", "5"))
+
+    class Config:
+        env_file = ".env"
+
+blockchain_settings = BlockchainSettings()
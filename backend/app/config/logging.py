@@ -1,37 +1,160 @@
+import atexit
+import json
 import logging
+import os
+import queue
+import random
 import sys
-from logging.handlers import RotatingFileHandler
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List
+from pydantic_settings import BaseSettings
+from dotenv import load_dotenv
+from app.config.tracing import TraceContextFilter
+
+load_dotenv()
+
+
+class LoggingSettings(BaseSettings):
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # "json" for structured output, "text" for the human-readable format
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    # Empty string disables the file handler
+    LOG_FILE: str = os.getenv("LOG_FILE", "worldid_rewards.log")
+    # Per-logger levels, e.g. "worldid_rewards=DEBUG,sqlalchemy.engine=INFO"
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "")
+    # Per-logger sampling rates for records below WARNING, e.g. "sqlalchemy.engine=0.01"
+    LOG_SAMPLING: str = os.getenv("LOG_SAMPLING", "")
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+    class Config:
+        env_file = ".env"
+
+
+logging_settings = LoggingSettings()
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [trace_id=%(trace_id)s span_id=%(span_id)s] - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def parse_logger_map(value: str) -> Dict[str, str]:
+    """Parse a "logger=value,logger=value" setting"""
+    result = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        name, setting = item.split("=", 1)
+        result[name.strip()] = setting.strip()
+    return result
+
+
+class JSONFormatter(logging.Formatter):
+    """Render log records as single-line JSON objects"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "trace_id": getattr(record, "trace_id", "-"),
+            "span_id": getattr(record, "span_id", "-"),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Drop a fraction of sub-WARNING records per logger (longest prefix wins)"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Longest prefixes first so "sqlalchemy.engine" beats "sqlalchemy"
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                return random.random() < rate
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the caller; records are dropped when the queue is full"""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue is in-process, so skip the default full format on the
+        # request thread and only merge the message arguments
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
 
 def setup_logging():
     """Configure logging for the application"""
-    
+
     # Create logger
     logger = logging.getLogger("worldid_rewards")
-    logger.setLevel(logging.INFO)
-    
+    logger.setLevel(logging_settings.LOG_LEVEL.upper())
+
     # Create formatters
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    # Console handler
+    if logging_settings.LOG_FORMAT == "json":
+        formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    # I/O handlers, driven by the listener thread
+    handlers: List[logging.Handler] = []
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    
-    # File handler (optional)
-    file_handler = RotatingFileHandler(
-        'worldid_rewards.log',
-        maxBytes=10 * 1024 * 1024,  # 10MB
-        backupCount=5
-    )
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(formatter)
-    
-    # Add handlers
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    
+    handlers.append(console_handler)
+
+    if logging_settings.LOG_FILE:
+        file_handler = RotatingFileHandler(
+            logging_settings.LOG_FILE,
+            maxBytes=10 * 1024 * 1024,  # 10MB
+            backupCount=5
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    # Hot-path handler: filters run in the calling thread (trace ids are
+    # context-local), everything else happens on the listener thread
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=logging_settings.LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter({
+        name: float(rate)
+        for name, rate in parse_logger_map(logging_settings.LOG_SAMPLING).items()
+    }))
+    queue_handler.addFilter(TraceContextFilter())
+
+    root = logging.getLogger()
+    root.addHandler(queue_handler)
+
+    # Per-logger levels
+    for name, level in parse_logger_map(logging_settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
     return logger
 
 # Initialize logger
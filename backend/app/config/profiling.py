@@ -0,0 +1,378 @@
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from pydantic_settings import BaseSettings
+from dotenv import load_dotenv
+from app.config.metrics import metrics
+
+load_dotenv()
+
+
+class ProfilingSettings(BaseSettings):
+    # Off by default: when disabled neither the middleware nor the hooks are installed
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    # Shared secret: sent as X-Profile-Token it profiles that request and unlocks /api/admin/profiles
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+    # Fraction of all requests profiled without being asked (0.001 = one in a thousand)
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+    # Profiles kept in memory; the oldest is dropped when a new one is stored
+    PROFILING_BUFFER_SIZE: int = int(os.getenv("PROFILING_BUFFER_SIZE", "50"))
+    # Bounds one profile (e.g. of a claim status stream that stays open)
+    PROFILING_MAX_SAMPLES: int = int(os.getenv("PROFILING_MAX_SAMPLES", "20000"))
+    PROFILING_MAX_WAITS: int = int(os.getenv("PROFILING_MAX_WAITS", "5000"))
+
+    class Config:
+        env_file = ".env"
+
+
+profiling_settings = ProfilingSettings()
+
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+_active_profile: ContextVar[Optional["Profile"]] = ContextVar("active_profile", default=None)
+
+profiles_counter = metrics.counter("profiles_recorded_total", "Requests profiled", ["trigger"])
+
+# Frame key: (function, file, first line)
+FrameKey = Tuple[str, str, int]
+
+
+def _short_path(filename: str) -> str:
+    """Path relative to site-packages or the working directory, for readable frame names"""
+    _, marker, rest = filename.rpartition("site-packages" + os.sep)
+    if marker:
+        return rest
+    cwd = os.getcwd() + os.sep
+    return filename[len(cwd):] if filename.startswith(cwd) else filename
+
+
+class Profile:
+    """
+    Stack samples and I/O waits of one request
+
+    The sampler records the request's stack on the event loop thread (only
+    while this request is the one running there, found by its middleware
+    frame) and on any worker thread while it waits on I/O for the request.
+    Waits are the database statements, HTTP calls and JSON-RPC calls made
+    for the request, each with its start and duration.
+    """
+
+    def __init__(self, method: str, path: str, trigger: str, anchor, max_samples: int, max_waits: int):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.trigger = trigger
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.max_samples = max_samples
+        self.max_waits = max_waits
+        # The middleware frame of this request: samples of the loop thread count only below it
+        self._anchor = anchor
+        self.loop_thread = threading.get_ident()
+        self._threads: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._last_sample = self.started
+        self.frames: List[FrameKey] = []
+        self._frame_index: Dict[FrameKey, int] = {}
+        # (stack of frame indices root first, weight in seconds)
+        self.samples: List[Tuple[Tuple[int, ...], float]] = []
+        # (kind, label, start offset, duration) in seconds
+        self.waits: List[Tuple[str, str, float, float]] = []
+
+    def enter_thread(self) -> Optional[int]:
+        """Have the sampler follow the current thread (if not the loop thread) until leave_thread"""
+        ident = threading.get_ident()
+        if ident == self.loop_thread:
+            return None
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+        return ident
+
+    def leave_thread(self, ident: Optional[int]) -> None:
+        if ident is None:
+            return
+        with self._lock:
+            count = self._threads.get(ident, 0) - 1
+            if count > 0:
+                self._threads[ident] = count
+            else:
+                self._threads.pop(ident, None)
+
+    def add_wait(self, kind: str, label: str, started: float, finished: float) -> None:
+        if len(self.waits) < self.max_waits:
+            self.waits.append((kind, label, started - self.started, finished - started))
+
+    def _frame_id(self, code) -> int:
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self.frames)
+            self.frames.append(key)
+        return index
+
+    def sample(self, frames: Dict[int, object], now: float) -> None:
+        """Record the request's stacks from a sys._current_frames() snapshot"""
+        if self.duration is not None or len(self.samples) >= self.max_samples:
+            return
+        weight, self._last_sample = now - self._last_sample, now
+        with self._lock:
+            threads = [self.loop_thread] + list(self._threads)
+        for ident in threads:
+            frame = frames.get(ident)
+            stack = []
+            while frame is not None and frame is not self._anchor:
+                stack.append(self._frame_id(frame.f_code))
+                frame = frame.f_back
+            if ident == self.loop_thread and frame is None:
+                # Another request (or the idle loop) is running on the loop thread
+                continue
+            if stack:
+                stack.reverse()
+                self.samples.append((tuple(stack), weight))
+
+    def finish(self, status: Optional[int]) -> None:
+        self.status = status
+        self.duration = time.perf_counter() - self.started
+        self._anchor = None
+
+    def wait_totals(self) -> Dict[str, Dict]:
+        totals: Dict[str, Dict] = {}
+        for kind, _, _, duration in self.waits:
+            entry = totals.setdefault(kind, {"count": 0, "ms": 0.0})
+            entry["count"] += 1
+            entry["ms"] += duration * 1000
+        for entry in totals.values():
+            entry["ms"] = round(entry["ms"], 3)
+        return totals
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "trigger": self.trigger,
+            "started_at": self.started_at,
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "samples": len(self.samples),
+            "waits": self.wait_totals(),
+        }
+
+    def _frame_name(self, key: FrameKey) -> str:
+        name, filename, line = key
+        return f"{name} ({_short_path(filename)}:{line})"
+
+    def to_speedscope(self) -> Dict:
+        """The profile in speedscope's file format: stack samples, then the waits as a timeline"""
+        title = f"{self.method} {self.route or self.path}"
+        frames = [
+            {"name": name, "file": _short_path(filename), "line": line} for name, filename, line in self.frames
+        ]
+        end = round((self.duration or 0.0) * 1000, 3)
+
+        events = []
+        cursor = 0.0
+        for kind, label, start, duration in sorted(self.waits, key=lambda wait: wait[2]):
+            # The timeline must nest: clip a wait overlapping the one before
+            opened = max(start * 1000, cursor)
+            closed = max(opened, (start + duration) * 1000)
+            frames.append({"name": f"{kind}: {label}"})
+            events.append({"type": "O", "frame": len(frames) - 1, "at": round(opened, 3)})
+            events.append({"type": "C", "frame": len(frames) - 1, "at": round(closed, 3)})
+            cursor = closed
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{title} ({self.id})",
+            "exporter": "worldid-rewards",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": f"{title}: stack samples",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": end,
+                    "samples": [list(stack) for stack, _ in self.samples],
+                    "weights": [round(weight * 1000, 3) for _, weight in self.samples],
+                },
+                {
+                    "type": "evented",
+                    "name": f"{title}: database, HTTP and RPC waits",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": max(end, cursor),
+                    "events": events,
+                },
+            ],
+        }
+
+    def to_collapsed(self) -> str:
+        """Folded stacks (one "frame;frame;frame count" line per stack), as read by flamegraph.pl"""
+        counts: Dict[Tuple[int, ...], int] = {}
+        for stack, _ in self.samples:
+            counts[stack] = counts.get(stack, 0) + 1
+        names = [self._frame_name(key).replace(";", ":") for key in self.frames]
+        return "".join(f"{';'.join(names[i] for i in stack)} {count}\n" for stack, count in counts.items())
+
+
+class StackSampler:
+    """Background thread sampling the stacks of the requests being profiled"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active: List[Profile] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._active.append(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+            self._wake.set()
+
+    def remove(self, profile: Profile) -> None:
+        with self._lock:
+            if profile in self._active:
+                self._active.remove(profile)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                profiles = list(self._active)
+                if not profiles:
+                    self._wake.clear()
+            if not profiles:
+                # Idle until the next profiled request
+                self._wake.wait()
+                continue
+            frames = sys._current_frames()
+            now = time.perf_counter()
+            for profile in profiles:
+                try:
+                    profile.sample(frames, now)
+                except Exception:
+                    # Profiling must never take the application down
+                    pass
+            del frames
+            time.sleep(self.interval)
+
+
+class ProfileStore:
+    """Ring buffer of the latest finished profiles"""
+
+    def __init__(self, size: int):
+        self._profiles: Deque[Profile] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[Profile]:
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        with self._lock:
+            for profile in self._profiles:
+                if profile.id == profile_id:
+                    return profile
+        return None
+
+
+stack_sampler = StackSampler(profiling_settings.PROFILING_INTERVAL_MS / 1000)
+profile_store = ProfileStore(profiling_settings.PROFILING_BUFFER_SIZE)
+
+
+@contextmanager
+def profile_request(method: str, path: str, trigger: str, anchor) -> Iterator[Profile]:
+    """Profile the code run in this context until it exits, then store the profile"""
+    profile = Profile(
+        method,
+        path,
+        trigger,
+        anchor,
+        profiling_settings.PROFILING_MAX_SAMPLES,
+        profiling_settings.PROFILING_MAX_WAITS
+    )
+    token = _active_profile.set(profile)
+    stack_sampler.add(profile)
+    try:
+        yield profile
+    finally:
+        stack_sampler.remove(profile)
+        _active_profile.reset(token)
+        if profile.duration is None:
+            profile.finish(profile.status)
+        profile_store.add(profile)
+        profiles_counter.inc(trigger=trigger)
+
+
+@contextmanager
+def record_wait(kind: str, label: str) -> Iterator[None]:
+    """Time an I/O wait (kind "http", "rpc", ...) into the profile of the current request, if any"""
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+    ident = profile.enter_thread()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_wait(kind, label, started, time.perf_counter())
+        profile.leave_thread(ident)
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def instrument_engine_waits(engine) -> None:
+    """Time every SQL statement into the profile of the request running it (only when profiling is enabled)"""
+    if not profiling_settings.PROFILING_ENABLED:
+        return
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _active_profile.get()
+        if profile is not None:
+            conn.info.setdefault("profile_waits", []).append(
+                (profile, profile.enter_thread(), time.perf_counter())
+            )
+
+    def _finish(conn, statement: str) -> None:
+        waits = conn.info.get("profile_waits")
+        if not waits:
+            return
+        profile, ident, started = waits.pop()
+        profile.add_wait("db", _WHITESPACE_RE.sub(" ", statement)[:200], started, time.perf_counter())
+        profile.leave_thread(ident)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _finish(conn, statement)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        if exception_context.connection is not None:
+            _finish(exception_context.connection, exception_context.statement or "")
@@ -0,0 +1,290 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+import requests
+from pydantic_settings import BaseSettings
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class TracingSettings(BaseSettings):
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    TRACING_SERVICE_NAME: str = os.getenv("TRACING_SERVICE_NAME", "worldid-rewards-api")
+    # "json" writes OTLP/JSON lines to a local file, "otlp" posts to an OTLP/HTTP collector
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "json")
+    TRACING_EXPORT_PATH: str = os.getenv("TRACING_EXPORT_PATH", "traces.jsonl")
+    TRACING_OTLP_ENDPOINT: str = os.getenv(
+        "TRACING_OTLP_ENDPOINT",
+        "http://localhost:4318/v1/traces"
+    )
+    TRACING_BATCH_SIZE: int = int(os.getenv("TRACING_BATCH_SIZE", "256"))
+    TRACING_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("TRACING_FLUSH_INTERVAL_SECONDS", "2"))
+
+    class Config:
+        env_file = ".env"
+
+
+tracing_settings = TracingSettings()
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+
+class Span:
+    """A single timed operation within a trace"""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_span_id", "kind",
+        "attributes", "start_time_ns", "end_time_ns", "error",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict] = None
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes: Dict = dict(attributes or {})
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_time_ns or time.time_ns()
+        return (end - self.start_time_ns) / 1e6
+
+    def to_otlp(self) -> Dict:
+        """Convert the span to its OTLP/JSON representation"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns or time.time_ns()),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+def _otlp_attribute(key: str, value) -> Dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class SpanExporter:
+    """Batches finished spans on a background thread and writes them out as OTLP/JSON"""
+
+    def __init__(self, settings: TracingSettings):
+        self.settings = settings
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=settings.TRACING_BATCH_SIZE * 64)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def export(self, span: Span) -> None:
+        """Hand a finished span to the export thread without blocking the caller"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="span-exporter", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.settings.TRACING_FLUSH_INTERVAL_SECONDS
+            while len(batch) < self.settings.TRACING_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception:
+                    # Tracing must never take the application down
+                    pass
+
+    def _payload(self, batch: List[Span]) -> Dict:
+        return {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [_otlp_attribute("service.name", self.settings.TRACING_SERVICE_NAME)]
+                },
+                "scopeSpans": [{
+                    "scope": {"name": "worldid_rewards"},
+                    "spans": [span.to_otlp() for span in batch],
+                }],
+            }]
+        }
+
+    def _write(self, batch: List[Span]) -> None:
+        payload = self._payload(batch)
+        if self.settings.TRACING_EXPORTER == "otlp":
+            requests.post(self.settings.TRACING_OTLP_ENDPOINT, json=payload, timeout=5)
+        else:
+            # One OTLP/JSON export request per line, as written by the collector file exporter
+            with open(self.settings.TRACING_EXPORT_PATH, "a") as f:
+                f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+
+
+class Tracer:
+    """Minimal tracer propagating the active span through a context variable"""
+
+    def __init__(self, settings: TracingSettings):
+        self.enabled = settings.TRACING_ENABLED
+        self.exporter = SpanExporter(settings)
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        trace_id: Optional[str] = None,
+        parent_span_id: Optional[str] = None
+    ) -> Iterator[Optional[Span]]:
+        """
+        Open a span as a child of the current span (or a new root)
+
+        Args:
+            name: Span name
+            attributes: Initial span attributes
+            kind: OTLP span kind
+            trace_id: Explicit trace id, e.g. from an incoming traceparent header
+            parent_span_id: Explicit remote parent span id
+
+        Yields:
+            The active span, or None when tracing is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        parent = _current_span.get()
+        if trace_id is None:
+            if parent is not None:
+                trace_id = parent.trace_id
+                parent_span_id = parent.span_id
+            else:
+                trace_id = os.urandom(16).hex()
+
+        span = Span(name, trace_id, parent_span_id, kind, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    def end_span(self, span: Span) -> None:
+        span.end_time_ns = time.time_ns()
+        self.exporter.export(span)
+
+    def begin_span(self, name: str, attributes: Optional[Dict] = None, kind: int = SPAN_KIND_INTERNAL) -> Optional[Span]:
+        """Open a child span without activating it, for callback-style instrumentation"""
+        parent = _current_span.get()
+        if not self.enabled or parent is None:
+            return None
+        return Span(name, parent.trace_id, parent.span_id, kind, attributes)
+
+
+def current_span() -> Optional[Span]:
+    """Return the span active in the current context"""
+    return _current_span.get()
+
+
+class TraceContextFilter(logging.Filter):
+    """Attach the active trace and span ids to every log record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = _current_span.get()
+        record.trace_id = span.trace_id if span else "-"
+        record.span_id = span.span_id if span else "-"
+        return True
+
+
+def instrument_engine(engine) -> None:
+    """Emit a child span for every SQL statement executed on the engine"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.begin_span(
+            "db.query",
+            {"db.system": engine.dialect.name, "db.statement": statement[:1024]},
+            kind=SPAN_KIND_CLIENT,
+        )
+        conn.info.setdefault("tracing_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("tracing_spans")
+        span = spans.pop() if spans else None
+        if span is not None:
+            span.set_attribute("db.rowcount", cursor.rowcount)
+            tracer.end_span(span)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get("tracing_spans") if conn is not None else None
+        span = spans.pop() if spans else None
+        if span is not None:
+            span.record_error(exception_context.original_exception)
+            tracer.end_span(span)
+
+
+# Global tracer instance
+tracer = Tracer(tracing_settings)
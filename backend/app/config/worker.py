@@ -0,0 +1,44 @@
+from pydantic_settings import BaseSettings
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class WorkerSettings(BaseSettings):
+    # Run a claim worker inside each API process (dedicated workers: python -m app.workers.claim_worker)
+    CLAIM_WORKER_ENABLED: bool = os.getenv("CLAIM_WORKER_ENABLED", "true").lower() == "true"
+    CLAIM_WORKER_BATCH_SIZE: int = int(os.getenv("CLAIM_WORKER_BATCH_SIZE", "20"))
+    # Claims a worker holds at once; their sends are scheduled fairly, PAYOUT_SEND_CONCURRENCY at a time
+    CLAIM_WORKER_CONCURRENCY: int = int(os.getenv("CLAIM_WORKER_CONCURRENCY", "100"))
+    CLAIM_WORKER_POLL_SECONDS: float = float(os.getenv("CLAIM_WORKER_POLL_SECONDS", "1"))
+    # A lease must outlast the slowest send; expired leases are picked up by other workers
+    CLAIM_LEASE_SECONDS: int = int(os.getenv("CLAIM_LEASE_SECONDS", "300"))
+    CLAIM_MAX_ATTEMPTS: int = int(os.getenv("CLAIM_MAX_ATTEMPTS", "5"))
+    # Fair payout scheduling across organizers and events
+    PAYOUT_SEND_CONCURRENCY: int = int(os.getenv("PAYOUT_SEND_CONCURRENCY", "20"))
+    # Sends per second allowed per organizer (0: uncapped), overridden by "organizer_id:rate,..."
+    PAYOUT_ORGANIZER_RATE: float = float(os.getenv("PAYOUT_ORGANIZER_RATE", "0"))
+    PAYOUT_ORGANIZER_RATES: str = os.getenv("PAYOUT_ORGANIZER_RATES", "")
+    # Share of send slots per organizer as "organizer_id:weight,..." (default weight 1)
+    PAYOUT_ORGANIZER_WEIGHTS: str = os.getenv("PAYOUT_ORGANIZER_WEIGHTS", "")
+    # Organizers with this many claims waiting are not leased more
+    PAYOUT_MAX_QUEUED_PER_ORGANIZER: int = int(os.getenv("PAYOUT_MAX_QUEUED_PER_ORGANIZER", "50"))
+    # Archival of finished events (python -m app.workers.archiver)
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "archive")
+    ARCHIVE_INTERVAL_SECONDS: int = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "20"))
+    # Ended events whose claim entitlements are precomputed per maintenance pass
+    ENTITLEMENT_SNAPSHOT_BATCH_SIZE: int = int(os.getenv("ENTITLEMENT_SNAPSHOT_BATCH_SIZE", "20"))
+    # Rows removed per transaction when an event is deleted
+    EVENT_DELETE_CHUNK_SIZE: int = int(os.getenv("EVENT_DELETE_CHUNK_SIZE", "5000"))
+    # Per-minute rollups older than this are pruned; per-hour rollups are kept
+    # (a week matches the longest minute time series one request may ask for)
+    ROLLUP_MINUTE_RETENTION_DAYS: int = int(os.getenv("ROLLUP_MINUTE_RETENTION_DAYS", "7"))
+    # Empty claims partitions kept ready beyond the newest event's
+    CLAIM_PARTITIONS_AHEAD: int = int(os.getenv("CLAIM_PARTITIONS_AHEAD", "10"))
+
+    class Config:
+        env_file = ".env"
+
+worker_settings = WorkerSettings()
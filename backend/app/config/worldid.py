@@ -11,6 +11,11 @@ class WorldIDSettings(BaseSettings):
         "WORLDID_VERIFY_URL",
         "https://developer.worldcoin.org/api/v1/verify"
     )
+    # Keep-alive connections held open to the verify endpoint
+    WORLDID_POOL_SIZE: int = int(os.getenv("WORLDID_POOL_SIZE", "20"))
+    WORLDID_TIMEOUT_SECONDS: float = float(os.getenv("WORLDID_TIMEOUT_SECONDS", "10"))
+    # Verifications slower than this count against the circuit breaker
+    WORLDID_SLOW_CALL_SECONDS: float = float(os.getenv("WORLDID_SLOW_CALL_SECONDS", "3"))
     
     class Config:
         env_file = ".env"
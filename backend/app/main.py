@@ -1,18 +1,43 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.config.database import engine, Base
 from app.config.logging import logger
-from app.api.routes import organizers, events, participants
+from app.config.metrics import metrics, CONTENT_TYPE_LATEST
+from app.middleware.admission import AdmissionControlMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.tracing import TracingMiddleware
+from app.api.routes import organizers, events, participants, profiles
+from app.config.profiling import profiling_settings
+from app.services.container import ServiceContainer
+
+# The schema is managed by Alembic (python -m app.migrate), not created at import
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Service clients are built once per process and shared by all requests
+    services = ServiceContainer()
+    app.state.services = services
+    await services.start()
+    try:
+        yield
+    finally:
+        await services.close()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="WorldID Reward Distribution System",
     description="Event-based reward distribution system with WorldID verification",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Admission control for join/claim (innermost, so shed 503s still get CORS headers)
+app.add_middleware(AdmissionControlMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -22,10 +47,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (gzip, or brotli when installed)
+app.add_middleware(CompressionMiddleware)
+
+# On-demand request profiling (not installed at all unless enabled)
+if profiling_settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Tracing middleware (outermost, so the request span covers everything below it)
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(organizers.router, prefix="/api/organizers", tags=["organizers"])
 app.include_router(events.router, prefix="/api/organizers/events", tags=["organizer-events"])
 app.include_router(participants.router, prefix="/api", tags=["participants"])
+if profiling_settings.PROFILING_ENABLED:
+    app.include_router(profiles.router, prefix="/api/admin/profiles", tags=["admin"])
 
 
 # Logging will be initialized when module is imported
@@ -40,3 +77,8 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=CONTENT_TYPE_LATEST)
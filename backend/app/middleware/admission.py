@@ -0,0 +1,205 @@
+import asyncio
+import os
+import re
+import time
+from collections import deque
+from typing import Deque, List, Optional, Pattern, Tuple
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config.logging import logger
+from app.config.metrics import metrics
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# Requests allowed to wait for a slot per route; beyond that they are shed at once
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "100"))
+# Longest a queued request waits for a slot before it is shed
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "2"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+# How often a limit is re-evaluated from the latencies seen since the last time
+ADMISSION_ADJUST_INTERVAL_SECONDS = float(os.getenv("ADMISSION_ADJUST_INTERVAL_SECONDS", "1"))
+
+in_flight_gauge = metrics.gauge("admission_in_flight", "Requests being handled", ["route"])
+queue_depth_gauge = metrics.gauge("admission_queue_depth", "Requests waiting for a slot", ["route"])
+limit_gauge = metrics.gauge("admission_concurrency_limit", "Current adaptive concurrency limit", ["route"])
+admitted_counter = metrics.counter("admission_admitted_total", "Requests admitted", ["route"])
+shed_counter = metrics.counter("admission_shed_total", "Requests rejected with 503", ["route", "reason"])
+queue_wait_histogram = metrics.histogram(
+    "admission_queue_wait_seconds", "Time admitted requests waited for a slot", ["route"]
+)
+latency_histogram = metrics.histogram(
+    "admission_request_duration_seconds", "Time admitted requests took to handle", ["route"]
+)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit with a bounded FIFO wait queue, adapted from latency (AIMD)
+
+    Every ADMISSION_ADJUST_INTERVAL_SECONDS the mean latency of the requests
+    finished since the last adjustment is compared with the route's target:
+    above it, the limit is cut by a quarter (fewer concurrent requests
+    against a slow upstream or a busy pool); at or below it, and with
+    requests having had to queue, the limit grows by one.
+    """
+
+    def __init__(self, name: str, initial_limit: int, min_limit: int, max_limit: int, target_latency: float):
+        self.name = name
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._latency_sum = 0.0
+        self._latency_count = 0
+        self._saturated = False
+        self._adjusted_at = time.monotonic()
+        limit_gauge.set(self.limit, route=self.name)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _publish(self) -> None:
+        in_flight_gauge.set(self.in_flight, route=self.name)
+        queue_depth_gauge.set(len(self._waiters), route=self.name)
+
+    async def acquire(self, queue_size: int, timeout: float) -> Optional[str]:
+        """Take a slot, waiting up to timeout; returns the shed reason if none was had"""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self._publish()
+            return None
+        self._saturated = True
+        if len(self._waiters) >= queue_size:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=timeout)
+        except asyncio.CancelledError:
+            # Client went away while queued; hand back a slot it was just given
+            if waiter.done() and not waiter.cancelled():
+                self.release(None)
+            else:
+                waiter.cancel()
+                self._remove(waiter)
+            raise
+        if done:
+            return None
+        waiter.cancel()
+        self._remove(waiter)
+        return "timeout"
+
+    def _remove(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        self._publish()
+
+    def release(self, latency: Optional[float]) -> None:
+        self.in_flight -= 1
+        if latency is not None:
+            self._latency_sum += latency
+            self._latency_count += 1
+            self._adjust()
+        # Hand freed slots straight to the oldest waiters
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+        self._publish()
+
+    def _adjust(self) -> None:
+        now = time.monotonic()
+        if now - self._adjusted_at < ADMISSION_ADJUST_INTERVAL_SECONDS or not self._latency_count:
+            return
+        mean_latency = self._latency_sum / self._latency_count
+        previous = self.limit
+        if mean_latency > self.target_latency:
+            self.limit = max(self.min_limit, int(self.limit * 0.75))
+        elif self._saturated:
+            self.limit = min(self.max_limit, self.limit + 1)
+        if self.limit != previous:
+            logger.info(
+                f"Admission limit for {self.name}: {previous} -> {self.limit} "
+                f"(mean latency {mean_latency * 1000:.0f}ms, target {self.target_latency * 1000:.0f}ms)"
+            )
+            limit_gauge.set(self.limit, route=self.name)
+        self._latency_sum = 0.0
+        self._latency_count = 0
+        self._saturated = False
+        self._adjusted_at = now
+
+
+def _route_limiter(name: str, default_limit: int, default_max: int, default_target_ms: int) -> AdaptiveLimiter:
+    prefix = f"ADMISSION_{name.upper()}"
+    return AdaptiveLimiter(
+        name,
+        initial_limit=int(os.getenv(f"{prefix}_LIMIT", str(default_limit))),
+        min_limit=int(os.getenv(f"{prefix}_MIN_LIMIT", "2")),
+        max_limit=int(os.getenv(f"{prefix}_MAX_LIMIT", str(default_max))),
+        target_latency=int(os.getenv(f"{prefix}_TARGET_LATENCY_MS", str(default_target_ms))) / 1000
+    )
+
+
+def default_routes() -> List[Tuple[str, Pattern, AdaptiveLimiter]]:
+    """(method, path pattern, limiter) of the routes under admission control"""
+    return [
+        ("POST", re.compile(r"^/api/\d+/join$"), _route_limiter("join", 32, 128, 1000)),
+        ("POST", re.compile(r"^/api/\d+/claim$"), _route_limiter("claim", 16, 64, 2000)),
+    ]
+
+
+class AdmissionControlMiddleware:
+    """
+    Bounded concurrency for the join and claim routes, shedding the excess with 503
+
+    Requests over a route's limit wait in a short FIFO queue; when the
+    queue is full or the wait times out they get an immediate 503 with
+    Retry-After instead of piling up on WorldID, the RPC or the DB pool.
+    Other routes pass straight through.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Optional[List[Tuple[str, Pattern, AdaptiveLimiter]]] = None):
+        self.app = app
+        self.routes = routes if routes is not None else default_routes()
+
+    def _limiter(self, scope: Scope) -> Optional[AdaptiveLimiter]:
+        for method, pattern, limiter in self.routes:
+            if scope["method"] == method and pattern.match(scope["path"]):
+                return limiter
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        limiter = self._limiter(scope) if ADMISSION_ENABLED and scope["type"] == "http" else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        queued_at = time.perf_counter()
+        shed_reason = await limiter.acquire(ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT_SECONDS)
+        if shed_reason is not None:
+            shed_counter.inc(route=limiter.name, reason=shed_reason)
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)}
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        admitted_counter.inc(route=limiter.name)
+        queue_wait_histogram.observe(started - queued_at, route=limiter.name)
+        latency = None
+        try:
+            await self.app(scope, receive, send)
+            latency = time.perf_counter() - started
+            latency_histogram.observe(latency, route=limiter.name)
+        finally:
+            limiter.release(latency)
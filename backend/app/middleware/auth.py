@@ -1,12 +1,17 @@
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from app.config.database import get_db
 from app.models.organizer import Organizer
+from app.models.used_participant_token import UsedParticipantToken
 import os
 from dotenv import load_dotenv
 
@@ -15,6 +20,10 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# Participant session tokens let claim_rewards skip a second WorldID round trip after join_event
+PARTICIPANT_TOKEN_EXPIRE_SECONDS = int(os.getenv("PARTICIPANT_TOKEN_EXPIRE_SECONDS", "600"))
+PARTICIPANT_TOKEN_SINGLE_USE = os.getenv("PARTICIPANT_TOKEN_SINGLE_USE", "true").lower() == "true"
+PARTICIPANT_TOKEN_TYPE = "participant_session"
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/organizers/login")
@@ -74,3 +83,81 @@ def get_current_organizer(
             detail="Organizer account is inactive"
         )
     return organizer
+
+
+def create_participant_token(world_id_hash: str, wallet_address: str, event_id: int) -> str:
+    """Create a short-lived token proving a participant verified with WorldID for an event"""
+    expire = datetime.utcnow() + timedelta(seconds=PARTICIPANT_TOKEN_EXPIRE_SECONDS)
+    return jwt.encode(
+        {
+            "sub": world_id_hash,
+            "wallet": wallet_address,
+            "event_id": event_id,
+            "typ": PARTICIPANT_TOKEN_TYPE,
+            "jti": uuid.uuid4().hex,
+            "exp": expire,
+        },
+        SECRET_KEY,
+        algorithm=ALGORITHM
+    )
+
+
+def verify_participant_token(token: str, event_id: int) -> Optional[dict]:
+    """
+    Verify a participant session token locally
+
+    This does not use the token up: once the claim it authorizes is accepted,
+    redeem it with redeem_participant_token in the same transaction.
+
+    Args:
+        token: Token issued by create_participant_token
+        event_id: Event the token must be bound to
+
+    Returns:
+        Dict with world_id_hash, wallet_address, jti and expires_at, or None
+        if the token is invalid, expired or for another event
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("typ") != PARTICIPANT_TOKEN_TYPE or payload.get("event_id") != event_id:
+        return None
+    if not payload.get("sub") or not payload.get("wallet"):
+        return None
+    return {
+        "world_id_hash": payload["sub"],
+        "wallet_address": payload["wallet"],
+        "jti": payload.get("jti", ""),
+        "expires_at": datetime.fromtimestamp(payload["exp"], tz=timezone.utc),
+    }
+
+
+def redeem_participant_token(db: Session, session: dict) -> bool:
+    """
+    Use up a verified session token (PARTICIPANT_TOKEN_SINGLE_USE)
+
+    The token ID is inserted into used_participant_tokens in the caller's
+    transaction, so every API process sees it and a concurrent redemption
+    of the same token waits for this one and then fails.
+
+    Returns:
+        False if the token was already used
+    """
+    if not PARTICIPANT_TOKEN_SINGLE_USE:
+        return True
+    insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    return db.execute(
+        insert(UsedParticipantToken)
+        .values(jti=session["jti"], expires_at=session["expires_at"])
+        .on_conflict_do_nothing(index_elements=["jti"])
+    ).rowcount == 1
+
+
+def purge_used_participant_tokens(db: Session) -> int:
+    """Forget redeemed tokens that have expired (they fail verification anyway); commits"""
+    purged = db.execute(
+        delete(UsedParticipantToken).where(UsedParticipantToken.expires_at < func.now())
+    ).rowcount
+    db.commit()
+    return purged
@@ -0,0 +1,67 @@
+import hmac
+import random
+import sys
+from typing import Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config.profiling import (
+    profiling_settings,
+    profile_request,
+    PROFILE_ID_HEADER,
+    PROFILE_TOKEN_HEADER,
+)
+
+# Never profiled: scrapes, health checks and the profile downloads themselves
+UNPROFILED_PREFIXES = ("/metrics", "/health", "/api/admin/profiles")
+
+
+def valid_profiling_token(token: Optional[str]) -> bool:
+    """Whether token is the configured PROFILING_TOKEN (never true while it is unset)"""
+    expected = profiling_settings.PROFILING_TOKEN
+    return bool(expected) and token is not None and hmac.compare_digest(token, expected)
+
+
+class ProfilingMiddleware:
+    """
+    Profile single requests on demand (see app.config.profiling)
+
+    A request carrying X-Profile-Token with the PROFILING_TOKEN, or picked
+    at random with probability PROFILING_SAMPLE_RATE, is profiled: its
+    stack is sampled every PROFILING_INTERVAL_MS and its database, HTTP and
+    RPC waits are timed. The response carries X-Profile-Id, under which the
+    profile can be downloaded from /api/admin/profiles. Only installed when
+    PROFILING_ENABLED is set.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _trigger(self, scope: Scope) -> Optional[str]:
+        if scope["type"] != "http" or scope["path"].startswith(UNPROFILED_PREFIXES):
+            return None
+        for name, value in scope.get("headers") or []:
+            if name == PROFILE_TOKEN_HEADER.lower().encode("latin-1"):
+                return "header" if valid_profiling_token(value.decode("latin-1")) else None
+        if profiling_settings.PROFILING_SAMPLE_RATE > 0 and random.random() < profiling_settings.PROFILING_SAMPLE_RATE:
+            return "sample"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Samples of the event loop thread belong to this request only while this frame is on the stack
+        with profile_request(scope["method"], scope["path"], trigger, sys._getframe()) as profile:
+            async def send_wrapper(message: Message):
+                if message["type"] == "http.response.start":
+                    profile.status = message["status"]
+                    route = scope.get("route")
+                    if route is not None and hasattr(route, "path"):
+                        profile.route = route.path
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (PROFILE_ID_HEADER.lower().encode("latin-1"), profile.id.encode("latin-1"))
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -3,6 +3,7 @@ from functools import lru_cache
 from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Dict, Tuple
+from app.config.tracing import tracer
 
 
 class RateLimiter:
@@ -54,11 +55,12 @@ def rate_limit(max_requests: int = 10, window_seconds: int = 60):
         # Use IP address as key
         client_ip = request.client.host if request.client else "unknown"
         
-        is_allowed, remaining = rate_limiter.is_allowed(
-            client_ip,
-            max_requests,
-            window_seconds
-        )
+        with tracer.start_span("rate_limit", {"rate_limit.max_requests": max_requests}):
+            is_allowed, remaining = rate_limiter.is_allowed(
+                client_ip,
+                max_requests,
+                window_seconds
+            )
         
         if not is_allowed:
             raise HTTPException(
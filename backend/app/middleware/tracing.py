@@ -0,0 +1,59 @@
+import re
+from typing import Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config.tracing import tracer, SPAN_KIND_SERVER
+
+# W3C trace context: version-traceid-parentid-flags
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+def parse_traceparent(header: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Extract (trace_id, parent_span_id) from a traceparent header"""
+    if not header:
+        return None, None
+    match = TRACEPARENT_RE.match(header.strip().lower())
+    if not match:
+        return None, None
+    return match.group(1), match.group(2)
+
+
+class TracingMiddleware:
+    """Open a server span per HTTP request and return the trace id to the caller"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        traceparent = headers.get(b"traceparent")
+        trace_id, parent_span_id = parse_traceparent(traceparent.decode("latin-1") if traceparent else None)
+
+        attributes = {
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        }
+        with tracer.start_span(
+            f"{scope['method']} {scope['path']}",
+            attributes,
+            kind=SPAN_KIND_SERVER,
+            trace_id=trace_id,
+            parent_span_id=parent_span_id,
+        ) as span:
+            async def send_wrapper(message: Message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    route = scope.get("route")
+                    if route is not None and hasattr(route, "path"):
+                        span.name = f"{scope['method']} {route.path}"
+                        span.set_attribute("http.route", route.path)
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"traceparent", f"00-{span.trace_id}-{span.span_id}-01".encode("latin-1"))
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
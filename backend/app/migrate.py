@@ -0,0 +1,40 @@
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from app.config.database import engine
+from app.config.logging import logger
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+# Schema that Base.metadata.create_all built before migrations were introduced
+PRE_ALEMBIC_REVISION = "0001"
+
+
+def alembic_config() -> Config:
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "alembic"))
+    return config
+
+
+def upgrade_database() -> None:
+    """
+    Bring the database schema to the latest migration
+
+    Databases created by create_all (before Alembic managed the schema) have
+    the initial tables but no alembic_version table, so 0001 would fail on
+    tables that already exist; they are stamped at 0001 first and upgraded
+    from there. 0001 is exactly the schema of the original models; 0002 adds
+    the claim sending columns and the reward inventory only where a later
+    create_all has not already built them.
+    """
+    config = alembic_config()
+    tables = set(inspect(engine).get_table_names())
+    if "alembic_version" not in tables and "organizers" in tables:
+        logger.info(f"Found a schema created before migrations; stamping it at revision {PRE_ALEMBIC_REVISION}")
+        command.stamp(config, PRE_ALEMBIC_REVISION)
+    command.upgrade(config, "head")
+
+
+if __name__ == "__main__":
+    # Container entrypoint, instead of a bare `alembic upgrade head`: python -m app.migrate
+    upgrade_database()
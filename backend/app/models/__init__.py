@@ -4,6 +4,10 @@ from app.models.participant import Participant
 from app.models.reward import Reward
 from app.models.claim import Claim
 from app.models.event_participant import EventParticipant
+from app.models.reward_inventory import RewardInventoryItem
+from app.models.event_stats import EventStats
+from app.models.event_rollup import EventRollup
+from app.models.used_participant_token import UsedParticipantToken
 
 __all__ = [
     "Organizer",
@@ -12,4 +16,8 @@ __all__ = [
     "Reward",
     "Claim",
     "EventParticipant",
+    "RewardInventoryItem",
+    "EventStats",
+    "EventRollup",
+    "UsedParticipantToken",
 ]
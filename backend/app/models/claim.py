@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum as SQLEnum, UniqueConstraint
+from sqlalchemy import Column, Integer, BigInteger, Numeric, String, Text, ForeignKey, DateTime, Enum as SQLEnum, UniqueConstraint, Index, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -6,6 +6,8 @@ from app.config.database import Base
 
 
 class ClaimStatus(str, enum.Enum):
+    # Precomputed by an entitlement snapshot; becomes PENDING when claimed or dispatched
+    ENTITLED = "ENTITLED"
     PENDING = "PENDING"
     PROCESSING = "PROCESSING"
     COMPLETED = "COMPLETED"
@@ -13,21 +15,46 @@ class ClaimStatus(str, enum.Enum):
 
 
 class Claim(Base):
+    # On PostgreSQL the table is partitioned by RANGE (event_id) with primary key
+    # (id, event_id) (see migration 0005); ids still come from one sequence, so
+    # the mapper keys on id alone
     __tablename__ = "claims"
 
     id = Column(Integer, primary_key=True, index=True)
-    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
     participant_id = Column(Integer, ForeignKey("participants.id"), nullable=False)
-    reward_id = Column(Integer, ForeignKey("rewards.id"), nullable=False)
+    reward_id = Column(Integer, ForeignKey("rewards.id", ondelete="CASCADE"), nullable=False)
     status = Column(SQLEnum(ClaimStatus), default=ClaimStatus.PENDING)
     transaction_hash = Column(String, nullable=True)
+    token_id = Column(Numeric(78, 0), nullable=True)  # NFT ID allocated from the reward inventory
+    # Sending account, nonce and fee of the latest broadcast; earlier hashes
+    # replaced by fee bumps are kept oldest first
+    sender_address = Column(String, nullable=True)
+    nonce = Column(Integer, nullable=True)
+    gas_price = Column(BigInteger, nullable=True)
+    replaced_transaction_hashes = Column(JSON, nullable=True)
+    # Raw signed transaction, stored (with its hash, sender and nonce) before it
+    # is broadcast so a later lease re-sends this exact transaction instead of a new one
+    signed_transaction = Column(Text, nullable=True)
     error_message = Column(String, nullable=True)
+    # Work-queue lease: the worker processing the claim and when its lease runs out
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Constraints - one claim per event per participant per reward
     __table_args__ = (
         UniqueConstraint('event_id', 'participant_id', 'reward_id', name='uq_event_participant_reward'),
+        Index('ix_claims_sender_nonce', 'sender_address', 'nonce'),
+        # Only claims a worker may still pick up, per event; finished claims never enter this index
+        Index(
+            'ix_claims_claimable',
+            'event_id',
+            'id',
+            postgresql_where=status.in_([ClaimStatus.PENDING.value, ClaimStatus.PROCESSING.value])
+        ),
     )
 
     # Relationships
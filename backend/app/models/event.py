@@ -14,11 +14,18 @@ class Event(Base):
     start_date = Column(DateTime(timezone=True))
     end_date = Column(DateTime(timezone=True))
     is_active = Column(Boolean, default=True)
+    # Set once every joined participant's claims were precomputed as ENTITLED
+    entitlements_snapshot_at = Column(DateTime(timezone=True), nullable=True)
+    # Set once the event's claims and joins were moved to cold storage
+    archived_at = Column(DateTime(timezone=True), nullable=True)
+    # Set when deletion was requested; the rows go in the background
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    # Relationships
+    # Relationships - children are removed by ON DELETE CASCADE in the database,
+    # never loaded into the session one by one
     organizer = relationship("Organizer", back_populates="events")
-    rewards = relationship("Reward", back_populates="event", cascade="all, delete-orphan")
-    event_participants = relationship("EventParticipant", back_populates="event", cascade="all, delete-orphan")
-    claims = relationship("Claim", back_populates="event", cascade="all, delete-orphan")
+    rewards = relationship("Reward", back_populates="event", cascade="all, delete-orphan", passive_deletes=True)
+    event_participants = relationship("EventParticipant", back_populates="event", cascade="all, delete-orphan", passive_deletes=True)
+    claims = relationship("Claim", back_populates="event", cascade="all, delete-orphan", passive_deletes=True)
@@ -8,7 +8,7 @@ class EventParticipant(Base):
     __tablename__ = "event_participants"
 
     id = Column(Integer, primary_key=True, index=True)
-    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
     participant_id = Column(Integer, ForeignKey("participants.id"), nullable=False)
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, BigInteger, Numeric, String, ForeignKey, DateTime
+from app.config.database import Base
+
+
+class EventRollup(Base):
+    __tablename__ = "event_rollups"
+
+    # One row per event, bucket and shard; counts are what happened during the
+    # bucket (flows), unlike event_stats which holds current totals
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    granularity = Column(String(8), primary_key=True)  # "minute" or "hour"
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    shard = Column(Integer, primary_key=True, default=0)
+    joins = Column(BigInteger, nullable=False, default=0, server_default="0")
+    claims_entitled = Column(BigInteger, nullable=False, default=0, server_default="0")
+    claims_pending = Column(BigInteger, nullable=False, default=0, server_default="0")
+    claims_processing = Column(BigInteger, nullable=False, default=0, server_default="0")
+    claims_completed = Column(BigInteger, nullable=False, default=0, server_default="0")
+    claims_failed = Column(BigInteger, nullable=False, default=0, server_default="0")
+    tokens_distributed = Column(Numeric(78, 18), nullable=False, default=0, server_default="0")
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, BigInteger, Numeric, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from app.config.database import Base
+
+
+class EventStats(Base):
+    __tablename__ = "event_stats"
+
+    # Counters are split over a few shard rows per event so concurrent joins and
+    # claim transitions don't all queue on one row lock; readers sum the shards
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True, default=0)
+    participant_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    claims_entitled = Column(BigInteger, nullable=False, default=0, server_default="0")
+    claims_pending = Column(BigInteger, nullable=False, default=0, server_default="0")
+    claims_processing = Column(BigInteger, nullable=False, default=0, server_default="0")
+    claims_completed = Column(BigInteger, nullable=False, default=0, server_default="0")
+    claims_failed = Column(BigInteger, nullable=False, default=0, server_default="0")
+    # Sum of completed ERC-20 amounts plus one per NFT sent
+    tokens_distributed = Column(Numeric(78, 18), nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -14,7 +14,7 @@ class Reward(Base):
     __tablename__ = "rewards"
 
     id = Column(Integer, primary_key=True, index=True)
-    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
     reward_type = Column(SQLEnum(RewardType), nullable=False)
     token_address = Column(String, nullable=False)  # ERC-20/721/1155 contract address
     amount = Column(Numeric(36, 18))  # For ERC-20 tokens
@@ -24,4 +24,5 @@ class Reward(Base):
 
     # Relationships
     event = relationship("Event", back_populates="rewards")
-    claims = relationship("Claim", back_populates="reward", cascade="all, delete-orphan")
+    claims = relationship("Claim", back_populates="reward", cascade="all, delete-orphan", passive_deletes=True)
+    inventory = relationship("RewardInventoryItem", back_populates="reward", cascade="all, delete-orphan", passive_deletes=True)
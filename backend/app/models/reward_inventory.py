@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, DateTime, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from app.config.database import Base
+
+
+class RewardInventoryItem(Base):
+    __tablename__ = "reward_inventory"
+
+    id = Column(Integer, primary_key=True, index=True)
+    reward_id = Column(Integer, ForeignKey("rewards.id", ondelete="CASCADE"), nullable=False)
+    token_id = Column(Numeric(78, 0), nullable=False)  # uint256 NFT token ID
+    # No foreign key: claims is partitioned (its primary key is (id, event_id)) and
+    # archived claims leave the table while their tokens stay allocated
+    claim_id = Column(Integer, nullable=True, unique=True)
+    reserved_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Constraints - each token ID is stocked once per reward; the partial index
+    # keeps the free-item scan small however much of the inventory is reserved
+    __table_args__ = (
+        UniqueConstraint('reward_id', 'token_id', name='uq_reward_token_id'),
+        Index(
+            'ix_reward_inventory_available',
+            'reward_id', 'id',
+            postgresql_where=(claim_id.is_(None))
+        ),
+    )
+
+    # Relationships
+    reward = relationship("Reward", back_populates="inventory")
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime
+from app.config.database import Base
+
+
+class UsedParticipantToken(Base):
+    """Single-use participant session tokens already redeemed, shared by every API process"""
+    __tablename__ = "used_participant_tokens"
+
+    jti = Column(String, primary_key=True)
+    # Kept until the token would have expired anyway, then purged
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -5,7 +5,8 @@ from app.models.claim import ClaimStatus
 
 
 class ClaimRequest(BaseModel):
-    world_id_proof: dict  # WorldID proof object
+    world_id_proof: Optional[dict] = None  # WorldID proof object
+    session_token: Optional[str] = None  # Participant token from join_event, instead of a proof
 
 
 class ClaimResponse(BaseModel):
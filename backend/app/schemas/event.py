@@ -28,6 +28,8 @@ class EventResponse(BaseModel):
     start_date: Optional[datetime]
     end_date: Optional[datetime]
     is_active: bool
+    archived_at: Optional[datetime] = None
+    entitlements_snapshot_at: Optional[datetime] = None
     created_at: datetime
     rewards: List[RewardResponse] = []
 
@@ -47,3 +49,34 @@ class EventListResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class EventStatsResponse(BaseModel):
+    event_id: int
+    participant_count: int
+    claims_total: int
+    claims_entitled: int
+    claims_pending: int
+    claims_processing: int
+    claims_completed: int
+    claims_failed: int
+    tokens_distributed: float
+
+
+class EventTimeseriesBucket(BaseModel):
+    bucket_start: datetime
+    joins: int
+    claims_entitled: int
+    claims_pending: int
+    claims_processing: int
+    claims_completed: int
+    claims_failed: int
+    tokens_distributed: float
+
+
+class EventTimeseriesResponse(BaseModel):
+    event_id: int
+    granularity: str
+    start: datetime
+    end: datetime
+    buckets: List[EventTimeseriesBucket]
@@ -7,6 +7,7 @@ from app.schemas.event import EventListResponse
 class ParticipantJoinEvent(BaseModel):
     wallet_address: str
     world_id_proof: dict  # WorldID proof object
+    issue_session_token: bool = False  # Return a short-lived token usable instead of a proof on claim
 
 
 class ParticipantResponse(BaseModel):
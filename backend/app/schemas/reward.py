@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from app.models.reward import RewardType
 
 
@@ -24,3 +24,16 @@ class RewardResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class RewardInventoryLoad(BaseModel):
+    # Either an inclusive range or an explicit list of token IDs
+    start_token_id: Optional[int] = None
+    end_token_id: Optional[int] = None
+    token_ids: Optional[List[int]] = None
+
+
+class RewardInventoryResponse(BaseModel):
+    reward_id: int
+    loaded: int = 0
+    available: int
@@ -0,0 +1,261 @@
+import os
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List
+import orjson
+from sqlalchemy import exists, func, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app.config.logging import logger
+from app.config.worker import WorkerSettings, worker_settings
+from app.models.claim import Claim, ClaimStatus
+from app.models.event import Event
+from app.models.event_participant import EventParticipant
+from app.models.participant import Participant
+from app.services.event_deletion_service import EventDeletionService
+
+# Event IDs per claims partition; migration 0005 lays partitions out on the same grid
+CLAIM_PARTITION_SIZE = 1000
+CLAIM_PARTITION_PREFIX = "claims_p"
+
+# Exportable tables of an event
+ARCHIVE_TABLES = ("claims", "participants")
+
+# Rows fetched per round trip while exporting
+EXPORT_CHUNK_ROWS = 5000
+
+
+def claim_partition_name(lower: int) -> str:
+    return f"{CLAIM_PARTITION_PREFIX}{lower}"
+
+
+def gzip_ndjson(rows: Iterable[Dict]) -> Iterator[bytes]:
+    """Gzip'd NDJSON, one chunk per EXPORT_CHUNK_ROWS rows (uint256 token IDs as strings)"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    lines = []
+    for row in rows:
+        lines.append(orjson.dumps(row, default=str))
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            chunk = compressor.compress(b"\n".join(lines) + b"\n")
+            lines = []
+            if chunk:
+                yield chunk
+    if lines:
+        yield compressor.compress(b"\n".join(lines) + b"\n")
+    yield compressor.flush()
+
+
+class ArchiveService:
+    """
+    Moves the claims and joins of long-finished events to gzip'd NDJSON files
+
+    The hot tables then only hold events that can still change, and claims
+    partitions left empty by archival are detached and dropped instead of
+    being vacuumed.
+    """
+
+    @staticmethod
+    def archive_path(event_id: int, table: str, settings: WorkerSettings = worker_settings) -> str:
+        return os.path.join(settings.ARCHIVE_DIR, f"event_{event_id}", f"{table}.ndjson.gz")
+
+    @staticmethod
+    def export_rows(db: Session, event_id: int, table: str) -> Iterator[Dict]:
+        """Rows of an event's claims or participants, streamed from the hot tables"""
+        if table == "claims":
+            query = db.query(
+                Claim.id,
+                Claim.participant_id,
+                Participant.wallet_address,
+                Claim.reward_id,
+                Claim.status,
+                Claim.token_id,
+                Claim.transaction_hash,
+                Claim.error_message,
+                Claim.created_at,
+                Claim.updated_at
+            ).join(Participant, Participant.id == Claim.participant_id).filter(
+                Claim.event_id == event_id
+            ).order_by(Claim.id)
+        else:
+            query = db.query(
+                Participant.id,
+                Participant.wallet_address,
+                EventParticipant.joined_at
+            ).join(EventParticipant, EventParticipant.participant_id == Participant.id).filter(
+                EventParticipant.event_id == event_id
+            ).order_by(EventParticipant.id)
+        for row in query.yield_per(EXPORT_CHUNK_ROWS):
+            yield row._asdict()
+
+    @staticmethod
+    def write_archive(db: Session, event_id: int, table: str, settings: WorkerSettings = worker_settings) -> str:
+        """Write one table of an event to its archive file; returns the path"""
+        path = ArchiveService.archive_path(event_id, table, settings)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = path + ".partial"
+        with open(partial, "wb") as archive:
+            for chunk in gzip_ndjson(ArchiveService.export_rows(db, event_id, table)):
+                archive.write(chunk)
+            archive.flush()
+            os.fsync(archive.fileno())
+        # Readers only ever see a complete file
+        os.replace(partial, path)
+        return path
+
+    @staticmethod
+    def archive_event(db: Session, event_id: int, settings: WorkerSettings = worker_settings) -> bool:
+        """
+        Archive one event: write its claims and joins to files, then delete them
+
+        Rows are deleted in EVENT_DELETE_CHUNK_SIZE chunks, one transaction
+        each. A pass interrupted part-way through the deletes is finished by
+        the next one, which keeps the archive files already written.
+
+        Returns:
+            False if the event still has claims in flight and was left alone
+        """
+        event = db.query(Event).filter(
+            Event.id == event_id, Event.archived_at.is_(None)
+        ).with_for_update().first()
+        if not event:
+            return False
+
+        # Closed to joins and claims, then checked for claims in flight, in one
+        # transaction holding the event row, so a claim queued in between
+        # cannot be deleted without being archived
+        event.is_active = False
+        if ArchiveService.claims_in_flight(db, event_id):
+            db.rollback()
+            logger.info(f"Not archiving event {event_id}: claims still in flight")
+            return False
+        db.commit()
+
+        written = []
+        for table in ARCHIVE_TABLES:
+            # Files are only ever complete; rewriting one after deletes began would lose rows
+            if not os.path.exists(ArchiveService.archive_path(event_id, table, settings)):
+                written.append(ArchiveService.write_archive(db, event_id, table, settings))
+
+        # A request that read the event before it was closed may still have queued a claim
+        if ArchiveService.claims_in_flight(db, event_id):
+            for path in written:
+                os.remove(path)
+            db.rollback()
+            logger.info(f"Not archiving event {event_id}: a claim was queued while it was being exported")
+            return False
+
+        counts = {}
+        chunk_size = settings.EVENT_DELETE_CHUNK_SIZE
+        for model in (Claim, EventParticipant):
+            counts[model] = 0
+            while True:
+                deleted = EventDeletionService._delete_chunk(db, model, model.event_id == event_id, chunk_size)
+                counts[model] += deleted
+                if deleted < chunk_size:
+                    break
+        claims, joins = counts[Claim], counts[EventParticipant]
+        event.archived_at = func.now()
+        db.commit()
+
+        logger.info(f"Archived event {event_id}: {claims} claims, {joins} participants")
+        return True
+
+    @staticmethod
+    def claims_in_flight(db: Session, event_id: int) -> bool:
+        return db.query(exists().where(
+            Claim.event_id == event_id,
+            Claim.status.in_([ClaimStatus.PENDING, ClaimStatus.PROCESSING])
+        )).scalar()
+
+    @staticmethod
+    def archive_due_events(db: Session, settings: WorkerSettings = worker_settings) -> List[int]:
+        """Archive events that ended more than ARCHIVE_AFTER_DAYS ago; returns their IDs"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+        due = [
+            event_id for (event_id,) in db.query(Event.id).filter(
+                Event.archived_at.is_(None),
+                Event.deleted_at.is_(None),
+                Event.end_date.isnot(None),
+                Event.end_date < cutoff
+            ).order_by(Event.id).limit(settings.ARCHIVE_BATCH_SIZE)
+        ]
+        archived = []
+        for event_id in due:
+            try:
+                if ArchiveService.archive_event(db, event_id, settings):
+                    archived.append(event_id)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Archiving event {event_id} failed: {e}", exc_info=True)
+        return archived
+
+    @staticmethod
+    def ensure_claim_partitions(db: Session, settings: WorkerSettings = worker_settings) -> List[str]:
+        """
+        Create the claims partitions for the newest event and CLAIM_PARTITIONS_AHEAD after it
+
+        Claims of events beyond the prepared partitions land in claims_default
+        until then. PostgreSQL only; returns the partitions created.
+        """
+        if db.bind.dialect.name != "postgresql":
+            return []
+        newest = db.query(func.coalesce(func.max(Event.id), 0)).scalar()
+        first = newest // CLAIM_PARTITION_SIZE * CLAIM_PARTITION_SIZE
+        created = []
+        for lower in range(first, first + (settings.CLAIM_PARTITIONS_AHEAD + 1) * CLAIM_PARTITION_SIZE, CLAIM_PARTITION_SIZE):
+            name = claim_partition_name(lower)
+            if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+                continue
+            try:
+                with db.begin_nested():
+                    db.execute(text(
+                        f"CREATE TABLE {name} PARTITION OF claims "
+                        f"FOR VALUES FROM ({lower}) TO ({lower + CLAIM_PARTITION_SIZE})"
+                    ))
+                created.append(name)
+            except DBAPIError as e:
+                # claims_default already holds rows of this range
+                logger.warning(f"Could not create claims partition {name}: {e}")
+        db.commit()
+        return created
+
+    @staticmethod
+    def drop_archived_partitions(db: Session) -> List[str]:
+        """
+        Detach and drop claims partitions whose events are all archived or deleted
+
+        Partitions from the newest event's onwards are kept. PostgreSQL only;
+        returns the partitions dropped.
+        """
+        if db.bind.dialect.name != "postgresql":
+            return []
+        newest = db.query(func.coalesce(func.max(Event.id), 0)).scalar()
+        first_live = newest // CLAIM_PARTITION_SIZE * CLAIM_PARTITION_SIZE
+        partitions = db.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'claims'::regclass"
+        )).scalars().all()
+
+        dropped = []
+        for name in partitions:
+            if not name.startswith(CLAIM_PARTITION_PREFIX):
+                continue
+            try:
+                lower = int(name[len(CLAIM_PARTITION_PREFIX):])
+            except ValueError:
+                continue
+            upper = lower + CLAIM_PARTITION_SIZE
+            if upper > first_live:
+                continue
+            live_events = db.query(exists().where(
+                Event.id >= lower, Event.id < upper, Event.archived_at.is_(None)
+            )).scalar()
+            if live_events or db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})")).scalar():
+                continue
+            db.execute(text(f"ALTER TABLE claims DETACH PARTITION {name}"))
+            db.execute(text(f"DROP TABLE {name}"))
+            db.commit()
+            dropped.append(name)
+            logger.info(f"Dropped archived claims partition {name}")
+        db.commit()
+        return dropped
@@ -1,33 +1,47 @@
+import asyncio
 from web3 import Web3
-from eth_account import Account
-from typing import Dict, Optional
-import os
-from dotenv import load_dotenv
+from typing import Callable, Dict, List, Optional, Union
+from app.config.blockchain import blockchain_settings
+from app.config.logging import logger
+from app.config.tracing import tracer, SPAN_KIND_CLIENT
+from app.config.profiling import record_wait
+from app.services.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from app.services.calldata import (
+    encode_erc20_transfer,
+    encode_erc721_transfer,
+    encode_erc1155_transfer,
+)
+from app.services.rpc_router import RoutingProvider, get_rpc_router
+from app.services.signer_pool import SignerLane, SignerPool, get_signer_pool
+from app.services.tx_pipeline import SignedCallback, TransactionPipeline, get_transaction_pipeline
+from app.services.tx_watchdog import get_transaction_watchdog
 
-load_dotenv()
+# Calldata, or a builder for calldata that depends on the sending account
+CalldataSource = Union[str, Callable[[str], str]]
 
 
 class BlockchainService:
     """Service for blockchain interactions"""
     
-    def __init__(self):
-        rpc_url = os.getenv("ETHEREUM_RPC_URL", "https://eth-mainnet.g.alchemy.com/v2/demo")
-        self.w3 = Web3(Web3.HTTPProvider(rpc_url))
-        self.private_key = os.getenv("PRIVATE_KEY", "")
-        
-        if self.private_key:
-            self.account = Account.from_key(self.private_key)
-            self.sender_address = self.account.address
-        else:
-            self.account = None
-            self.sender_address = None
+    def __init__(
+        self,
+        signer_pool: Optional[SignerPool] = None,
+        pipeline: Optional[TransactionPipeline] = None
+    ):
+        self.w3 = Web3(RoutingProvider(get_rpc_router()))
+        self.rpc_breaker = get_circuit_breaker("ethereum_rpc", blockchain_settings.ETHEREUM_RPC_SLOW_CALL_SECONDS)
+        self.signer_pool = signer_pool or get_signer_pool()
+        self.pipeline = pipeline or get_transaction_pipeline()
+        self.watchdog = get_transaction_watchdog()
+        self._chain_id: Optional[int] = None
     
     def send_erc20_token(
         self,
         token_address: str,
         to_address: str,
         amount: int,
-        gas_price: Optional[int] = None
+        gas_price: Optional[int] = None,
+        affinity_key: Optional[str] = None
     ) -> Dict:
         """
         Send ERC-20 tokens
@@ -37,22 +51,16 @@ class BlockchainService:
             to_address: Recipient address
             amount: Amount in token's smallest unit (wei-like)
             gas_price: Optional gas price in wei
+            affinity_key: Optional key for pinning the transfer to a signer lane
         
         Returns:
             Dict with transaction hash or error
         """
         try:
-            # ERC-20 transfer function signature
-            transfer_function = "0xa9059cbb"  # transfer(address,uint256)
-            
-            # Encode parameters
-            to_address_encoded = to_address[2:].zfill(64)  # Remove 0x and pad
-            amount_encoded = hex(amount)[2:].zfill(64)
-            
-            data = transfer_function + to_address_encoded + amount_encoded
-            
-            return self._send_transaction(token_address, to_address, data, gas_price)
+            data = encode_erc20_transfer(to_address, amount)
             
+            return self._send_transaction(token_address, to_address, data, gas_price, affinity_key)
+        
         except Exception as e:
             return {
                 "success": False,
@@ -64,7 +72,8 @@ class BlockchainService:
         nft_address: str,
         to_address: str,
         token_id: int,
-        gas_price: Optional[int] = None
+        gas_price: Optional[int] = None,
+        affinity_key: Optional[str] = None
     ) -> Dict:
         """
         Send ERC-721 NFT
@@ -74,24 +83,18 @@ class BlockchainService:
             to_address: Recipient address
             token_id: NFT token ID
             gas_price: Optional gas price in wei
+            affinity_key: Optional key for pinning the transfer to a signer lane
         
         Returns:
             Dict with transaction hash or error
         """
         try:
-            # ERC-721 safeTransferFrom function signature
-            # safeTransferFrom(address,address,uint256)
-            function_signature = "0x42842e0e"
-            
-            # Encode parameters: from, to, tokenId
-            from_address_encoded = self.sender_address[2:].zfill(64)
-            to_address_encoded = to_address[2:].zfill(64)
-            token_id_encoded = hex(token_id)[2:].zfill(64)
-            
-            data = function_signature + from_address_encoded + to_address_encoded + token_id_encoded
-            
-            return self._send_transaction(nft_address, to_address, data, gas_price)
+            # `from` is the signer lane that ends up sending the transfer
+            def data(sender_address: str) -> str:
+                return encode_erc721_transfer(sender_address, to_address, token_id)
             
+            return self._send_transaction(nft_address, to_address, data, gas_price, affinity_key)
+        
         except Exception as e:
             return {
                 "success": False,
@@ -104,7 +107,8 @@ class BlockchainService:
         to_address: str,
         token_id: int,
         amount: int = 1,
-        gas_price: Optional[int] = None
+        gas_price: Optional[int] = None,
+        affinity_key: Optional[str] = None
     ) -> Dict:
         """
         Send ERC-1155 NFT
@@ -115,87 +119,338 @@ class BlockchainService:
             token_id: NFT token ID
             amount: Amount of tokens (usually 1 for NFTs)
             gas_price: Optional gas price in wei
+            affinity_key: Optional key for pinning the transfer to a signer lane
         
         Returns:
             Dict with transaction hash or error
         """
         try:
-            # ERC-1155 safeTransferFrom function signature
-            # safeTransferFrom(address,address,uint256,uint256,bytes)
-            function_signature = "0xf242432a"
-            
-            # Encode parameters: from, to, id, amount, data (empty bytes)
-            from_address_encoded = self.sender_address[2:].zfill(64)
-            to_address_encoded = to_address[2:].zfill(64)
-            token_id_encoded = hex(token_id)[2:].zfill(64)
-            amount_encoded = hex(amount)[2:].zfill(64)
-            data_encoded = "80"  # Empty bytes (0x80 = 0 length)
-            
-            data = function_signature + from_address_encoded + to_address_encoded + token_id_encoded + amount_encoded + data_encoded
-            
-            return self._send_transaction(nft_address, to_address, data, gas_price)
+            # `from` is the signer lane that ends up sending the transfer
+            def data(sender_address: str) -> str:
+                return encode_erc1155_transfer(sender_address, to_address, token_id, amount)
             
+            return self._send_transaction(nft_address, to_address, data, gas_price, affinity_key)
+        
         except Exception as e:
             return {
                 "success": False,
                 "error": f"Error sending ERC-1155 NFT: {str(e)}"
             }
     
+    async def send_erc20_token_async(
+        self,
+        token_address: str,
+        to_address: str,
+        amount: int,
+        gas_price: Optional[int] = None,
+        affinity_key: Optional[str] = None,
+        on_signed: Optional[SignedCallback] = None,
+        claim_id: Optional[int] = None
+    ) -> Dict:
+        """Variant of send_erc20_token that signs and broadcasts through the transaction pipeline"""
+        try:
+            data = encode_erc20_transfer(to_address, amount)
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Error sending ERC-20 token: {str(e)}"
+            }
+        
+        return await self._submit_transaction(token_address, data, gas_price, affinity_key, on_signed, claim_id)
+    
+    async def send_erc721_nft_async(
+        self,
+        nft_address: str,
+        to_address: str,
+        token_id: int,
+        gas_price: Optional[int] = None,
+        affinity_key: Optional[str] = None,
+        on_signed: Optional[SignedCallback] = None,
+        claim_id: Optional[int] = None
+    ) -> Dict:
+        """Variant of send_erc721_nft that signs and broadcasts through the transaction pipeline"""
+        def data(sender_address: str) -> str:
+            return encode_erc721_transfer(sender_address, to_address, token_id)
+        
+        return await self._submit_transaction(nft_address, data, gas_price, affinity_key, on_signed, claim_id)
+    
+    async def send_erc1155_nft_async(
+        self,
+        nft_address: str,
+        to_address: str,
+        token_id: int,
+        amount: int = 1,
+        gas_price: Optional[int] = None,
+        affinity_key: Optional[str] = None,
+        on_signed: Optional[SignedCallback] = None,
+        claim_id: Optional[int] = None
+    ) -> Dict:
+        """Variant of send_erc1155_nft that signs and broadcasts through the transaction pipeline"""
+        def data(sender_address: str) -> str:
+            return encode_erc1155_transfer(sender_address, to_address, token_id, amount)
+        
+        return await self._submit_transaction(nft_address, data, gas_price, affinity_key, on_signed, claim_id)
+    
+    def prepare_transaction(
+        self,
+        lane: SignerLane,
+        contract_address: str,
+        data: CalldataSource,
+        gas_price: Optional[int] = None
+    ) -> Dict:
+        """
+        Build an unsigned transaction for a signer lane (blocking RPC calls)
+        
+        Args:
+            lane: Signer lane that will send the transaction
+            contract_address: Target contract
+            data: Calldata, or a builder taking the sender address
+            gas_price: Optional gas price in wei
+        
+        Returns:
+            Transaction dict with nonce, gas and chain id filled in
+        """
+        calldata = data(lane.address) if callable(data) else data
+        gas_price = gas_price or self._rpc("eth_gasPrice", lambda: self.w3.eth.gas_price)
+        
+        # Reserve the lane's next nonce last, so a failing RPC call above cannot waste it
+        nonce = lane.reserve_nonce(lambda: self._rpc(
+            "eth_getTransactionCount",
+            self.w3.eth.get_transaction_count,
+            lane.address,
+            "pending"
+        ))
+        
+        # Build transaction
+        transaction = {
+            "to": contract_address,
+            "data": calldata,
+            "gas": 100000,  # Default gas limit
+            "gasPrice": gas_price,
+            "nonce": nonce,
+            "chainId": self.chain_id
+        }
+        
+        # Estimate gas
+        try:
+            estimated_gas = self._rpc(
+                "eth_estimateGas",
+                self.w3.eth.estimate_gas,
+                {**transaction, "from": lane.address}
+            )
+            transaction["gas"] = estimated_gas
+        except:
+            pass  # Use default if estimation fails
+        
+        return transaction
+    
     def _send_transaction(
         self,
         contract_address: str,
         to_address: str,
-        data: str,
-        gas_price: Optional[int] = None
+        data: CalldataSource,
+        gas_price: Optional[int] = None,
+        affinity_key: Optional[str] = None
     ) -> Dict:
-        """Internal method to send a transaction"""
-        if not self.account:
+        """Internal method to send a transaction from one of the signer lanes"""
+        if not self.signer_pool.lanes:
             return {
                 "success": False,
                 "error": "Private key not configured"
             }
         
-        try:
-            # Get nonce
-            nonce = self.w3.eth.get_transaction_count(self.sender_address)
-            
-            # Build transaction
-            transaction = {
-                "to": contract_address,
-                "data": data,
-                "gas": 100000,  # Default gas limit
-                "gasPrice": gas_price or self.w3.eth.gas_price,
-                "nonce": nonce,
-                "chainId": self.w3.eth.chain_id
+        lane = self.signer_pool.acquire(self.w3, affinity_key)
+        if lane is None:
+            return {
+                "success": False,
+                "error": "No healthy signer available"
             }
-            
-            # Estimate gas
+        
+        success = False
+        error = None
+        unused_nonce = None
+        transaction = None
+        signed_txn = None
+        with tracer.start_span(
+            "BlockchainService._send_transaction",
+            {"eth.contract": contract_address, "eth.sender": lane.address, "eth.signer_lane": lane.index}
+        ) as span:
             try:
-                estimated_gas = self.w3.eth.estimate_gas(transaction)
-                transaction["gas"] = estimated_gas
-            except:
-                pass  # Use default if estimation fails
-            
-            # Sign transaction
-            signed_txn = self.account.sign_transaction(transaction)
-            
-            # Send transaction
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+                transaction = self.prepare_transaction(lane, contract_address, data, gas_price)
+                
+                # Sign transaction
+                with tracer.start_span("eth.sign_transaction"):
+                    signed_txn = lane.account.sign_transaction(transaction)
+                
+                # Send transaction
+                tx_hash = self._rpc(
+                    "eth_sendRawTransaction",
+                    self.w3.eth.send_raw_transaction,
+                    signed_txn.rawTransaction
+                )
+                success = True
+                self.watchdog.track(self, lane, transaction, tx_hash.hex())
+                self.watchdog.ensure_started()
+                
+                if span is not None:
+                    span.set_attribute("eth.nonce", transaction["nonce"])
+                    span.set_attribute("eth.tx_hash", tx_hash.hex())
+                return {
+                    "success": True,
+                    "transaction_hash": tx_hash.hex(),
+                    "sender_address": lane.address,
+                    "nonce": transaction["nonce"],
+                    "gas_price": transaction["gasPrice"]
+                }
             
+            except Exception as e:
+                error = str(e)
+                if span is not None:
+                    span.record_error(e)
+                if transaction is not None and (signed_txn is None or isinstance(e, CircuitOpenError)):
+                    # Failed before reaching any node: the nonce can be reused
+                    unused_nonce = transaction["nonce"]
+                return {
+                    "success": False,
+                    "error": f"Transaction failed: {str(e)}",
+                    # Nothing was sent: the RPC breaker is open
+                    "retryable": isinstance(e, CircuitOpenError)
+                }
+            finally:
+                self.signer_pool.release(lane, success, error, unused_nonce)
+    
+    async def _submit_transaction(
+        self,
+        contract_address: str,
+        data: CalldataSource,
+        gas_price: Optional[int] = None,
+        affinity_key: Optional[str] = None,
+        on_signed: Optional[SignedCallback] = None,
+        claim_id: Optional[int] = None
+    ) -> Dict:
+        """Prepare the transaction off the event loop, then sign and broadcast it through the pipeline"""
+        if not self.signer_pool.lanes:
             return {
-                "success": True,
-                "transaction_hash": tx_hash.hex()
+                "success": False,
+                "error": "Private key not configured"
             }
-            
-        except Exception as e:
+        
+        lane = await asyncio.to_thread(self.signer_pool.acquire, self.w3, affinity_key)
+        if lane is None:
             return {
                 "success": False,
-                "error": f"Transaction failed: {str(e)}"
+                "error": "No healthy signer available"
             }
+        
+        result: Dict = {"success": False, "error": "Transaction failed"}
+        unused_nonce = None
+        with tracer.start_span(
+            "BlockchainService._submit_transaction",
+            {"eth.contract": contract_address, "eth.sender": lane.address, "eth.signer_lane": lane.index}
+        ) as span:
+            try:
+                transaction = await asyncio.to_thread(
+                    self.prepare_transaction, lane, contract_address, data, gas_price
+                )
+                result = await self.pipeline.submit(lane, transaction, on_signed)
+                if result.get("broadcast") is False:
+                    unused_nonce = transaction["nonce"]
+                if result.get("success"):
+                    result["gas_price"] = transaction["gasPrice"]
+                    self.watchdog.track(self, lane, transaction, result["transaction_hash"], claim_id)
+                    self.watchdog.ensure_started()
+                if span is not None:
+                    span.set_attribute("eth.nonce", transaction["nonce"])
+                    if not result.get("success"):
+                        span.error = result.get("error")
+                return result
+            
+            except Exception as e:
+                if span is not None:
+                    span.record_error(e)
+                result = {
+                    "success": False,
+                    "error": f"Transaction failed: {str(e)}",
+                    # Nothing was sent: the RPC breaker is open
+                    "retryable": isinstance(e, CircuitOpenError)
+                }
+                return result
+            finally:
+                self.signer_pool.release(lane, result.get("success", False), result.get("error"), unused_nonce)
+    
+    def rebroadcast_transaction(self, raw_transaction: str, tx_hashes: List[str]) -> Dict:
+        """
+        Send a transaction signed by an earlier attempt again, instead of signing a new one
+        
+        Args:
+            raw_transaction: Signed transaction as stored before its first broadcast
+            tx_hashes: Hashes it may have been mined under: its own, then
+                those of fee-bumped versions it replaced or was replaced by
+        
+        Returns:
+            Dict with the transaction hash, or an error; "nonce_consumed" is
+            set when the nonce was mined by a transaction that is not one of
+            these, so none of them can ever be mined and a new send is safe
+        """
+        for tx_hash in tx_hashes:
+            if self.get_transaction_receipt(tx_hash) is not None:
+                return {"success": True, "transaction_hash": tx_hash}
+        
+        try:
+            tx_hash = self._rpc("eth_sendRawTransaction", self.w3.eth.send_raw_transaction, raw_transaction)
+            return {"success": True, "transaction_hash": tx_hash.hex()}
+        except CircuitOpenError as e:
+            return {"success": False, "error": f"Transaction failed: {str(e)}", "retryable": True}
+        except Exception as e:
+            message = str(e).lower()
+            if "already known" in message or "known transaction" in message or "underpriced" in message:
+                # This transaction, or a fee-bumped version of it, is still in the mempool
+                return {"success": True, "transaction_hash": tx_hashes[0]}
+            if "nonce too low" in message:
+                for tx_hash in tx_hashes:
+                    if self.get_transaction_receipt(tx_hash) is not None:
+                        return {"success": True, "transaction_hash": tx_hash}
+                return {
+                    "success": False,
+                    "error": "The transaction's nonce was used by another transaction",
+                    "nonce_consumed": True
+                }
+            return {"success": False, "error": f"Rebroadcast failed: {str(e)}"}
+    
+    def warm_up(self) -> None:
+        """Open the RPC connection and cache the chain id before the first send"""
+        try:
+            self.chain_id
+        except Exception as e:
+            logger.warning(f"Could not reach the RPC endpoint during warm-up: {str(e)}")
+    
+    async def close(self) -> None:
+        """Stop the background send stages"""
+        await self.watchdog.stop()
+        await self.pipeline.stop()
+    
+    @property
+    def chain_id(self) -> int:
+        """Chain id of the connected network (fetched once)"""
+        if self._chain_id is None:
+            self._chain_id = self._rpc("eth_chainId", lambda: self.w3.eth.chain_id)
+        return self._chain_id
+    
+    def _rpc(self, method: str, fn, *args):
+        """
+        Run a single JSON-RPC call inside its own client span, through the RPC circuit breaker
+        
+        Transport errors (connection failures, timeouts, HTTP errors) count
+        against the breaker; JSON-RPC error answers (reverts, nonce too low)
+        come from a healthy node and do not.
+        """
+        with tracer.start_span(method, {"rpc.system": "jsonrpc", "rpc.method": method}, kind=SPAN_KIND_CLIENT):
+            with record_wait("rpc", method):
+                return self.rpc_breaker.call(fn, *args, is_failure=lambda e: isinstance(e, OSError))
     
     def get_transaction_receipt(self, tx_hash: str) -> Optional[Dict]:
         """Get transaction receipt"""
         try:
-            return self.w3.eth.get_transaction_receipt(tx_hash)
+            return self._rpc("eth_getTransactionReceipt", self.w3.eth.get_transaction_receipt, tx_hash)
         except:
             return None
@@ -0,0 +1,98 @@
+from functools import lru_cache
+from typing import Dict, Union
+
+WORD_SIZE = 32
+MAX_UINT256 = 2 ** 256 - 1
+
+# Function selectors
+ERC20_TRANSFER_SELECTOR = bytes.fromhex("a9059cbb")  # transfer(address,uint256)
+ERC721_SAFE_TRANSFER_SELECTOR = bytes.fromhex("42842e0e")  # safeTransferFrom(address,address,uint256)
+ERC1155_SAFE_TRANSFER_SELECTOR = bytes.fromhex("f242432a")  # safeTransferFrom(address,address,uint256,uint256,bytes)
+
+
+def address_to_int(address: str) -> int:
+    """Convert a 0x-prefixed 20-byte address to an integer ABI word value"""
+    value = address[2:] if address[:2].lower() == "0x" else address
+    if len(value) != 40:
+        raise ValueError(f"Invalid address: {address}")
+    return int(value, 16)
+
+
+class CalldataTemplate:
+    """
+    Precompiled ABI calldata for a fixed-size call
+
+    The selector and all constant words are encoded once; rendering only
+    copies the template and overwrites the variable 32-byte slots.
+    """
+
+    def __init__(self, selector: bytes, word_count: int, fixed_words: Dict[int, int]):
+        self.word_count = word_count
+        template = bytearray(selector + bytes(WORD_SIZE * word_count))
+        for index, value in fixed_words.items():
+            self._patch(template, index, value)
+        self._template = bytes(template)
+
+    @staticmethod
+    def _patch(buffer: bytearray, index: int, value: int) -> None:
+        if value < 0 or value > MAX_UINT256:
+            raise ValueError(f"ABI word out of range: {value}")
+        start = 4 + index * WORD_SIZE
+        buffer[start:start + WORD_SIZE] = value.to_bytes(WORD_SIZE, "big")
+
+    def render(self, words: Dict[int, Union[int, str]]) -> str:
+        """
+        Render calldata with the given variable slots
+
+        Args:
+            words: Mapping of word index to an int value or a 0x address
+
+        Returns:
+            0x-prefixed hex calldata
+        """
+        buffer = bytearray(self._template)
+        for index, value in words.items():
+            if isinstance(value, str):
+                value = address_to_int(value)
+            self._patch(buffer, index, value)
+        return "0x" + buffer.hex()
+
+
+# transfer(to, amount)
+ERC20_TRANSFER = CalldataTemplate(ERC20_TRANSFER_SELECTOR, 2, {})
+
+
+@lru_cache(maxsize=64)
+def erc721_transfer_template(sender_address: str) -> CalldataTemplate:
+    """safeTransferFrom(from, to, tokenId) with `from` fixed to the sender"""
+    return CalldataTemplate(
+        ERC721_SAFE_TRANSFER_SELECTOR, 3, {0: address_to_int(sender_address)}
+    )
+
+
+@lru_cache(maxsize=64)
+def erc1155_transfer_template(sender_address: str) -> CalldataTemplate:
+    """
+    safeTransferFrom(from, to, id, amount, data) with `from` fixed to the sender
+
+    `data` is an empty dynamic `bytes`: its head word is the offset of the
+    tail (5 head words = 0xa0) and the tail is a single zero length word.
+    """
+    return CalldataTemplate(
+        ERC1155_SAFE_TRANSFER_SELECTOR, 6, {0: address_to_int(sender_address), 4: 5 * WORD_SIZE}
+    )
+
+
+def encode_erc20_transfer(to_address: str, amount: int) -> str:
+    """Calldata for ERC-20 transfer(to, amount)"""
+    return ERC20_TRANSFER.render({0: to_address, 1: amount})
+
+
+def encode_erc721_transfer(sender_address: str, to_address: str, token_id: int) -> str:
+    """Calldata for ERC-721 safeTransferFrom(from, to, tokenId)"""
+    return erc721_transfer_template(sender_address).render({1: to_address, 2: token_id})
+
+
+def encode_erc1155_transfer(sender_address: str, to_address: str, token_id: int, amount: int) -> str:
+    """Calldata for ERC-1155 safeTransferFrom(from, to, id, amount, "")"""
+    return erc1155_transfer_template(sender_address).render({1: to_address, 2: token_id, 3: amount})
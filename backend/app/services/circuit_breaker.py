@@ -0,0 +1,203 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple, TypeVar
+from app.config.logging import logger
+from app.config.metrics import metrics
+
+T = TypeVar("T")
+
+# Defaults for every breaker; each breaker also reads <NAME>_BREAKER_* overrides
+BREAKER_WINDOW_SIZE = int(os.getenv("BREAKER_WINDOW_SIZE", "20"))
+BREAKER_MINIMUM_CALLS = int(os.getenv("BREAKER_MINIMUM_CALLS", "10"))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_CALL_RATE = float(os.getenv("BREAKER_SLOW_CALL_RATE", "0.8"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+BREAKER_HALF_OPEN_CALLS = int(os.getenv("BREAKER_HALF_OPEN_CALLS", "3"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Gauge values of the states
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+calls_counter = metrics.counter(
+    "circuit_breaker_calls_total",
+    "Calls through a circuit breaker by outcome (success, failure, slow, rejected)",
+    ["breaker", "outcome"]
+)
+transitions_counter = metrics.counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state changes", ["breaker", "state"]
+)
+state_gauge = metrics.gauge("circuit_breaker_state", "Circuit breaker state (0 closed, 1 half open, 2 open)", ["breaker"])
+state_gauge.set_function(lambda: {
+    (name,): STATE_VALUES[breaker.state] for name, breaker in list(circuit_breakers.items())
+})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+    def __init__(self, breaker: str, retry_after: float):
+        super().__init__(f"{breaker} is unavailable (circuit open, retry in {retry_after:.1f}s)")
+        self.breaker = breaker
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while an upstream is failing or too slow
+
+    Closed: calls go through and their outcomes fill a window of the last
+    window_size calls. Once the window holds minimum_calls outcomes and the
+    failure rate, or the rate of calls slower than slow_call_seconds,
+    reaches its threshold, the breaker opens.
+    Open: calls are rejected with CircuitOpenError for open_seconds.
+    Half open: up to half_open_calls probe calls go through; all of them
+    succeeding closes the breaker, any failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slow_call_seconds: float,
+        window_size: int = BREAKER_WINDOW_SIZE,
+        minimum_calls: int = BREAKER_MINIMUM_CALLS,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        slow_call_rate: float = BREAKER_SLOW_CALL_RATE,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+        half_open_calls: int = BREAKER_HALF_OPEN_CALLS
+    ):
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds
+        self.minimum_calls = minimum_calls
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._lock = threading.Lock()
+        # (failed, slow) of the latest calls
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_succeeded = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker lets a probe through (0 unless open)"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def _transition(self, state: str) -> None:
+        previous, self._state = self._state, state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state == HALF_OPEN:
+            self._probes_started = 0
+            self._probes_succeeded = 0
+        if state == CLOSED:
+            self._window.clear()
+        transitions_counter.inc(breaker=self.name, state=state)
+        log = logger.warning if state == OPEN else logger.info
+        log(f"Circuit breaker {self.name}: {previous} -> {state}")
+
+    def before_call(self) -> None:
+        """Admit a call or raise CircuitOpenError; every admitted call must be recorded"""
+        with self._lock:
+            if self._state == OPEN:
+                waited = time.monotonic() - self._opened_at
+                if waited < self.open_seconds:
+                    calls_counter.inc(breaker=self.name, outcome="rejected")
+                    raise CircuitOpenError(self.name, self.open_seconds - waited)
+                self._transition(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._probes_started >= self.half_open_calls:
+                    calls_counter.inc(breaker=self.name, outcome="rejected")
+                    raise CircuitOpenError(self.name, self.open_seconds)
+                self._probes_started += 1
+
+    def record(self, success: bool, duration: float) -> None:
+        """Record the outcome of an admitted call"""
+        slow = duration >= self.slow_call_seconds
+        calls_counter.inc(breaker=self.name, outcome="failure" if not success else "slow" if slow else "success")
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if not success or slow:
+                    self._transition(OPEN)
+                else:
+                    self._probes_succeeded += 1
+                    if self._probes_succeeded >= self.half_open_calls:
+                        self._transition(CLOSED)
+                return
+            if self._state == OPEN:
+                return
+
+            self._window.append((not success, slow))
+            if len(self._window) < self.minimum_calls:
+                return
+            failures = sum(1 for failed, _ in self._window if failed)
+            slow_calls = sum(1 for _, was_slow in self._window if was_slow)
+            if failures / len(self._window) >= self.failure_rate or slow_calls / len(self._window) >= self.slow_call_rate:
+                self._transition(OPEN)
+
+    def call(self, fn: Callable[..., T], *args, is_failure: Optional[Callable[[Exception], bool]] = None) -> T:
+        """
+        Run fn through the breaker
+
+        Exceptions are re-raised; they count as failures unless is_failure
+        says otherwise (e.g. an error answer from a healthy upstream).
+        """
+        self.before_call()
+        started = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception as e:
+            self.record(is_failure is not None and not is_failure(e), time.perf_counter() - started)
+            raise
+        self.record(True, time.perf_counter() - started)
+        return result
+
+
+# Breakers of this process, by name
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str, slow_call_seconds: float) -> CircuitBreaker:
+    """
+    Process-wide breaker for an upstream, created on first use
+
+    Settings come from the BREAKER_* defaults, overridden per upstream by
+    <NAME>_BREAKER_FAILURE_RATE, <NAME>_BREAKER_OPEN_SECONDS, etc.
+    """
+    with _registry_lock:
+        breaker = circuit_breakers.get(name)
+        if breaker is None:
+            prefix = f"{name.upper()}_BREAKER"
+
+            def setting(key: str, default, cast):
+                value = os.getenv(f"{prefix}_{key}")
+                return cast(value) if value is not None else default
+
+            breaker = circuit_breakers[name] = CircuitBreaker(
+                name,
+                slow_call_seconds=setting("SLOW_CALL_SECONDS", slow_call_seconds, float),
+                window_size=setting("WINDOW_SIZE", BREAKER_WINDOW_SIZE, int),
+                minimum_calls=setting("MINIMUM_CALLS", BREAKER_MINIMUM_CALLS, int),
+                failure_rate=setting("FAILURE_RATE", BREAKER_FAILURE_RATE, float),
+                slow_call_rate=setting("SLOW_CALL_RATE", BREAKER_SLOW_CALL_RATE, float),
+                open_seconds=setting("OPEN_SECONDS", BREAKER_OPEN_SECONDS, float),
+                half_open_calls=setting("HALF_OPEN_CALLS", BREAKER_HALF_OPEN_CALLS, int)
+            )
+        return breaker
@@ -0,0 +1,209 @@
+import asyncio
+import json
+from typing import Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+from sqlalchemy.types import Text
+from app.config.database import SessionLocal, engine
+from app.config.logging import logger
+from app.models.claim import Claim
+
+# Postgres NOTIFY channel carrying claim status changes between nodes
+CLAIM_STATUS_CHANNEL = "claim_status"
+# Events buffered per subscriber before the oldest ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+# Payloads sent per pg_notify round trip
+NOTIFY_BATCH_SIZE = 1000
+LISTEN_RECONNECT_SECONDS = 5
+
+SubscriptionKey = Tuple[int, int]
+
+
+# Columns returned by bulk status updates to build their claim events
+CLAIM_EVENT_COLUMNS = (
+    Claim.id, Claim.event_id, Claim.participant_id, Claim.reward_id,
+    Claim.status, Claim.transaction_hash, Claim.error_message
+)
+
+NOTIFY_BATCH = text("SELECT pg_notify(:channel, payload) FROM unnest(:payloads) AS payload").bindparams(
+    bindparam("payloads", type_=ARRAY(Text))
+)
+
+
+def claim_event(claim) -> Dict:
+    """Status change payload for a claim (also the NOTIFY payload)"""
+    return {
+        "claim_id": claim.id,
+        "event_id": claim.event_id,
+        "participant_id": claim.participant_id,
+        "reward_id": claim.reward_id,
+        "status": claim.status.value if hasattr(claim.status, "value") else claim.status,
+        "transaction_hash": claim.transaction_hash,
+        "error_message": claim.error_message,
+    }
+
+
+class ClaimEventHub:
+    """
+    Fans claim status changes out to subscribers of this process
+
+    Subscribers are asyncio queues keyed by (event_id, participant_id), so an
+    idle subscriber costs one queue and nothing else. On Postgres every change
+    is sent with NOTIFY inside the transaction that made it and comes back to
+    every node (this one included) through a single LISTEN connection per
+    process, watched by the event loop rather than a polling thread. Other
+    databases only deliver locally, after commit.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[SubscriptionKey, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listen_connection = None
+        self._listening = False
+
+    @property
+    def uses_notify(self) -> bool:
+        return engine.dialect.name == "postgresql"
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, event_id: int, participant_id: int) -> asyncio.Queue:
+        """Register a queue receiving the participant's claim events for an event"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault((event_id, participant_id), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, event_id: int, participant_id: int, queue: asyncio.Queue) -> None:
+        key = (event_id, participant_id)
+        queues = self._subscribers.get(key)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[key]
+
+    def publish(self, db: Session, payloads: Iterable[Dict]) -> None:
+        """
+        Announce claim status changes made in the session's current transaction
+
+        Delivery happens only once the transaction commits: NOTIFY is
+        transactional on Postgres, and elsewhere the payloads wait for the
+        session's after_commit hook.
+
+        Args:
+            db: Session that made the changes
+            payloads: Payloads built with claim_event()
+        """
+        payloads = list(payloads)
+        if not payloads:
+            return
+        if self.uses_notify:
+            # Bulk updates (e.g. dispatching a whole event) announce thousands of claims at once
+            for start in range(0, len(payloads), NOTIFY_BATCH_SIZE):
+                db.execute(NOTIFY_BATCH, {
+                    "channel": CLAIM_STATUS_CHANNEL,
+                    "payloads": [json.dumps(payload) for payload in payloads[start:start + NOTIFY_BATCH_SIZE]]
+                })
+        else:
+            db.info.setdefault("claim_events", []).extend(payloads)
+
+    def deliver(self, payload: Dict) -> None:
+        """Hand a payload to this process's subscribers (safe from any thread)"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._dispatch(payload)
+        else:
+            loop.call_soon_threadsafe(self._dispatch, payload)
+
+    def _dispatch(self, payload: Dict) -> None:
+        queues = self._subscribers.get((payload.get("event_id"), payload.get("participant_id")))
+        if not queues:
+            return
+        for queue in list(queues):
+            if queue.full():
+                # Slow client: drop its oldest event rather than grow without bound
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+    def start(self) -> None:
+        """Bind to the running event loop and start listening for other nodes"""
+        self._loop = asyncio.get_running_loop()
+        if self.uses_notify and not self._listening:
+            self._listening = True
+            self._connect()
+
+    def stop(self) -> None:
+        self._listening = False
+        self._disconnect()
+
+    def _connect(self) -> None:
+        if not self._listening:
+            return
+        try:
+            # A dedicated connection outside the pool, held for the process lifetime
+            pooled = engine.raw_connection()
+            pooled.detach()
+            connection = pooled.driver_connection
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CLAIM_STATUS_CHANNEL}")
+        except Exception as e:
+            logger.error(f"Could not LISTEN for claim events: {str(e)}")
+            self._loop.call_later(LISTEN_RECONNECT_SECONDS, self._connect)
+            return
+        self._listen_connection = connection
+        self._loop.add_reader(connection.fileno(), self._on_notify)
+        logger.info(f"Listening for claim events on channel {CLAIM_STATUS_CHANNEL}")
+
+    def _disconnect(self) -> None:
+        connection = self._listen_connection
+        self._listen_connection = None
+        if connection is None:
+            return
+        try:
+            self._loop.remove_reader(connection.fileno())
+        except Exception:
+            pass
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _on_notify(self) -> None:
+        connection = self._listen_connection
+        try:
+            connection.poll()
+        except Exception as e:
+            logger.error(f"Claim event listener connection lost: {str(e)}")
+            self._disconnect()
+            self._loop.call_later(LISTEN_RECONNECT_SECONDS, self._connect)
+            return
+        while connection.notifies:
+            notification = connection.notifies.pop(0)
+            try:
+                payload = json.loads(notification.payload)
+            except ValueError:
+                continue
+            self._dispatch(payload)
+
+
+claim_event_hub = ClaimEventHub()
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _deliver_committed_claim_events(session):
+    for payload in session.info.pop("claim_events", []):
+        claim_event_hub.deliver(payload)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_rolled_back_claim_events(session):
+    session.info.pop("claim_events", None)
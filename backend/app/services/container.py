@@ -0,0 +1,92 @@
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Optional
+from fastapi import Request
+from app.config.logging import logger
+from app.config.worker import worker_settings
+from app.services.claim_events import claim_event_hub
+from app.services.worldid_service import WorldIDService
+from app.workers.claim_worker import ClaimWorker, start_local_worker, stop_local_worker
+
+if TYPE_CHECKING:
+    from app.services.blockchain_service import BlockchainService
+
+
+class ServiceContainer:
+    """
+    Service clients shared by every request in this process
+
+    Built once when the app starts (see the lifespan in app.main), so requests
+    reuse the same HTTP connection pools, signer pool and send pipeline
+    instead of constructing them per call.
+
+    The blockchain client is created on first use: importing web3 takes
+    seconds, and API nodes that leave sending to dedicated workers never
+    need it.
+    """
+
+    def __init__(self):
+        self.worldid_service: Optional[WorldIDService] = None
+        self.claim_worker: Optional[ClaimWorker] = None
+        self._blockchain_service: Optional["BlockchainService"] = None
+        self._warm_up_task: Optional[asyncio.Task] = None
+        self._blockchain_service_lock = threading.Lock()
+
+    @property
+    def blockchain_service(self) -> "BlockchainService":
+        # Built from the warm-up task and worker threads alike
+        with self._blockchain_service_lock:
+            if self._blockchain_service is None:
+                from app.services.blockchain_service import BlockchainService
+                self._blockchain_service = BlockchainService()
+            return self._blockchain_service
+
+    async def start(self) -> None:
+        """Build the clients, pre-warm their connections and start background tasks"""
+        self.worldid_service = WorldIDService()
+
+        claim_event_hub.start()
+        if worker_settings.CLAIM_WORKER_ENABLED:
+            # Every API node also works the claim queue; set CLAIM_WORKER_ENABLED=false
+            # to leave it to dedicated `python -m app.workers.claim_worker` processes
+            self.claim_worker = start_local_worker(lambda: self.blockchain_service)
+
+        # Pay the imports and TCP/TLS handshakes after startup rather than on the
+        # first requests, without holding up the first request either
+        self._warm_up_task = asyncio.get_running_loop().create_task(self._warm_up(), name="services-warm-up")
+        logger.info("Service container started")
+
+    async def _warm_up(self) -> None:
+        warm_ups = [asyncio.to_thread(self.worldid_service.warm_up)]
+        if worker_settings.CLAIM_WORKER_ENABLED:
+            warm_ups.append(self._warm_up_blockchain())
+        await asyncio.gather(*warm_ups, return_exceptions=True)
+
+    async def _warm_up_blockchain(self) -> None:
+        blockchain_service = await asyncio.to_thread(lambda: self.blockchain_service)
+        await asyncio.to_thread(blockchain_service.warm_up)
+        await blockchain_service.pipeline.start()
+
+    async def close(self) -> None:
+        """Stop background tasks and close connection pools"""
+        if self._warm_up_task is not None:
+            self._warm_up_task.cancel()
+            await asyncio.gather(self._warm_up_task, return_exceptions=True)
+        await stop_local_worker()
+        self.claim_worker = None
+        claim_event_hub.stop()
+        if self._blockchain_service is not None:
+            await self._blockchain_service.close()
+        if self.worldid_service is not None:
+            self.worldid_service.close()
+        logger.info("Service container closed")
+
+
+def get_worldid_service(request: Request) -> WorldIDService:
+    """Dependency returning the process-wide WorldID client"""
+    return request.app.state.services.worldid_service
+
+
+def get_blockchain_service(request: Request) -> "BlockchainService":
+    """Dependency returning the process-wide blockchain client"""
+    return request.app.state.services.blockchain_service
@@ -0,0 +1,140 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.config.logging import logger
+from app.config.worker import WorkerSettings, worker_settings
+from app.models.claim import Claim, ClaimStatus
+from app.models.event import Event
+from app.models.event_participant import EventParticipant
+from app.models.participant import Participant
+from app.models.reward import Reward
+from app.services.claim_events import CLAIM_EVENT_COLUMNS, claim_event_hub, claim_event
+from app.services.stats_service import StatsService
+
+
+class EntitlementService:
+    """
+    Precomputed claims: every (participant, reward) pair of an event as an ENTITLED claim
+
+    Once an event's entitlements are snapshotted, claiming is one indexed
+    UPDATE flipping the participant's ENTITLED claims to PENDING, and an
+    organizer can dispatch all of them at once without waiting for
+    participants to claim. Claim workers never pick up ENTITLED claims.
+    """
+
+    @staticmethod
+    def snapshot(db: Session, event_id: int, participant_id: Optional[int] = None) -> int:
+        """
+        Insert the ENTITLED claims of an event (or of one participant of it) in one INSERT ... SELECT
+
+        Pairs that already have a claim, in whatever status, are left alone,
+        so the snapshot can be re-run. Runs in the caller's transaction.
+
+        Returns:
+            Number of claims created
+        """
+        pairs = select(
+            EventParticipant.event_id,
+            EventParticipant.participant_id,
+            Reward.id,
+            literal(ClaimStatus.ENTITLED.value, Claim.status.type)
+        ).join(Reward, Reward.event_id == EventParticipant.event_id).where(EventParticipant.event_id == event_id)
+        if participant_id is not None:
+            pairs = pairs.where(EventParticipant.participant_id == participant_id)
+
+        insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+        statement = insert(Claim).from_select(
+            ["event_id", "participant_id", "reward_id", "status"], pairs
+        ).on_conflict_do_nothing(index_elements=["event_id", "participant_id", "reward_id"])
+        created = db.execute(statement).rowcount
+        StatsService.record_claim_transition_count(db, event_id, None, ClaimStatus.ENTITLED, created)
+        return created
+
+    @staticmethod
+    def snapshot_event(db: Session, event_id: int) -> int:
+        """Snapshot an event's entitlements and mark the event as snapshotted; commits"""
+        created = EntitlementService.snapshot(db, event_id)
+        db.query(Event).filter(Event.id == event_id).update(
+            {Event.entitlements_snapshot_at: func.now()}, synchronize_session=False
+        )
+        db.commit()
+        logger.info(f"Snapshotted {created} claim entitlements for event {event_id}")
+        return created
+
+    @staticmethod
+    def snapshot_due_events(db: Session, settings: WorkerSettings = worker_settings) -> List[int]:
+        """Snapshot the entitlements of active events that have ended; returns their IDs"""
+        due = [
+            event_id for (event_id,) in db.query(Event.id).filter(
+                Event.entitlements_snapshot_at.is_(None),
+                Event.is_active == True,
+                Event.archived_at.is_(None),
+                Event.deleted_at.is_(None),
+                Event.end_date.isnot(None),
+                Event.end_date < datetime.now(timezone.utc)
+            ).order_by(Event.id).limit(settings.ENTITLEMENT_SNAPSHOT_BATCH_SIZE)
+        ]
+        snapshotted = []
+        for event_id in due:
+            try:
+                EntitlementService.snapshot_event(db, event_id)
+                snapshotted.append(event_id)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Snapshotting entitlements of event {event_id} failed: {e}", exc_info=True)
+        return snapshotted
+
+    @staticmethod
+    def claim(db: Session, event_id: int, world_id_hash: str, wallet_address: Optional[str] = None) -> List[Claim]:
+        """
+        Flip a participant's ENTITLED claims of an event to PENDING in one UPDATE ... RETURNING
+
+        The participant is found by world_id_hash (and must own wallet_address
+        when given). Runs in the caller's transaction.
+
+        Returns:
+            The claims now pending; empty when the participant has no
+            entitlements left (not joined, joined after the snapshot, or
+            already claimed)
+        """
+        participant = select(Participant.id).where(Participant.world_id_hash == world_id_hash)
+        if wallet_address is not None:
+            participant = participant.where(func.lower(Participant.wallet_address) == wallet_address.lower())
+
+        claims = db.scalars(
+            update(Claim).where(
+                Claim.event_id == event_id,
+                Claim.participant_id == participant.scalar_subquery(),
+                Claim.status == ClaimStatus.ENTITLED
+            ).values(status=ClaimStatus.PENDING, updated_at=func.now()).returning(Claim),
+            execution_options={"synchronize_session": False}
+        ).all()
+        StatsService.record_claim_transition_count(db, event_id, ClaimStatus.ENTITLED, ClaimStatus.PENDING, len(claims))
+        return claims
+
+    @staticmethod
+    def dispatch(db: Session, event_id: int) -> int:
+        """
+        Queue every ENTITLED claim of an event for sending, without waiting for participants
+
+        Participants watching their claims get the status change like on
+        claim(). Runs in the caller's transaction.
+
+        Returns:
+            Number of claims queued
+        """
+        queued = db.execute(
+            update(Claim).where(
+                Claim.event_id == event_id,
+                Claim.status == ClaimStatus.ENTITLED
+            ).values(status=ClaimStatus.PENDING, updated_at=func.now()).returning(*CLAIM_EVENT_COLUMNS),
+            execution_options={"synchronize_session": False}
+        ).all()
+        claim_event_hub.publish(db, [claim_event(row) for row in queued])
+        StatsService.record_claim_transition_count(
+            db, event_id, ClaimStatus.ENTITLED, ClaimStatus.PENDING, len(queued)
+        )
+        return len(queued)
@@ -0,0 +1,134 @@
+from typing import Dict, List
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+from app.config.database import SessionLocal
+from app.config.logging import logger
+from app.config.worker import WorkerSettings, worker_settings
+from app.models.claim import Claim, ClaimStatus
+from app.models.event import Event
+from app.models.event_participant import EventParticipant
+from app.models.event_rollup import EventRollup
+from app.models.event_stats import EventStats
+from app.models.reward import Reward
+from app.models.reward_inventory import RewardInventoryItem
+from app.services.claim_events import CLAIM_EVENT_COLUMNS, claim_event_hub, claim_event
+from app.services.stats_service import StatsService
+
+
+class EventDeletionService:
+    """
+    Deletes events in fixed-size chunks, one short transaction per chunk
+
+    Deleting the event row alone would cascade in the database, but as one
+    long transaction holding locks on every claim of a large event. Emptying
+    the big child tables chunk by chunk first keeps each transaction short
+    and memory use flat, whatever the size of the event.
+
+    Claim workers do not lease claims of deleted events, and the rows are
+    only removed once no claim of the event is being sent.
+    """
+
+    @staticmethod
+    def request_deletion(db: Session, event: Event) -> None:
+        """Hide the event, stop joins and claims and cancel queued sends; the rows are removed by delete_event"""
+        if event.deleted_at is None:
+            event.deleted_at = func.now()
+        event.is_active = False
+
+        cancelled = db.execute(
+            update(Claim)
+            .where(Claim.event_id == event.id, Claim.status == ClaimStatus.PENDING)
+            .values(status=ClaimStatus.FAILED, error_message="Event was deleted", updated_at=func.now())
+            .returning(*CLAIM_EVENT_COLUMNS)
+            .execution_options(synchronize_session=False)
+        ).all()
+        claim_event_hub.publish(db, [claim_event(row) for row in cancelled])
+        StatsService.record_claim_transition_count(
+            db, event.id, ClaimStatus.PENDING, ClaimStatus.FAILED, len(cancelled)
+        )
+        db.commit()
+
+    @staticmethod
+    def sending(db: Session, event_id: int) -> int:
+        """Claims of an event that a worker holds a live lease on, and may be sending"""
+        return db.query(func.count(Claim.id)).filter(
+            Claim.event_id == event_id,
+            Claim.status == ClaimStatus.PROCESSING,
+            Claim.lease_expires_at >= func.now()
+        ).scalar()
+
+    @staticmethod
+    def remaining(db: Session, event_id: int) -> Dict[str, int]:
+        """Rows still to delete for an event, per table"""
+        reward_ids = select(Reward.id).where(Reward.event_id == event_id).scalar_subquery()
+        return {
+            "claims": db.query(func.count(Claim.id)).filter(Claim.event_id == event_id).scalar(),
+            "participants": db.query(func.count(EventParticipant.id)).filter(
+                EventParticipant.event_id == event_id
+            ).scalar(),
+            "inventory": db.query(func.count(RewardInventoryItem.id)).filter(
+                RewardInventoryItem.reward_id.in_(reward_ids)
+            ).scalar(),
+        }
+
+    @staticmethod
+    def _delete_chunk(db: Session, model, condition, chunk_size: int) -> int:
+        chunk = select(model.id).where(condition).limit(chunk_size).scalar_subquery()
+        deleted = db.execute(delete(model).where(condition, model.id.in_(chunk))).rowcount
+        db.commit()
+        return deleted
+
+    @staticmethod
+    def delete_event(event_id: int, settings: WorkerSettings = worker_settings) -> bool:
+        """
+        Delete an event whose deletion was requested, chunk by chunk
+
+        Runs in its own session (as a background task or from the archiver,
+        which resumes deletions interrupted by a restart or put off because
+        claims of the event were still being sent).
+
+        Returns:
+            True once the event row is gone
+        """
+        chunk_size = settings.EVENT_DELETE_CHUNK_SIZE
+        db = SessionLocal()
+        try:
+            if not db.query(Event.id).filter(Event.id == event_id, Event.deleted_at.isnot(None)).first():
+                return False
+
+            # Their sends settle (or their leases run out) before the rows go
+            sending = EventDeletionService.sending(db, event_id)
+            if sending:
+                logger.info(f"Deleting event {event_id} put off: {sending} claims are being sent")
+                return False
+
+            reward_ids = select(Reward.id).where(Reward.event_id == event_id).scalar_subquery()
+            chunked = (
+                (Claim, Claim.event_id == event_id),
+                (EventParticipant, EventParticipant.event_id == event_id),
+                (RewardInventoryItem, RewardInventoryItem.reward_id.in_(reward_ids)),
+            )
+            for model, condition in chunked:
+                while EventDeletionService._delete_chunk(db, model, condition, chunk_size) >= chunk_size:
+                    pass
+
+            # What is left is small: a few rewards, stats shards and rollup buckets
+            db.execute(delete(EventRollup).where(EventRollup.event_id == event_id))
+            db.execute(delete(EventStats).where(EventStats.event_id == event_id))
+            db.execute(delete(Reward).where(Reward.event_id == event_id))
+            db.execute(delete(Event).where(Event.id == event_id))
+            db.commit()
+            logger.info(f"Deleted event {event_id}")
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Deleting event {event_id} failed: {e}", exc_info=True)
+            return False
+        finally:
+            db.close()
+
+    @staticmethod
+    def resume_deletions(db: Session, settings: WorkerSettings = worker_settings) -> List[int]:
+        """Finish deletions requested before a restart; returns the events deleted"""
+        pending = [event_id for (event_id,) in db.query(Event.id).filter(Event.deleted_at.isnot(None))]
+        return [event_id for event_id in pending if EventDeletionService.delete_event(event_id, settings)]
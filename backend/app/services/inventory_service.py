@@ -0,0 +1,132 @@
+from typing import List, Optional
+from sqlalchemy import select, update, func, literal, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.reward_inventory import RewardInventoryItem
+
+# Rows per INSERT when the database cannot generate the range itself
+BULK_INSERT_CHUNK = 10000
+
+
+class InventoryService:
+    """Service for allocating distinct NFT token IDs to claims"""
+
+    @staticmethod
+    def has_inventory(db: Session, reward_id: int) -> bool:
+        """Check whether any token IDs were ever stocked for a reward"""
+        return db.query(
+            exists().where(RewardInventoryItem.reward_id == reward_id)
+        ).scalar()
+
+    @staticmethod
+    def available_count(db: Session, reward_id: int) -> int:
+        """Number of token IDs not yet reserved"""
+        return db.query(func.count(RewardInventoryItem.id)).filter(
+            RewardInventoryItem.reward_id == reward_id,
+            RewardInventoryItem.claim_id.is_(None)
+        ).scalar()
+
+    @staticmethod
+    def load_range(db: Session, reward_id: int, start_token_id: int, end_token_id: int) -> int:
+        """
+        Stock an inclusive range of token IDs for a reward
+
+        Args:
+            db: Database session
+            reward_id: Reward to stock
+            start_token_id: First token ID
+            end_token_id: Last token ID (inclusive)
+
+        Returns:
+            Number of token IDs added (already stocked IDs are skipped)
+        """
+        if db.bind.dialect.name == "postgresql":
+            # Generate the range server-side: one statement regardless of size
+            series = func.generate_series(start_token_id, end_token_id).table_valued("value").render_derived()
+            result = db.execute(
+                pg_insert(RewardInventoryItem)
+                .from_select(
+                    ["reward_id", "token_id"],
+                    select(literal(reward_id), series.c.value)
+                )
+                .on_conflict_do_nothing(constraint="uq_reward_token_id")
+            )
+            return result.rowcount
+        return InventoryService.load_ids(db, reward_id, range(start_token_id, end_token_id + 1))
+
+    @staticmethod
+    def load_ids(db: Session, reward_id: int, token_ids) -> int:
+        """Stock an explicit list of token IDs, skipping ones already stocked"""
+        existing = {
+            int(token_id) for (token_id,) in db.query(RewardInventoryItem.token_id).filter(
+                RewardInventoryItem.reward_id == reward_id
+            )
+        }
+        rows: List[dict] = []
+        added = 0
+        for token_id in token_ids:
+            if token_id in existing:
+                continue
+            existing.add(token_id)
+            rows.append({"reward_id": reward_id, "token_id": token_id})
+            if len(rows) >= BULK_INSERT_CHUNK:
+                db.execute(RewardInventoryItem.__table__.insert(), rows)
+                added += len(rows)
+                rows = []
+        if rows:
+            db.execute(RewardInventoryItem.__table__.insert(), rows)
+            added += len(rows)
+        return added
+
+    @staticmethod
+    def reserve(db: Session, reward_id: int, claim_id: int) -> Optional[int]:
+        """
+        Reserve one free token ID for a claim
+
+        Concurrent reservers skip rows locked by each other (FOR UPDATE SKIP
+        LOCKED) instead of queueing on the same row, so each one gets a
+        distinct ID without serializing. The reservation is part of the
+        caller's transaction.
+
+        Args:
+            db: Database session
+            reward_id: Reward to allocate from
+            claim_id: Claim receiving the token
+
+        Returns:
+            The reserved token ID, or None if the inventory is exhausted
+        """
+        # Idempotent for retries of the same claim
+        already_reserved = db.query(RewardInventoryItem.token_id).filter(
+            RewardInventoryItem.claim_id == claim_id
+        ).scalar()
+        if already_reserved is not None:
+            return int(already_reserved)
+
+        free_item = (
+            select(RewardInventoryItem.id)
+            .where(
+                RewardInventoryItem.reward_id == reward_id,
+                RewardInventoryItem.claim_id.is_(None)
+            )
+            .order_by(RewardInventoryItem.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        token_id = db.execute(
+            update(RewardInventoryItem)
+            .where(RewardInventoryItem.id == free_item, RewardInventoryItem.claim_id.is_(None))
+            .values(claim_id=claim_id, reserved_at=func.now())
+            .returning(RewardInventoryItem.token_id)
+        ).scalar()
+        return int(token_id) if token_id is not None else None
+
+    @staticmethod
+    def release(db: Session, claim_id: int) -> None:
+        """Return a claim's token ID to the pool (e.g. after a failed transfer)"""
+        db.execute(
+            update(RewardInventoryItem)
+            .where(RewardInventoryItem.claim_id == claim_id)
+            .values(claim_id=None, reserved_at=None)
+        )
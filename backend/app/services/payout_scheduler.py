@@ -0,0 +1,215 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+from app.config.metrics import metrics
+from app.config.worker import WorkerSettings, worker_settings
+
+# Labelled by organizer only: event IDs would give every metric unbounded cardinality
+wait_histogram = metrics.histogram(
+    "payout_queue_wait_seconds",
+    "Time a prepared claim waited for a send slot",
+    ["organizer"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+)
+queue_depth_gauge = metrics.gauge("payout_queue_depth", "Claims waiting for a send slot", ["organizer"])
+dispatched_counter = metrics.counter("payout_dispatched_total", "Claims given a send slot", ["organizer"])
+in_flight_gauge = metrics.gauge("payout_sends_in_flight", "Sends holding a slot")
+
+
+def parse_organizer_values(value: str) -> Dict[int, float]:
+    """Parse "organizer_id:value,..." settings, e.g. "12:4,40:0.5\""""
+    parsed = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        organizer_id, _, number = item.partition(":")
+        parsed[int(organizer_id)] = float(number)
+    return parsed
+
+
+class OrganizerQueue:
+    """Waiting sends of one organizer, one FIFO per event served round-robin"""
+
+    def __init__(self, organizer_id: int, weight: float, rate: float):
+        self.organizer_id = organizer_id
+        self.weight = weight
+        self.rate = rate
+        self.tokens = max(1.0, rate)
+        self.refilled_at = time.monotonic()
+        # Virtual time at which this organizer's next send is due
+        self.finish_tag = 0.0
+        self.queued = 0
+        self.events: Dict[int, Deque[Tuple[asyncio.Future, float]]] = {}
+        self.rotation: Deque[int] = deque()
+
+    def push(self, event_id: int, waiter: asyncio.Future) -> None:
+        if event_id not in self.events:
+            self.events[event_id] = deque()
+            self.rotation.append(event_id)
+        self.events[event_id].append((waiter, time.monotonic()))
+        self.queued += 1
+
+    def pop(self) -> Optional[Tuple[asyncio.Future, float]]:
+        """Oldest live waiter of the next event in turn"""
+        while self.rotation:
+            event_id = self.rotation.popleft()
+            waiters = self.events[event_id]
+            entry = None
+            while waiters and entry is None:
+                candidate = waiters.popleft()
+                self.queued -= 1
+                if not candidate[0].done():
+                    entry = candidate
+            if waiters:
+                self.rotation.append(event_id)
+            else:
+                del self.events[event_id]
+            if entry is not None:
+                return entry
+        return None
+
+    def discard(self, waiter: asyncio.Future) -> None:
+        for event_id, waiters in list(self.events.items()):
+            for entry in waiters:
+                if entry[0] is waiter:
+                    waiters.remove(entry)
+                    self.queued -= 1
+                    if not waiters:
+                        del self.events[event_id]
+                        self.rotation.remove(event_id)
+                    return
+
+    def _refill(self, now: float) -> None:
+        if self.rate > 0:
+            self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+    def throttled_for(self, now: float) -> float:
+        """Seconds until the organizer's throughput cap allows another send"""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take_token(self) -> None:
+        if self.rate > 0:
+            self.tokens -= 1
+
+
+class PayoutScheduler:
+    """
+    Weighted fair queueing of reward sends across organizers and their events
+
+    Prepared claims wait here for one of PAYOUT_SEND_CONCURRENCY send slots.
+    A free slot goes to the backlogged organizer with the smallest virtual
+    finish tag; each send advances its organizer's tag by 1/weight, so
+    organizers share the slots in proportion to their PAYOUT_ORGANIZER_WEIGHTS
+    (default 1) however many claims each has queued. Within an organizer,
+    events take turns. An organizer over its throughput cap
+    (PAYOUT_ORGANIZER_RATE, or its PAYOUT_ORGANIZER_RATES entry, in sends per
+    second) is skipped until its token bucket refills. Caps and shares apply
+    per worker process.
+    """
+
+    def __init__(self, settings: WorkerSettings = worker_settings):
+        self.settings = settings
+        self.concurrency = settings.PAYOUT_SEND_CONCURRENCY
+        self.weights = parse_organizer_values(settings.PAYOUT_ORGANIZER_WEIGHTS)
+        self.rates = parse_organizer_values(settings.PAYOUT_ORGANIZER_RATES)
+        self.in_flight = 0
+        self._organizers: Dict[int, OrganizerQueue] = {}
+        self._backlogged: Set[int] = set()
+        self._virtual_time = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        queue_depth_gauge.set_function(lambda: {
+            (organizer_id,): queue.queued for organizer_id, queue in list(self._organizers.items())
+        })
+        in_flight_gauge.set_function(lambda: {(): self.in_flight})
+
+    def _queue(self, organizer_id: int) -> OrganizerQueue:
+        queue = self._organizers.get(organizer_id)
+        if queue is None:
+            queue = self._organizers[organizer_id] = OrganizerQueue(
+                organizer_id,
+                weight=self.weights.get(organizer_id, 1.0),
+                rate=self.rates.get(organizer_id, self.settings.PAYOUT_ORGANIZER_RATE)
+            )
+        return queue
+
+    def saturated_organizers(self) -> List[int]:
+        """Organizers with PAYOUT_MAX_QUEUED_PER_ORGANIZER claims already waiting"""
+        return [
+            organizer_id for organizer_id, queue in self._organizers.items()
+            if queue.queued >= self.settings.PAYOUT_MAX_QUEUED_PER_ORGANIZER
+        ]
+
+    @asynccontextmanager
+    async def slot(self, organizer_id: int, event_id: int) -> AsyncIterator[None]:
+        """Hold a send slot for a claim of the given organizer and event"""
+        await self.acquire(organizer_id, event_id)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, organizer_id: int, event_id: int) -> None:
+        queue = self._queue(organizer_id)
+        if not queue.queued:
+            # Idle organizers do not bank credit for the time they sent nothing
+            queue.finish_tag = max(queue.finish_tag, self._virtual_time)
+        waiter = asyncio.get_running_loop().create_future()
+        queue.push(event_id, waiter)
+        self._backlogged.add(organizer_id)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Cancelled just after being given a slot: hand it on
+                self.release()
+            else:
+                waiter.cancel()
+                queue.discard(waiter)
+                if not queue.queued:
+                    self._backlogged.discard(organizer_id)
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        while self.in_flight < self.concurrency and self._backlogged:
+            eligible = [
+                queue for queue in (self._organizers[organizer_id] for organizer_id in self._backlogged)
+                if not queue.throttled_for(now)
+            ]
+            if not eligible:
+                self._schedule_retry(now)
+                return
+            queue = min(eligible, key=lambda q: q.finish_tag)
+            entry = queue.pop()
+            if not queue.queued:
+                self._backlogged.discard(queue.organizer_id)
+            if entry is None:
+                continue
+
+            waiter, enqueued_at = entry
+            self._virtual_time = queue.finish_tag
+            queue.finish_tag += 1 / queue.weight
+            queue.take_token()
+            self.in_flight += 1
+            organizer = str(queue.organizer_id)
+            wait_histogram.observe(now - enqueued_at, organizer=organizer)
+            dispatched_counter.inc(organizer=organizer)
+            waiter.set_result(None)
+
+    def _schedule_retry(self, now: float) -> None:
+        """Dispatch again once the first throttled organizer may send"""
+        if self._timer is not None and not self._timer.cancelled():
+            self._timer.cancel()
+        delay = min(self._organizers[organizer_id].throttled_for(now) for organizer_id in self._backlogged)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
@@ -0,0 +1,338 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from typing import Any, Deque, Dict, List, Optional
+from urllib.parse import urlsplit
+import requests
+from web3.providers.base import JSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+from app.config.blockchain import BlockchainSettings, blockchain_settings
+from app.config.logging import logger
+from app.config.metrics import metrics
+
+# Reads that are safe to send twice; the first answer wins
+HEDGED_METHODS = {
+    "eth_blockNumber",
+    "eth_call",
+    "eth_chainId",
+    "eth_estimateGas",
+    "eth_feeHistory",
+    "eth_gasPrice",
+    "eth_getBalance",
+    "eth_getBlockByNumber",
+    "eth_getTransactionByHash",
+    "eth_getTransactionReceipt",
+    "eth_maxPriorityFeePerGas",
+}
+
+# Writes sent to every endpoint at once for faster mempool propagation
+BROADCAST_METHODS = {"eth_sendRawTransaction"}
+
+# Counters asked of every endpoint, taking the highest answer: a provider
+# lagging behind would report a nonce that was already used
+MAX_METHODS = {"eth_getTransactionCount"}
+
+# Latency samples kept per endpoint for its p95
+LATENCY_SAMPLES = 200
+
+request_histogram = metrics.histogram(
+    "rpc_request_duration_seconds", "JSON-RPC request latency per endpoint", ["endpoint"]
+)
+errors_counter = metrics.counter(
+    "rpc_endpoint_errors_total", "Transport errors, 429s and 5xx answers per endpoint", ["endpoint"]
+)
+hedged_counter = metrics.counter(
+    "rpc_hedged_requests_total", "Reads re-sent to a second endpoint after the hedge delay", ["method"]
+)
+healthy_gauge = metrics.gauge("rpc_endpoint_healthy", "1 while an endpoint is in rotation", ["endpoint"])
+
+
+class EndpointError(OSError):
+    """An endpoint failed to answer (transport error, 429 or 5xx)"""
+
+
+class RpcEndpoint:
+    """One JSON-RPC provider, with its latency and error history"""
+
+    def __init__(self, url: str, settings: BlockchainSettings = blockchain_settings):
+        self.url = url
+        # Never put the URL itself in metrics or logs: providers embed API keys in it
+        parts = urlsplit(url)
+        self.name = f"{parts.hostname}:{parts.port}" if parts.port else parts.hostname or "rpc"
+        self.settings = settings
+        self.session = requests.Session()
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.ewma_latency: Optional[float] = None
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+
+    def healthy(self, now: Optional[float] = None) -> bool:
+        return (now or time.monotonic()) >= self.unhealthy_until
+
+    def score(self) -> float:
+        """Expected wait: smoothed latency scaled by outstanding requests (lower is better)"""
+        with self._lock:
+            return (self.ewma_latency or 0.0) * (1 + self.in_flight)
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < 20:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def _record(self, latency: Optional[float]) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if latency is None:
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= self.settings.RPC_ENDPOINT_FAILURE_THRESHOLD:
+                    now = time.monotonic()
+                    if now >= self.unhealthy_until:
+                        logger.warning(f"RPC endpoint {self.name} taken out of rotation after {self.consecutive_failures} failures")
+                    self.unhealthy_until = now + self.settings.RPC_ENDPOINT_COOLDOWN_SECONDS
+                return
+            self.consecutive_failures = 0
+            self._latencies.append(latency)
+            self.ewma_latency = latency if self.ewma_latency is None else 0.8 * self.ewma_latency + 0.2 * latency
+
+    def post(self, data: Optional[bytes] = None, json: Any = None) -> Any:
+        """POST a JSON-RPC request or batch; raises EndpointError when the endpoint fails"""
+        with self._lock:
+            self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            response = self.session.post(
+                self.url,
+                data=data,
+                json=json,
+                headers={"Content-Type": "application/json"},
+                timeout=self.settings.ETHEREUM_RPC_TIMEOUT_SECONDS
+            )
+            if response.status_code == 429 or response.status_code >= 500:
+                raise EndpointError(f"{self.name} answered HTTP {response.status_code}")
+            response.raise_for_status()
+            body = response.json()
+        except (EndpointError, requests.exceptions.RequestException, ValueError) as e:
+            errors_counter.inc(endpoint=self.name)
+            self._record(None)
+            if isinstance(e, EndpointError):
+                raise
+            raise EndpointError(f"{self.name}: {str(e)}") from e
+        latency = time.perf_counter() - started
+        request_histogram.observe(latency, endpoint=self.name)
+        self._record(latency)
+        return body
+
+    def post_batch(self, payload: List[Dict]) -> List[Dict]:
+        """POST a JSON-RPC batch, one call at a time for providers without batch support"""
+        body = self.post(json=payload)
+        if isinstance(body, list):
+            return body
+        return [self.post(json=call) for call in payload]
+
+
+class RpcRouter:
+    """
+    Spreads JSON-RPC traffic over several providers
+
+    Calls go to the endpoint with the lowest expected wait (smoothed latency
+    times outstanding requests); an endpoint failing repeatedly sits out
+    RPC_ENDPOINT_COOLDOWN_SECONDS. Reads are hedged: if the first endpoint
+    has not answered within its p95 latency, the next one is asked too and
+    the first answer wins. Raw transactions go to every endpoint at once, and
+    so do nonce reads, which take the highest nonce any endpoint reports.
+    """
+
+    def __init__(self, urls: List[str], settings: BlockchainSettings = blockchain_settings):
+        if not urls:
+            raise ValueError("At least one RPC endpoint is required")
+        self.settings = settings
+        self.endpoints = [RpcEndpoint(url, settings) for url in urls]
+        self._executor = ThreadPoolExecutor(max_workers=8 * len(self.endpoints), thread_name_prefix="rpc")
+
+    def ranked(self) -> List[RpcEndpoint]:
+        """Healthy endpoints best first, then the others as a last resort"""
+        now = time.monotonic()
+        healthy = sorted((e for e in self.endpoints if e.healthy(now)), key=lambda e: e.score())
+        return healthy + [e for e in self.endpoints if not e.healthy(now)]
+
+    def broadcast_targets(self) -> List[RpcEndpoint]:
+        """Endpoints in rotation, or all of them when none is"""
+        now = time.monotonic()
+        return [e for e in self.endpoints if e.healthy(now)] or self.endpoints
+
+    def hedge_delay(self, endpoint: RpcEndpoint) -> float:
+        p95 = endpoint.p95()
+        if p95 is None:
+            return self.settings.RPC_HEDGE_MAX_DELAY_MS / 1000
+        return min(max(p95, self.settings.RPC_HEDGE_MIN_DELAY_MS / 1000), self.settings.RPC_HEDGE_MAX_DELAY_MS / 1000)
+
+    def request(self, method: str, body: bytes) -> Dict:
+        """Send one encoded JSON-RPC request, routed by method"""
+        if len(self.endpoints) == 1:
+            return self.endpoints[0].post(data=body)
+        if method in BROADCAST_METHODS:
+            return self._broadcast(body)
+        if method in MAX_METHODS:
+            return self._highest(body)
+        if method in HEDGED_METHODS:
+            return self._hedged(method, body)
+        return self._failover(body)
+
+    def _failover(self, body: bytes) -> Dict:
+        last_error: Optional[EndpointError] = None
+        for endpoint in self.ranked():
+            try:
+                return endpoint.post(data=body)
+            except EndpointError as e:
+                last_error = e
+        raise last_error
+
+    def _hedged(self, method: str, body: bytes) -> Dict:
+        ranked = self.ranked()
+        backups = iter(ranked[1:])
+        delay = self.hedge_delay(ranked[0])
+        pending = {self._executor.submit(ranked[0].post, body)}
+        hedged = False
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, timeout=None if hedged else delay, return_when=FIRST_COMPLETED)
+            if not done:
+                # The first endpoint is slower than usual: ask the next one as well
+                hedged = True
+                backup = next(backups, None)
+                if backup is not None:
+                    hedged_counter.inc(method=method)
+                    pending.add(self._executor.submit(backup.post, body))
+                continue
+            for future in done:
+                try:
+                    return future.result()
+                except EndpointError as e:
+                    last_error = e
+            if not pending:
+                backup = next(backups, None)
+                if backup is not None:
+                    pending.add(self._executor.submit(backup.post, body))
+        raise last_error
+
+    def _broadcast(self, body: bytes) -> Dict:
+        futures = [self._executor.submit(endpoint.post, body) for endpoint in self.broadcast_targets()]
+        error_response: Optional[Dict] = None
+        last_error: Optional[BaseException] = None
+        for future in as_completed(futures):
+            try:
+                response = future.result()
+            except EndpointError as e:
+                last_error = e
+                continue
+            if "error" not in response:
+                # The other endpoints keep propagating the transaction in the background
+                return response
+            # e.g. "already known" from a node that heard of it from a peer first
+            error_response = error_response or response
+        if error_response is not None:
+            return error_response
+        raise last_error
+
+    def _highest(self, body: bytes) -> Dict:
+        futures = [self._executor.submit(endpoint.post, body) for endpoint in self.broadcast_targets()]
+        best: Optional[Dict] = None
+        error_response: Optional[Dict] = None
+        last_error: Optional[BaseException] = None
+        for future in as_completed(futures):
+            try:
+                response = future.result()
+            except EndpointError as e:
+                last_error = e
+                continue
+            if "error" in response:
+                error_response = error_response or response
+            elif best is None or int(response["result"], 16) > int(best["result"], 16):
+                best = response
+        if best is not None:
+            return best
+        if error_response is not None:
+            return error_response
+        raise last_error
+
+    def broadcast_batch(self, payload: List[Dict]) -> List[Dict]:
+        """
+        Send a batch of eth_sendRawTransaction calls to every endpoint
+
+        Returns one response per call, in payload order: a success from any
+        endpoint wins over errors from the others.
+        """
+        if len(self.endpoints) == 1:
+            responses = self.endpoints[0].post_batch(payload)
+        else:
+            responses = self._broadcast_batch(payload)
+        by_id = {entry.get("id"): entry for entry in responses}
+        return [by_id.get(call["id"], {"error": {"message": "missing batch response"}}) for call in payload]
+
+    def _broadcast_batch(self, payload: List[Dict]) -> List[Dict]:
+        ids = {call["id"] for call in payload}
+        futures: List[Future] = [
+            self._executor.submit(endpoint.post_batch, payload) for endpoint in self.broadcast_targets()
+        ]
+        merged: Dict[Any, Dict] = {}
+        answered = False
+        last_error: Optional[BaseException] = None
+        for future in as_completed(futures):
+            try:
+                responses = future.result()
+            except EndpointError as e:
+                last_error = e
+                continue
+            answered = True
+            for entry in responses:
+                current = merged.get(entry.get("id"))
+                if current is None or ("error" in current and "error" not in entry):
+                    merged[entry.get("id")] = entry
+            if all(call_id in merged and "error" not in merged[call_id] for call_id in ids):
+                break
+        if not answered:
+            raise last_error
+        return list(merged.values())
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        for endpoint in self.endpoints:
+            endpoint.session.close()
+
+
+class RoutingProvider(JSONBaseProvider):
+    """web3 provider sending every request through an RpcRouter"""
+
+    def __init__(self, router: "RpcRouter"):
+        super().__init__()
+        self.router = router
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        return self.router.request(method, self.encode_rpc_request(method, params))
+
+
+_router: Optional[RpcRouter] = None
+_router_lock = threading.Lock()
+
+
+def rpc_urls(settings: BlockchainSettings = blockchain_settings) -> List[str]:
+    """ETHEREUM_RPC_URLS (comma-separated), or the single ETHEREUM_RPC_URL"""
+    urls = [url.strip() for url in settings.ETHEREUM_RPC_URLS.split(",") if url.strip()]
+    return urls or [settings.ETHEREUM_RPC_URL]
+
+
+def get_rpc_router() -> RpcRouter:
+    """Process-wide router shared by web3 calls and the broadcast pipeline"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = RpcRouter(rpc_urls())
+            healthy_gauge.set_function(lambda: {
+                (endpoint.name,): 1 if endpoint.healthy() else 0 for endpoint in _router.endpoints
+            })
+        return _router
@@ -0,0 +1,230 @@
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from eth_account import Account
+from app.config.blockchain import BlockchainSettings, blockchain_settings
+from app.config.logging import logger
+
+
+class SignerLane:
+    """One hot wallet with its own locally tracked nonce sequence"""
+
+    def __init__(self, index: int, private_key: str):
+        self.index = index
+        self.account = Account.from_key(private_key)
+        self.address = self.account.address
+        self.next_nonce: Optional[int] = None
+        # A failed send may have left its nonce unused; re-read once nothing is in flight
+        self.resync_pending = False
+        self.in_flight = 0
+        self.sent = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.unhealthy_reason: Optional[str] = None
+        self.balance_wei: Optional[int] = None
+        self.balance_checked_at = 0.0
+        self._nonce_lock = threading.Lock()
+
+    def reserve_nonce(self, fetch_pending_count: Callable[[], int]) -> int:
+        """
+        Take the next nonce of this lane
+
+        Args:
+            fetch_pending_count: Callback returning the account's pending
+                transaction count, used when the lane is not yet synced
+
+        Returns:
+            Nonce to use for the next transaction
+        """
+        with self._nonce_lock:
+            if self.next_nonce is None:
+                self.next_nonce = fetch_pending_count()
+            nonce = self.next_nonce
+            self.next_nonce += 1
+            return nonce
+
+    def return_nonce(self, nonce: int) -> bool:
+        """
+        Give back a reserved nonce that was never broadcast
+
+        Returns:
+            True if it was the latest reservation and will be handed out
+            again; False if later nonces were reserved since, leaving a gap
+        """
+        with self._nonce_lock:
+            if self.next_nonce != nonce + 1:
+                return False
+            self.next_nonce = nonce
+            return True
+
+    def resync_nonce(self) -> None:
+        """Forget the local nonce so the next reservation re-reads it from the chain"""
+        with self._nonce_lock:
+            self.next_nonce = None
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+    def snapshot(self) -> Dict:
+        return {
+            "index": self.index,
+            "address": self.address,
+            "in_flight": self.in_flight,
+            "sent": self.sent,
+            "next_nonce": self.next_nonce,
+            "resync_pending": self.resync_pending,
+            "healthy": self.is_healthy(time.monotonic()),
+            "unhealthy_reason": self.unhealthy_reason,
+            "consecutive_failures": self.consecutive_failures,
+            "balance_wei": self.balance_wei,
+        }
+
+
+class SignerPool:
+    """Pool of signer lanes so payouts are not serialized on a single account's nonce"""
+
+    def __init__(self, private_keys: List[str], settings: BlockchainSettings = blockchain_settings):
+        self.settings = settings
+        self.lanes = [SignerLane(i, key) for i, key in enumerate(private_keys)]
+        self._lock = threading.Lock()
+        # Held by the one background thread refreshing balances at a time
+        self._refresh_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: BlockchainSettings = blockchain_settings) -> "SignerPool":
+        """Build the pool from PRIVATE_KEYS, falling back to the single PRIVATE_KEY"""
+        keys = [key.strip() for key in settings.PRIVATE_KEYS.split(",") if key.strip()]
+        if not keys and settings.PRIVATE_KEY:
+            keys = [settings.PRIVATE_KEY]
+        return cls(keys, settings)
+
+    def acquire(self, w3=None, affinity_key: Optional[str] = None) -> Optional[SignerLane]:
+        """
+        Pick a healthy lane for the next transaction and mark it busy
+
+        Args:
+            w3: Optional Web3 instance; when given, stale lane balances are
+                refreshed in the background (this call never waits for them)
+            affinity_key: Key used by the "hash" strategy to pin work to a lane
+
+        Returns:
+            The chosen lane, or None if no lane is healthy
+        """
+        if w3 is not None:
+            self._start_balance_refresh(w3)
+
+        now = time.monotonic()
+        with self._lock:
+            healthy = [lane for lane in self.lanes if lane.is_healthy(now)]
+            if not healthy:
+                return None
+
+            lane = None
+            if self.settings.SIGNER_STRATEGY == "hash" and affinity_key:
+                digest = hashlib.sha256(affinity_key.lower().encode()).digest()
+                preferred = self.lanes[int.from_bytes(digest[:8], "big") % len(self.lanes)]
+                if preferred.is_healthy(now):
+                    lane = preferred
+            if lane is None:
+                lane = min(healthy, key=lambda candidate: (candidate.in_flight, candidate.sent))
+
+            lane.in_flight += 1
+            return lane
+
+    def release(
+        self,
+        lane: SignerLane,
+        success: bool,
+        error: Optional[str] = None,
+        unused_nonce: Optional[int] = None
+    ) -> None:
+        """
+        Return a lane after a send attempt and update its health
+
+        Args:
+            lane: Lane returned by acquire
+            success: Whether the transaction was broadcast
+            error: Failure reason, shown once the lane is marked unhealthy
+            unused_nonce: Nonce of a failed attempt that certainly never
+                reached a node, so it can be handed out again
+        """
+        with self._lock:
+            lane.in_flight -= 1
+            if success:
+                lane.sent += 1
+                lane.consecutive_failures = 0
+            else:
+                lane.consecutive_failures += 1
+                if lane.consecutive_failures >= self.settings.SIGNER_FAILURE_THRESHOLD:
+                    lane.unhealthy_until = time.monotonic() + self.settings.SIGNER_COOLDOWN_SECONDS
+                    lane.unhealthy_reason = error or "repeated send failures"
+                    logger.warning(
+                        f"Signer lane {lane.index} ({lane.address}) marked unhealthy: {lane.unhealthy_reason}"
+                    )
+                if unused_nonce is None or not lane.return_nonce(unused_nonce):
+                    # The nonce may be unused and block every later one. Re-reading
+                    # it now would move the counter below nonces other sends of
+                    # this lane are still signing or broadcasting, so it waits
+                    # until the lane is idle.
+                    lane.resync_pending = True
+
+            if lane.resync_pending and lane.in_flight == 0:
+                lane.resync_pending = False
+                lane.resync_nonce()
+
+    def _start_balance_refresh(self, w3) -> None:
+        """Refresh stale balances on a background thread, unless one is already doing it"""
+        now = time.monotonic()
+        if all(now - lane.balance_checked_at < self.settings.SIGNER_BALANCE_CHECK_SECONDS for lane in self.lanes):
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        threading.Thread(
+            target=self._refresh_in_background, args=(w3,), name="signer-balances", daemon=True
+        ).start()
+
+    def _refresh_in_background(self, w3) -> None:
+        try:
+            self._refresh_stale_balances(w3)
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh_stale_balances(self, w3) -> None:
+        now = time.monotonic()
+        for lane in self.lanes:
+            if now - lane.balance_checked_at < self.settings.SIGNER_BALANCE_CHECK_SECONDS:
+                continue
+            lane.balance_checked_at = now
+            try:
+                lane.balance_wei = w3.eth.get_balance(lane.address)
+            except Exception as e:
+                logger.warning(f"Balance check failed for signer lane {lane.index}: {str(e)}")
+                continue
+
+            if lane.balance_wei < self.settings.SIGNER_MIN_BALANCE_WEI:
+                # Keep it out of rotation until the next balance check
+                lane.unhealthy_until = now + self.settings.SIGNER_BALANCE_CHECK_SECONDS
+                lane.unhealthy_reason = "balance below minimum"
+                logger.warning(f"Signer lane {lane.index} ({lane.address}) balance too low: {lane.balance_wei} wei")
+            elif lane.unhealthy_reason == "balance below minimum":
+                lane.unhealthy_until = 0.0
+                lane.unhealthy_reason = None
+
+    def snapshot(self) -> List[Dict]:
+        """Current state of every lane"""
+        return [lane.snapshot() for lane in self.lanes]
+
+
+_signer_pool: Optional[SignerPool] = None
+_signer_pool_lock = threading.Lock()
+
+
+def get_signer_pool() -> SignerPool:
+    """Process-wide signer pool (nonce lanes must outlive a single request)"""
+    global _signer_pool
+    if _signer_pool is None:
+        with _signer_pool_lock:
+            if _signer_pool is None:
+                _signer_pool = SignerPool.from_settings()
+    return _signer_pool
@@ -0,0 +1,237 @@
+import os
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.config.worker import WorkerSettings, worker_settings
+from app.models.claim import ClaimStatus
+from app.models.event_rollup import EventRollup
+from app.models.event_stats import EventStats
+from app.models.reward import RewardType
+
+# Shard rows per event; more shards = less lock contention on hot events
+EVENT_STATS_SHARDS = int(os.getenv("EVENT_STATS_SHARDS", "8"))
+
+STATUS_COLUMNS = {
+    ClaimStatus.ENTITLED: "claims_entitled",
+    ClaimStatus.PENDING: "claims_pending",
+    ClaimStatus.PROCESSING: "claims_processing",
+    ClaimStatus.COMPLETED: "claims_completed",
+    ClaimStatus.FAILED: "claims_failed",
+}
+
+COUNTER_COLUMNS = ("participant_count",) + tuple(STATUS_COLUMNS.values()) + ("tokens_distributed",)
+ROLLUP_COLUMNS = ("joins",) + tuple(STATUS_COLUMNS.values()) + ("tokens_distributed",)
+
+# Rollup bucket sizes
+GRANULARITIES = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+}
+
+# (event_id, from_status or None for a new claim, to_status, amount distributed)
+ClaimTransition = Tuple[int, Optional[ClaimStatus], ClaimStatus, Optional[Decimal]]
+
+
+def upsert_increment(db: Session, model, key: Dict, deltas: Dict) -> None:
+    """
+    Add deltas to the counters of the row identified by key, creating it if needed
+
+    One INSERT ... ON CONFLICT DO UPDATE statement, so concurrent writers
+    never race between "read" and "write" and never fail on a missing row.
+    """
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    table = model.__table__
+    statement = insert(model).values(**key, **deltas)
+    updates = {column: table.c[column] + statement.excluded[column] for column in deltas}
+    if "updated_at" in table.c:
+        updates["updated_at"] = func.now()
+    db.execute(statement.on_conflict_do_update(index_elements=list(key), set_=updates))
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Start of the rollup bucket containing a moment (UTC)"""
+    moment = moment.astimezone(timezone.utc)
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(second=0, microsecond=0)
+
+
+def distributed_amount(reward_type: RewardType, amount) -> Decimal:
+    """Tokens a completed claim of a reward sent: its ERC-20 amount, or one NFT"""
+    if reward_type == RewardType.ERC20:
+        return Decimal(str(amount)) if amount is not None else Decimal(0)
+    return Decimal(1)
+
+
+class StatsService:
+    """
+    Incrementally maintained per-event counters, updated in the caller's transaction
+
+    Every change updates both the running totals (event_stats) and the
+    per-minute and per-hour activity buckets (event_rollups).
+    """
+
+    @staticmethod
+    def record_join(db: Session, event_id: int) -> None:
+        """Count a participant joining an event"""
+        StatsService._apply(db, {event_id: {"participant_count": 1}}, {event_id: {"joins": 1}})
+
+    @staticmethod
+    def record_claim_transition(
+        db: Session,
+        event_id: int,
+        from_status: Optional[ClaimStatus],
+        to_status: ClaimStatus,
+        amount: Optional[Decimal] = None
+    ) -> None:
+        """Move a claim between status counters (from_status None for a new claim)"""
+        StatsService.record_claim_transitions(db, [(event_id, from_status, to_status, amount)])
+
+    @staticmethod
+    def record_claim_transitions(db: Session, transitions: Iterable[ClaimTransition]) -> None:
+        """
+        Apply many claim status transitions at once
+
+        Args:
+            db: Session whose transaction makes the transitions
+            transitions: (event_id, from_status, to_status, amount) tuples; amount
+                is what a transition to COMPLETED distributed
+        """
+        deltas: Dict[int, Dict[str, Decimal]] = defaultdict(lambda: defaultdict(int))
+        flows: Dict[int, Dict[str, Decimal]] = defaultdict(lambda: defaultdict(int))
+        for event_id, from_status, to_status, amount in transitions:
+            if from_status == to_status:
+                continue
+            to_column = STATUS_COLUMNS[ClaimStatus(to_status)]
+            if from_status is not None:
+                deltas[event_id][STATUS_COLUMNS[ClaimStatus(from_status)]] -= 1
+            deltas[event_id][to_column] += 1
+            flows[event_id][to_column] += 1
+            if to_status == ClaimStatus.COMPLETED and amount:
+                deltas[event_id]["tokens_distributed"] += amount
+                flows[event_id]["tokens_distributed"] += amount
+        StatsService._apply(db, deltas, flows)
+
+    @staticmethod
+    def record_claim_transition_count(
+        db: Session,
+        event_id: int,
+        from_status: Optional[ClaimStatus],
+        to_status: ClaimStatus,
+        count: int
+    ) -> None:
+        """Move count claims of an event between status counters, e.g. after a bulk UPDATE"""
+        if not count or from_status == to_status:
+            return
+        to_column = STATUS_COLUMNS[ClaimStatus(to_status)]
+        deltas = {to_column: count}
+        if from_status is not None:
+            deltas[STATUS_COLUMNS[ClaimStatus(from_status)]] = -count
+        StatsService._apply(db, {event_id: deltas}, {event_id: {to_column: count}})
+
+    @staticmethod
+    def _apply(db: Session, deltas: Dict[int, Dict], flows: Dict[int, Dict]) -> None:
+        shard = random.randrange(EVENT_STATS_SHARDS)
+        now = datetime.now(timezone.utc)
+        # Fixed lock order across events and tables keeps concurrent batches deadlock-free
+        for event_id in sorted(deltas):
+            upsert_increment(db, EventStats, {"event_id": event_id, "shard": shard}, deltas[event_id])
+        for event_id in sorted(flows):
+            for granularity in GRANULARITIES:
+                upsert_increment(
+                    db,
+                    EventRollup,
+                    {
+                        "event_id": event_id,
+                        "granularity": granularity,
+                        "bucket_start": bucket_start(now, granularity),
+                        "shard": shard
+                    },
+                    flows[event_id]
+                )
+
+    @staticmethod
+    def get_event_stats(db: Session, event_id: int) -> Dict:
+        """Current counters of an event (summed over its shard rows)"""
+        totals = db.query(
+            *[func.coalesce(func.sum(getattr(EventStats, column)), 0).label(column) for column in COUNTER_COLUMNS]
+        ).filter(EventStats.event_id == event_id).one()
+        stats = {"event_id": event_id, **totals._asdict()}
+        # Entitlements nobody has claimed yet are not claims
+        stats["claims_total"] = sum(
+            stats[column] for status, column in STATUS_COLUMNS.items() if status != ClaimStatus.ENTITLED
+        )
+        return stats
+
+    @staticmethod
+    def prune_minute_rollups(db: Session, settings: WorkerSettings = worker_settings) -> int:
+        """Delete per-minute buckets older than ROLLUP_MINUTE_RETENTION_DAYS; commits"""
+        cutoff = bucket_start(
+            datetime.now(timezone.utc) - timedelta(days=settings.ROLLUP_MINUTE_RETENTION_DAYS), "minute"
+        )
+        pruned = db.execute(
+            delete(EventRollup).where(EventRollup.granularity == "minute", EventRollup.bucket_start < cutoff)
+        ).rowcount
+        db.commit()
+        return pruned
+
+    @staticmethod
+    def get_event_timeseries(
+        db: Session,
+        event_id: int,
+        granularity: str,
+        start: datetime,
+        end: datetime
+    ) -> List[Dict]:
+        """
+        Activity per bucket between start and end, read from the rollups
+
+        Args:
+            db: Database session
+            event_id: Event to report on
+            granularity: "minute" or "hour"
+            start: First bucket to include (rounded down to the bucket)
+            end: Last moment to include
+
+        Returns:
+            One dict per bucket, oldest first, with zeros for quiet buckets
+        """
+        first = bucket_start(start, granularity)
+        rows = db.query(
+            EventRollup.bucket_start,
+            *[func.sum(getattr(EventRollup, column)).label(column) for column in ROLLUP_COLUMNS]
+        ).filter(
+            EventRollup.event_id == event_id,
+            EventRollup.granularity == granularity,
+            EventRollup.bucket_start >= first,
+            EventRollup.bucket_start <= end
+        ).group_by(EventRollup.bucket_start).all()
+
+        by_bucket = {}
+        for row in rows:
+            moment = row.bucket_start
+            if moment.tzinfo is None:
+                # SQLite hands timestamps back without a zone; they are stored in UTC
+                moment = moment.replace(tzinfo=timezone.utc)
+            by_bucket[moment] = row
+
+        step = GRANULARITIES[granularity]
+        series = []
+        moment = first
+        while moment <= end:
+            row = by_bucket.get(moment)
+            series.append({
+                "bucket_start": moment,
+                **{column: (getattr(row, column) or 0) if row else 0 for column in ROLLUP_COLUMNS}
+            })
+            moment += step
+        return series
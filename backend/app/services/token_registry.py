@@ -0,0 +1,162 @@
+import threading
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from eth_abi import decode, encode
+from web3.exceptions import ContractLogicError
+from app.config.logging import logger
+from app.config.tracing import tracer
+
+# Multicall3 is deployed at the same address on mainnet and nearly every EVM chain
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")  # aggregate3((address,bool,bytes)[])
+
+DECIMALS_CALLDATA = bytes.fromhex("313ce567")  # decimals()
+SUPPORTS_INTERFACE_SELECTOR = bytes.fromhex("01ffc9a7")  # supportsInterface(bytes4)
+
+ERC721_INTERFACE_ID = bytes.fromhex("80ac58cd")
+ERC1155_INTERFACE_ID = bytes.fromhex("d9b67a26")
+
+# Tokens whose decimals() reverts or does not exist are taken to use the ERC-20 default
+DEFAULT_DECIMALS = 18
+
+# A probe result: (call succeeded, return data), or None when the RPC call itself failed
+ProbeResult = Optional[Tuple[bool, bytes]]
+
+
+def _supports_interface_calldata(interface_id: bytes) -> bytes:
+    return SUPPORTS_INTERFACE_SELECTOR + interface_id.ljust(32, b"\x00")
+
+
+class TokenMetadata:
+    """On-chain facts about a reward token contract"""
+
+    def __init__(
+        self,
+        address: str,
+        decimals: Optional[int],
+        supports_erc721: Optional[bool],
+        supports_erc1155: Optional[bool]
+    ):
+        self.address = address
+        self.decimals = decimals
+        self.supports_erc721 = supports_erc721
+        self.supports_erc1155 = supports_erc1155
+
+    def to_base_units(self, amount) -> int:
+        """
+        Convert a human-readable token amount to the token's smallest unit
+
+        Raises:
+            ValueError: If the token's decimals could not be read
+        """
+        if self.decimals is None:
+            raise ValueError(f"Decimals of token {self.address} are unknown")
+        return int(Decimal(str(amount)) * (Decimal(10) ** self.decimals))
+
+
+class TokenRegistry:
+    """Process-wide cache of token metadata, filled with one multicall per batch of tokens"""
+
+    def __init__(self):
+        self._tokens: Dict[str, TokenMetadata] = {}
+        self._lock = threading.Lock()
+
+    def get(self, w3, token_address: str) -> TokenMetadata:
+        """Return cached metadata for a token, loading it on first use"""
+        return self.load(w3, [token_address])[token_address.lower()]
+
+    def load(self, w3, token_addresses: Iterable[str]) -> Dict[str, TokenMetadata]:
+        """
+        Ensure metadata for all given tokens is cached
+
+        Args:
+            w3: Web3 instance used for the eth_call
+            token_addresses: Token contract addresses
+
+        Returns:
+            Dict of lowercase address to TokenMetadata
+        """
+        addresses = {address.lower(): address for address in token_addresses}
+        missing = [address for key, address in addresses.items() if key not in self._tokens]
+        fetched: Dict[str, TokenMetadata] = {}
+        if missing:
+            fetched = self._fetch(w3, missing)
+            with self._lock:
+                # Unknown decimals mean the RPC call failed, not the token:
+                # such tokens are returned but not cached, so the next use retries
+                self._tokens.update({
+                    key: token for key, token in fetched.items() if token.decimals is not None
+                })
+        return {key: self._tokens.get(key) or fetched[key] for key in addresses}
+
+    def invalidate(self, token_address: Optional[str] = None) -> None:
+        """Drop one token (or everything) from the cache"""
+        with self._lock:
+            if token_address is None:
+                self._tokens.clear()
+            else:
+                self._tokens.pop(token_address.lower(), None)
+
+    def _fetch(self, w3, token_addresses: List[str]) -> Dict[str, TokenMetadata]:
+        calls: List[Tuple[str, bool, bytes]] = []
+        results: List[ProbeResult]
+        for address in token_addresses:
+            checksum = w3.to_checksum_address(address)
+            calls.append((checksum, True, DECIMALS_CALLDATA))
+            calls.append((checksum, True, _supports_interface_calldata(ERC721_INTERFACE_ID)))
+            calls.append((checksum, True, _supports_interface_calldata(ERC1155_INTERFACE_ID)))
+
+        with tracer.start_span("TokenRegistry.fetch", {"token.count": len(token_addresses)}):
+            try:
+                results = self._aggregate3(w3, calls)
+            except Exception as e:
+                # Chain without Multicall3: fall back to one eth_call per probe
+                logger.warning(f"Multicall3 unavailable, fetching token metadata individually: {str(e)}")
+                results = [self._single_call(w3, target, data) for target, _, data in calls]
+
+        metadata = {}
+        for index, address in enumerate(token_addresses):
+            decimals_result, erc721_result, erc1155_result = results[index * 3:index * 3 + 3]
+            decimals = self._decode(decimals_result, "uint8")
+            if decimals is None and decimals_result is not None:
+                # The contract answered: decimals() reverted or is not implemented
+                decimals = DEFAULT_DECIMALS
+            metadata[address.lower()] = TokenMetadata(
+                address=address,
+                decimals=decimals,
+                supports_erc721=self._decode(erc721_result, "bool"),
+                supports_erc1155=self._decode(erc1155_result, "bool"),
+            )
+        return metadata
+
+    @staticmethod
+    def _aggregate3(w3, calls: List[Tuple[str, bool, bytes]]) -> List[Tuple[bool, bytes]]:
+        data = AGGREGATE3_SELECTOR + encode(["(address,bool,bytes)[]"], [calls])
+        raw = w3.eth.call({"to": MULTICALL3_ADDRESS, "data": "0x" + data.hex()})
+        return list(decode(["(bool,bytes)[]"], bytes(raw))[0])
+
+    @staticmethod
+    def _single_call(w3, target: str, data: bytes) -> ProbeResult:
+        try:
+            return True, bytes(w3.eth.call({"to": target, "data": "0x" + data.hex()}))
+        except ContractLogicError:
+            return False, b""
+        except Exception as e:
+            logger.warning(f"Token metadata call to {target} failed: {str(e)}")
+            return None
+
+    @staticmethod
+    def _decode(result: ProbeResult, abi_type: str):
+        if result is None:
+            return None
+        success, data = result
+        if not success or len(data) < 32:
+            return None
+        try:
+            return decode([abi_type], data[:32])[0]
+        except Exception:
+            return None
+
+
+# Global token registry instance
+token_registry = TokenRegistry()
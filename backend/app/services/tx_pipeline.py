@@ -0,0 +1,259 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from eth_account import Account
+from app.config.blockchain import BlockchainSettings, blockchain_settings
+from app.config.logging import logger
+from app.config.tracing import Span, tracer, current_span, SPAN_KIND_CLIENT
+from app.services.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from app.services.rpc_router import RpcRouter, get_rpc_router
+from app.services.signer_pool import SignerLane
+
+
+def sign_transaction(private_key: bytes, transaction: Dict) -> Tuple[str, str]:
+    """
+    Sign a prepared transaction (runs inside the signing worker pool)
+
+    Returns:
+        (raw transaction hex, transaction hash hex)
+    """
+    signed = Account.sign_transaction(transaction, private_key)
+    return signed.rawTransaction.hex(), signed.hash.hex()
+
+
+# Called (in a thread) with the signed transaction before it is broadcast; raising stops the broadcast
+SignedCallback = Callable[[Dict], None]
+
+
+class PendingTransaction:
+    """A prepared transaction travelling through the pipeline stages"""
+
+    __slots__ = ("lane", "transaction", "future", "parent_span", "on_signed", "raw", "tx_hash")
+
+    def __init__(
+        self,
+        lane: SignerLane,
+        transaction: Dict,
+        future: asyncio.Future,
+        parent_span: Optional[Span],
+        on_signed: Optional[SignedCallback] = None
+    ):
+        self.lane = lane
+        self.transaction = transaction
+        self.future = future
+        self.parent_span = parent_span
+        self.on_signed = on_signed
+        self.raw: Optional[str] = None
+        self.tx_hash: Optional[str] = None
+
+
+class TransactionPipeline:
+    """
+    Two-stage send pipeline: sign in a worker pool, broadcast in JSON-RPC batches
+
+    Bounded queues in front of each stage apply backpressure to submitters,
+    so a slow RPC provider throttles new sends instead of piling up memory.
+    """
+
+    def __init__(self, router: RpcRouter, settings: BlockchainSettings = blockchain_settings):
+        self.router = router
+        self.settings = settings
+        self.breaker = get_circuit_breaker("ethereum_rpc", settings.ETHEREUM_RPC_SLOW_CALL_SECONDS)
+        self._executor: Optional[Executor] = None
+        self._sign_queue: Optional[asyncio.Queue] = None
+        self._broadcast_queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._request_id = 0
+        self._request_id_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Start the signing workers and the broadcaster on the running loop"""
+        if self.running:
+            return
+        if self.settings.TX_SIGNING_POOL == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.settings.TX_SIGNING_WORKERS)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.settings.TX_SIGNING_WORKERS,
+                thread_name_prefix="tx-signer"
+            )
+        self._sign_queue = asyncio.Queue(maxsize=self.settings.TX_PIPELINE_QUEUE_SIZE)
+        self._broadcast_queue = asyncio.Queue(maxsize=self.settings.TX_PIPELINE_QUEUE_SIZE)
+        self._tasks = [
+            asyncio.create_task(self._sign_worker(), name=f"tx-sign-{i}")
+            for i in range(self.settings.TX_SIGNING_WORKERS)
+        ]
+        self._tasks.append(asyncio.create_task(self._broadcaster(), name="tx-broadcast"))
+
+    async def stop(self) -> None:
+        """Cancel the stage tasks and shut the worker pool down"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def submit(self, lane: SignerLane, transaction: Dict, on_signed: Optional[SignedCallback] = None) -> Dict:
+        """
+        Sign and broadcast a prepared transaction
+
+        Args:
+            lane: Signer lane that reserved the transaction's nonce
+            transaction: Fully populated transaction dict
+            on_signed: Called with sender_address, nonce, gas_price,
+                transaction_hash and raw_transaction once signed, before the
+                broadcast (e.g. to persist them); if it raises, nothing is sent
+
+        Returns:
+            Dict with transaction hash or error; "broadcast" is False when
+            the transaction certainly never reached a node
+        """
+        if not self.running:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        # Blocks while the signing stage is saturated
+        await self._sign_queue.put(PendingTransaction(lane, transaction, future, current_span(), on_signed))
+        return await future
+
+    def stats(self) -> Dict:
+        return {
+            "sign_queue_depth": self._sign_queue.qsize() if self._sign_queue else 0,
+            "broadcast_queue_depth": self._broadcast_queue.qsize() if self._broadcast_queue else 0,
+        }
+
+    async def _sign_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item: PendingTransaction = await self._sign_queue.get()
+            try:
+                with self._child_span(item, "eth.sign_transaction"):
+                    item.raw, item.tx_hash = await loop.run_in_executor(
+                        self._executor, sign_transaction, bytes(item.lane.account.key), item.transaction
+                    )
+            except Exception as e:
+                self._resolve(item, {"success": False, "error": f"Signing failed: {str(e)}", "broadcast": False})
+                continue
+            if item.on_signed is not None:
+                try:
+                    await loop.run_in_executor(None, item.on_signed, {
+                        "sender_address": item.lane.address,
+                        "nonce": item.transaction["nonce"],
+                        "gas_price": item.transaction["gasPrice"],
+                        "transaction_hash": item.tx_hash,
+                        "raw_transaction": item.raw,
+                    })
+                except Exception as e:
+                    self._resolve(item, {"success": False, "error": f"Not broadcast: {str(e)}", "broadcast": False})
+                    continue
+            await self._broadcast_queue.put(item)
+
+    async def _broadcaster(self) -> None:
+        loop = asyncio.get_running_loop()
+        wait = self.settings.TX_BROADCAST_BATCH_WAIT_MS / 1000
+        while True:
+            batch = [await self._broadcast_queue.get()]
+            deadline = loop.time() + wait
+            while len(batch) < self.settings.TX_BROADCAST_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._broadcast_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            started_ns = time.time_ns()
+            try:
+                results = await loop.run_in_executor(None, functools.partial(
+                    self.breaker.call,
+                    self._send_batch,
+                    [item.raw for item in batch],
+                    is_failure=lambda e: isinstance(e, OSError)
+                ))
+            except CircuitOpenError as e:
+                for item in batch:
+                    self._resolve(item, {
+                        "success": False,
+                        "error": f"Transaction failed: {str(e)}",
+                        "retryable": True,
+                        "broadcast": False
+                    })
+                continue
+            except Exception as e:
+                logger.error(f"Broadcast batch of {len(batch)} failed: {str(e)}")
+                results = [{"error": {"message": str(e)}}] * len(batch)
+
+            for item, response in zip(batch, results):
+                self._record_broadcast_span(item, len(batch), response, started_ns)
+                if "error" in response:
+                    error = response["error"]
+                    message = error.get("message") if isinstance(error, dict) else str(error)
+                    self._resolve(item, {"success": False, "error": f"Transaction failed: {message}"})
+                else:
+                    self._resolve(item, {
+                        "success": True,
+                        "transaction_hash": item.tx_hash,
+                        "sender_address": item.lane.address,
+                        "nonce": item.transaction["nonce"]
+                    })
+
+    def _send_batch(self, raw_transactions: List[str]) -> List[Dict]:
+        """Broadcast one JSON-RPC batch of eth_sendRawTransaction calls"""
+        with self._request_id_lock:
+            first_id = self._request_id
+            self._request_id += len(raw_transactions)
+        payload = [
+            {"jsonrpc": "2.0", "id": first_id + i, "method": "eth_sendRawTransaction", "params": [raw]}
+            for i, raw in enumerate(raw_transactions)
+        ]
+        # Every endpoint gets the batch; the first to accept a transaction wins
+        return self.router.broadcast_batch(payload)
+
+    @staticmethod
+    def _resolve(item: PendingTransaction, result: Dict) -> None:
+        if not item.future.done():
+            item.future.set_result(result)
+
+    @staticmethod
+    def _child_span(item: PendingTransaction, name: str):
+        parent = item.parent_span
+        if parent is None:
+            return tracer.start_span(name)
+        return tracer.start_span(name, trace_id=parent.trace_id, parent_span_id=parent.span_id)
+
+    @staticmethod
+    def _record_broadcast_span(item: PendingTransaction, batch_size: int, response: Dict, started_ns: int) -> None:
+        parent = item.parent_span
+        if parent is None or not tracer.enabled:
+            return
+        span = Span(
+            "eth_sendRawTransaction",
+            parent.trace_id,
+            parent.span_id,
+            SPAN_KIND_CLIENT,
+            {"rpc.method": "eth_sendRawTransaction", "rpc.batch_size": batch_size, "eth.tx_hash": item.tx_hash}
+        )
+        span.start_time_ns = started_ns
+        if "error" in response:
+            span.error = str(response["error"])
+        tracer.end_span(span)
+
+
+_pipeline: Optional[TransactionPipeline] = None
+
+
+def get_transaction_pipeline() -> TransactionPipeline:
+    """Process-wide pipeline; its stages are started on first submit"""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = TransactionPipeline(get_rpc_router())
+    return _pipeline
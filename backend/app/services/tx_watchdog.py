@@ -0,0 +1,262 @@
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from app.config.blockchain import BlockchainSettings, blockchain_settings
+from app.config.database import SessionLocal
+from app.config.logging import logger
+from app.config.tracing import tracer
+from app.models.claim import Claim
+from app.services.claim_events import claim_event_hub, claim_event
+from app.services.signer_pool import SignerLane
+
+
+class InFlightTransaction:
+    """A broadcast transaction that has not been mined yet"""
+
+    def __init__(
+        self,
+        blockchain_service,
+        lane: SignerLane,
+        transaction: Dict,
+        tx_hash: str,
+        claim_id: Optional[int] = None
+    ):
+        # Client that sent it, used to check on it and to send its replacements
+        self.blockchain_service = blockchain_service
+        self.lane = lane
+        # Claim paid by it, kept up to date with replacements
+        self.claim_id = claim_id
+        self.transaction = dict(transaction)
+        self.tx_hashes: List[str] = [tx_hash]
+        self.first_sent_at = time.monotonic()
+        self.last_sent_at = self.first_sent_at
+
+    @property
+    def nonce(self) -> int:
+        return self.transaction["nonce"]
+
+    @property
+    def replacements(self) -> int:
+        return len(self.tx_hashes) - 1
+
+
+class TransactionWatchdog:
+    """
+    Re-broadcasts stuck transactions with the same nonce and a bumped fee
+
+    Transactions are tracked per (sender, nonce). Each tick reads the mined
+    nonce of every sender once; anything at or above it that has waited
+    longer than TX_STUCK_AFTER_SECONDS is re-signed with a higher gas price,
+    up to TX_MAX_GAS_PRICE_WEI and TX_MAX_REPLACEMENTS.
+
+    One watchdog serves every BlockchainService of the process; each tracked
+    transaction keeps the service that sent it. The check runs as a task on
+    the event loop, or on a daemon thread for sends made outside of one.
+    """
+
+    def __init__(self, settings: BlockchainSettings = blockchain_settings):
+        self.settings = settings
+        self._in_flight: Dict[Tuple[str, int], InFlightTransaction] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_stop = threading.Event()
+
+    def track(
+        self,
+        blockchain_service,
+        lane: SignerLane,
+        transaction: Dict,
+        tx_hash: str,
+        claim_id: Optional[int] = None
+    ) -> None:
+        """Start watching a freshly broadcast transaction (paying claim_id, if any)"""
+        if not self.settings.TX_WATCHDOG_ENABLED:
+            return
+        with self._lock:
+            self._in_flight[(lane.address, transaction["nonce"])] = InFlightTransaction(
+                blockchain_service, lane, transaction, tx_hash, claim_id
+            )
+
+    def ensure_started(self) -> None:
+        """Start the periodic check, on the running event loop if there is one"""
+        if not self.settings.TX_WATCHDOG_ENABLED:
+            return
+        with self._lock:
+            if (self._task is not None and not self._task.done()) or (
+                self._thread is not None and self._thread.is_alive()
+            ):
+                return
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run(), name="tx-watchdog")
+            except RuntimeError:
+                # Synchronous send outside of any event loop
+                self._thread_stop.clear()
+                self._thread = threading.Thread(target=self._run_thread, name="tx-watchdog", daemon=True)
+                self._thread.start()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._thread is not None:
+            self._thread_stop.set()
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+    def in_flight_count(self) -> int:
+        return len(self._in_flight)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.TX_WATCHDOG_INTERVAL_SECONDS)
+            try:
+                await asyncio.to_thread(self.check)
+            except Exception as e:
+                logger.error(f"Transaction watchdog check failed: {str(e)}")
+
+    def _run_thread(self) -> None:
+        while not self._thread_stop.wait(self.settings.TX_WATCHDOG_INTERVAL_SECONDS):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Transaction watchdog check failed: {str(e)}")
+
+    def check(self) -> None:
+        """Drop mined transactions and replace the ones that are stuck"""
+        with self._lock:
+            items = list(self._in_flight.values())
+        if not items:
+            return
+
+        with tracer.start_span("TransactionWatchdog.check", {"tx.in_flight": len(items)}):
+            mined_nonces: Dict[str, int] = {}
+            senders = {item.lane.address: item.blockchain_service for item in items}
+            for address, blockchain_service in senders.items():
+                try:
+                    mined_nonces[address] = blockchain_service._rpc(
+                        "eth_getTransactionCount", blockchain_service.w3.eth.get_transaction_count, address, "latest"
+                    )
+                except Exception as e:
+                    logger.warning(f"Watchdog could not read nonce of {address}: {str(e)}")
+
+            now = time.monotonic()
+            for item in items:
+                mined_nonce = mined_nonces.get(item.lane.address)
+                if mined_nonce is None:
+                    continue
+                if item.nonce < mined_nonce:
+                    self._forget(item)
+                    if item.replacements:
+                        self._record_mined(item)
+                elif now - item.last_sent_at >= self.settings.TX_STUCK_AFTER_SECONDS:
+                    self._replace(item)
+
+    def _forget(self, item: InFlightTransaction) -> None:
+        with self._lock:
+            self._in_flight.pop((item.lane.address, item.nonce), None)
+
+    def _replace(self, item: InFlightTransaction) -> None:
+        """Re-sign the transaction with the same nonce and a higher gas price"""
+        if item.replacements >= self.settings.TX_MAX_REPLACEMENTS:
+            return
+
+        blockchain_service = item.blockchain_service
+        old_price = item.transaction["gasPrice"]
+        bumped = old_price * (100 + self.settings.TX_FEE_BUMP_PERCENT) // 100 + 1
+        try:
+            network_price = blockchain_service._rpc(
+                "eth_gasPrice", lambda: blockchain_service.w3.eth.gas_price
+            )
+        except Exception:
+            network_price = 0
+        new_price = min(max(bumped, network_price), self.settings.TX_MAX_GAS_PRICE_WEI)
+        if new_price < bumped:
+            logger.warning(
+                f"Stuck transaction {item.tx_hashes[-1]} (nonce {item.nonce}) hit the gas price cap, not replacing"
+            )
+            return
+
+        replacement = {**item.transaction, "gasPrice": new_price}
+        with tracer.start_span(
+            "TransactionWatchdog.replace",
+            {"eth.sender": item.lane.address, "eth.nonce": item.nonce, "eth.gas_price": new_price}
+        ):
+            try:
+                signed = item.lane.account.sign_transaction(replacement)
+                tx_hash = blockchain_service._rpc(
+                    "eth_sendRawTransaction",
+                    blockchain_service.w3.eth.send_raw_transaction,
+                    signed.rawTransaction
+                ).hex()
+            except Exception as e:
+                # Usually "nonce too low": the original was mined in the meantime
+                logger.warning(f"Replacement for nonce {item.nonce} of {item.lane.address} failed: {str(e)}")
+                return
+
+        previous_hash = item.tx_hashes[-1]
+        item.transaction = replacement
+        item.tx_hashes.append(tx_hash)
+        item.last_sent_at = time.monotonic()
+        logger.info(
+            f"Replaced stuck transaction {previous_hash} with {tx_hash} "
+            f"(nonce {item.nonce}, gas price {old_price} -> {new_price})"
+        )
+        self._update_claim(item, tx_hash, new_price, signed.rawTransaction.hex())
+
+    def _record_mined(self, item: InFlightTransaction) -> None:
+        """Point the claim at whichever transaction of the replacement chain was mined"""
+        for tx_hash in item.tx_hashes:
+            receipt = item.blockchain_service.get_transaction_receipt(tx_hash)
+            if receipt is not None:
+                if tx_hash != item.tx_hashes[-1]:
+                    self._update_claim(item, tx_hash, None)
+                return
+
+    def _update_claim(
+        self,
+        item: InFlightTransaction,
+        tx_hash: str,
+        gas_price: Optional[int],
+        raw_transaction: Optional[str] = None
+    ) -> None:
+        if item.claim_id is None:
+            return
+        db = SessionLocal()
+        try:
+            # Only while the claim is still paid by this nonce: once its nonce
+            # was consumed by another transaction it is re-signed with a new one
+            claim = db.query(Claim).filter(
+                Claim.id == item.claim_id,
+                Claim.sender_address == item.lane.address,
+                Claim.nonce == item.nonce
+            ).first()
+            if claim is None or claim.transaction_hash == tx_hash:
+                return
+            chain = list(claim.replaced_transaction_hashes or [])
+            if claim.transaction_hash and claim.transaction_hash not in chain:
+                chain.append(claim.transaction_hash)
+            chain = [previous for previous in chain if previous != tx_hash]
+            claim.replaced_transaction_hashes = chain
+            claim.transaction_hash = tx_hash
+            if gas_price is not None:
+                claim.gas_price = gas_price
+            if raw_transaction is not None:
+                claim.signed_transaction = raw_transaction
+            claim_event_hub.publish(db, [claim_event(claim)])
+            db.commit()
+        finally:
+            db.close()
+
+
+_watchdog: Optional[TransactionWatchdog] = None
+
+
+def get_transaction_watchdog() -> TransactionWatchdog:
+    """Process-wide watchdog shared by every BlockchainService"""
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = TransactionWatchdog()
+    return _watchdog
@@ -1,16 +1,19 @@
-from web3 import Web3
 from typing import Optional
 
 
 class WalletService:
     """Service for wallet address validation"""
     
+    # eth_utils is imported on first use: it is a good part of web3's import
+    # cost, and the API process should not pay it before serving requests
+    
     @staticmethod
     def is_valid_address(address: str) -> bool:
         """Check if an Ethereum address is valid"""
+        from eth_utils import is_address, is_checksum_address, to_checksum_address
         try:
-            return Web3.is_address(address) and Web3.is_checksum_address(
-                Web3.to_checksum_address(address)
+            return is_address(address) and is_checksum_address(
+                to_checksum_address(address)
             )
         except:
             return False
@@ -18,7 +21,8 @@ class WalletService:
     @staticmethod
     def to_checksum_address(address: str) -> Optional[str]:
         """Convert address to checksum format"""
+        from eth_utils import to_checksum_address
         try:
-            return Web3.to_checksum_address(address)
+            return to_checksum_address(address)
         except:
             return None
@@ -1,19 +1,41 @@
 import requests
 import hashlib
+import time
 from typing import Dict, Optional
 from app.config.worldid import worldid_settings
+from app.config.tracing import tracer, SPAN_KIND_CLIENT
+from app.config.profiling import record_wait
+from app.services.circuit_breaker import CircuitOpenError, get_circuit_breaker
 
 
 class WorldIDService:
     """Service for verifying WorldID proofs"""
     
+    def __init__(self, session: Optional[requests.Session] = None):
+        # Keep-alive connection pool to the verify endpoint, shared by all requests
+        self.session = session or requests.Session()
+        if session is None:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=worldid_settings.WORLDID_POOL_SIZE)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+        self.breaker = get_circuit_breaker("worldid", worldid_settings.WORLDID_SLOW_CALL_SECONDS)
+    
+    def warm_up(self) -> None:
+        """Open a connection to the verify endpoint ahead of the first request"""
+        try:
+            self.session.head(worldid_settings.WORLDID_VERIFY_URL, timeout=5)
+        except requests.exceptions.RequestException:
+            pass
+    
+    def close(self) -> None:
+        self.session.close()
+    
     @staticmethod
     def hash_world_id(nullifier_hash: str) -> str:
         """Hash the WorldID nullifier for storage"""
         return hashlib.sha256(nullifier_hash.encode()).hexdigest()
     
-    @staticmethod
-    def verify_proof(proof: Dict, signal: Optional[str] = None) -> Dict:
+    def verify_proof(self, proof: Dict, signal: Optional[str] = None) -> Dict:
         """
         Verify a WorldID proof
         
@@ -22,8 +44,38 @@ class WorldIDService:
             signal: Optional signal string (usually the wallet address)
         
         Returns:
-            Dict with 'success' and 'message' keys
+            Dict with 'success' and 'message' keys; 'unavailable' (and
+            'retry_after') when the verifier could not be reached or its
+            circuit breaker is open
         """
+        with tracer.start_span(
+            "WorldIDService.verify_proof",
+            {"worldid.action": worldid_settings.WORLDID_ACTION},
+            kind=SPAN_KIND_CLIENT
+        ) as span:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError as e:
+                if span is not None:
+                    span.error = str(e)
+                return {
+                    "success": False,
+                    "unavailable": True,
+                    "retry_after": e.retry_after,
+                    "message": "WorldID verification is temporarily unavailable"
+                }
+            started = time.perf_counter()
+            result = self._verify_proof(proof, signal)
+            # A rejected proof is a healthy answer; only upstream trouble counts as failure
+            self.breaker.record(not result.get("unavailable"), time.perf_counter() - started)
+            if span is not None:
+                span.set_attribute("worldid.success", result["success"])
+                if not result["success"]:
+                    span.error = result["message"]
+            return result
+    
+    def _verify_proof(self, proof: Dict, signal: Optional[str] = None) -> Dict:
+        """Perform the remote verification request"""
         try:
             verify_payload = {
                 "merkle_root": proof.get("merkle_root"),
@@ -35,11 +87,12 @@ class WorldIDService:
                 "action": worldid_settings.WORLDID_ACTION,
             }
             
-            response = requests.post(
-                worldid_settings.WORLDID_VERIFY_URL,
-                json=verify_payload,
-                timeout=10
-            )
+            with record_wait("http", f"POST {worldid_settings.WORLDID_VERIFY_URL}"):
+                response = self.session.post(
+                    worldid_settings.WORLDID_VERIFY_URL,
+                    json=verify_payload,
+                    timeout=worldid_settings.WORLDID_TIMEOUT_SECONDS
+                )
             
             if response.status_code == 200:
                 result = response.json()
@@ -57,12 +110,15 @@ class WorldIDService:
             else:
                 return {
                     "success": False,
+                    # Throttled or failing verifier, not a bad proof
+                    "unavailable": response.status_code == 429 or response.status_code >= 500,
                     "message": f"Verification request failed: {response.status_code}"
                 }
                 
         except requests.exceptions.RequestException as e:
             return {
                 "success": False,
+                "unavailable": True,
                 "message": f"Error verifying proof: {str(e)}"
             }
         except Exception as e:
@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+from typing import Dict
+from app.config.database import SessionLocal
+from app.config.logging import logger
+from app.config.worker import WorkerSettings, worker_settings
+from app.middleware.auth import purge_used_participant_tokens
+from app.services.archive_service import ArchiveService
+from app.services.entitlement_service import EntitlementService
+from app.services.event_deletion_service import EventDeletionService
+from app.services.stats_service import StatsService
+
+
+def run_once(settings: WorkerSettings = worker_settings) -> Dict:
+    """
+    One maintenance pass: prepare claims partitions, finish interrupted event
+    deletions, snapshot the entitlements of ended events, archive due events,
+    drop emptied partitions, forget expired session tokens and prune old
+    per-minute rollups
+    """
+    db = SessionLocal()
+    try:
+        created = ArchiveService.ensure_claim_partitions(db, settings)
+        deleted = EventDeletionService.resume_deletions(db, settings)
+        snapshotted = EntitlementService.snapshot_due_events(db, settings)
+        archived = ArchiveService.archive_due_events(db, settings)
+        dropped = ArchiveService.drop_archived_partitions(db)
+        tokens_purged = purge_used_participant_tokens(db)
+        rollups_pruned = StatsService.prune_minute_rollups(db, settings)
+    finally:
+        db.close()
+    return {
+        "partitions_created": created,
+        "events_deleted": deleted,
+        "entitlements_snapshotted": snapshotted,
+        "events_archived": archived,
+        "partitions_dropped": dropped,
+        "session_tokens_purged": tokens_purged,
+        "minute_rollups_pruned": rollups_pruned
+    }
+
+
+async def run(settings: WorkerSettings = worker_settings) -> None:
+    while True:
+        try:
+            result = await asyncio.to_thread(run_once, settings)
+            logger.info(f"Archival pass finished: {result}")
+        except Exception as e:
+            logger.error(f"Archival pass failed: {e}", exc_info=True)
+        await asyncio.sleep(settings.ARCHIVE_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    # Dedicated archiver process: python -m app.workers.archiver [--once]
+    parser = argparse.ArgumentParser(description="Archive finished events to cold storage")
+    parser.add_argument("--once", action="store_true", help="run a single pass (e.g. from cron) and exit")
+    args = parser.parse_args()
+    if args.once:
+        logger.info(f"Archival pass finished: {run_once()}")
+    else:
+        try:
+            asyncio.run(run())
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,544 @@
+import asyncio
+import functools
+import os
+import socket
+import threading
+import uuid
+from datetime import timedelta
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Set, Union
+from sqlalchemy import exists, select, true, update, func, or_, and_
+from app.config.blockchain import blockchain_settings
+from app.config.database import SessionLocal
+from app.config.logging import logger
+from app.config.tracing import tracer
+from app.config.worker import WorkerSettings, worker_settings
+from app.models.claim import Claim, ClaimStatus
+from app.models.event import Event
+from app.models.participant import Participant
+from app.models.reward import Reward, RewardType
+from app.services.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from app.services.claim_events import CLAIM_EVENT_COLUMNS, claim_event_hub, claim_event
+from app.services.inventory_service import InventoryService
+from app.services.payout_scheduler import PayoutScheduler
+from app.services.stats_service import StatsService, distributed_amount
+
+if TYPE_CHECKING:
+    from app.services.blockchain_service import BlockchainService
+
+# A blockchain client, or a factory for one; the factory is called once the
+# worker first has something to send, so web3 is not imported before that
+BlockchainServiceSource = Union["BlockchainService", Callable[[], "BlockchainService"]]
+
+
+class ClaimWorker:
+    """
+    Processes PENDING claims leased from the claims table
+
+    Any number of workers (in API processes or dedicated processes, on any
+    node) can run side by side: batches are picked with FOR UPDATE SKIP
+    LOCKED and stamped with the worker's lease, so two workers never hold
+    the same claim. A claim whose lease expired (its worker crashed) is
+    claimable again.
+
+    Leasing takes claims from all events in turn rather than by ID, and a
+    PayoutScheduler decides which leased claim is sent next, so one large
+    airdrop cannot hold up every other event's payouts. Leases of claims
+    waiting there are renewed every third of CLAIM_LEASE_SECONDS, and a
+    claim is only sent once its lease has been renewed on getting a slot.
+    """
+
+    def __init__(
+        self,
+        blockchain_service: Optional[BlockchainServiceSource] = None,
+        settings: WorkerSettings = worker_settings
+    ):
+        self.settings = settings
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._blockchain_service = blockchain_service
+        self._blockchain_service_lock = threading.Lock()
+        self.rpc_breaker = get_circuit_breaker("ethereum_rpc", blockchain_settings.ETHEREUM_RPC_SLOW_CALL_SECONDS)
+        self.scheduler = PayoutScheduler(settings)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # Claims leased by this worker and not finished yet
+        self._held: Set[int] = set()
+
+    @property
+    def blockchain_service(self) -> "BlockchainService":
+        with self._blockchain_service_lock:
+            if self._blockchain_service is None:
+                from app.services.blockchain_service import BlockchainService
+                self._blockchain_service = BlockchainService()
+            elif callable(self._blockchain_service):
+                self._blockchain_service = self._blockchain_service()
+            return self._blockchain_service
+
+    def lease_batch(self, limit: int, skip_organizers: Sequence[int] = ()) -> List[int]:
+        """
+        Lease up to `limit` claimable claims for this worker
+
+        Events take turns: the oldest claimable claim of every event comes
+        first, then the second oldest of every event, and so on. Only the
+        `limit` oldest claimable claims of each event are read (through the
+        partial index on event and ID), however large its backlog.
+
+        Args:
+            limit: Most claims to lease
+            skip_organizers: Organizers whose claims are not leased now
+
+        Returns:
+            IDs of the leased claims
+        """
+        db = SessionLocal()
+        try:
+            # Claims whose lease expired too often are given up on
+            abandoned = db.execute(
+                update(Claim)
+                .where(
+                    Claim.status == ClaimStatus.PROCESSING,
+                    Claim.lease_expires_at < func.now(),
+                    Claim.attempts >= self.settings.CLAIM_MAX_ATTEMPTS
+                )
+                .values(
+                    status=ClaimStatus.FAILED,
+                    error_message="Claim processing did not finish",
+                    lease_owner=None,
+                    lease_expires_at=None
+                )
+                .returning(*CLAIM_EVENT_COLUMNS)
+                .execution_options(synchronize_session=False)
+            ).all()
+            claim_event_hub.publish(db, [claim_event(row) for row in abandoned])
+            StatsService.record_claim_transitions(db, [
+                (row.event_id, ClaimStatus.PROCESSING, ClaimStatus.FAILED, None) for row in abandoned
+            ])
+
+            claimable = and_(
+                # Redundant with the conditions below, but lets the planner use ix_claims_claimable
+                Claim.status.in_([ClaimStatus.PENDING, ClaimStatus.PROCESSING]),
+                or_(
+                    Claim.status == ClaimStatus.PENDING,
+                    and_(
+                        Claim.status == ClaimStatus.PROCESSING,
+                        Claim.lease_expires_at < func.now()
+                    )
+                ),
+                Claim.attempts < self.settings.CLAIM_MAX_ATTEMPTS
+            )
+            events = select(Event.id).where(
+                Event.deleted_at.is_(None),
+                exists().where(Claim.event_id == Event.id, claimable)
+            )
+            if skip_organizers:
+                events = events.where(Event.organizer_id.not_in(skip_organizers))
+            events = events.subquery()
+            # Per event, a LIMITed scan of the index rather than a sort of its whole backlog
+            oldest = select(
+                Claim.id,
+                func.row_number().over(order_by=Claim.id).label("turn")
+            ).where(Claim.event_id == events.c.id, claimable).order_by(Claim.id).limit(limit).lateral()
+            fair_ids = (
+                select(oldest.c.id)
+                .select_from(events)
+                .join(oldest, true())
+                .order_by(oldest.c.turn, oldest.c.id)
+                .limit(limit)
+            )
+
+            # Row locks cannot be taken next to a window function, hence the second query;
+            # it re-checks claimability for rows another worker leased in between
+            candidates = db.execute(
+                select(Claim.id, Claim.event_id, Claim.status)
+                .where(Claim.id.in_(fair_ids), claimable)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not candidates:
+                db.commit()
+                return []
+
+            # The candidates stay row-locked until commit, so nobody else can lease them
+            leased = db.execute(
+                update(Claim)
+                .where(Claim.id.in_([row.id for row in candidates]))
+                .values(
+                    status=ClaimStatus.PROCESSING,
+                    lease_owner=self.owner,
+                    lease_expires_at=func.now() + timedelta(seconds=self.settings.CLAIM_LEASE_SECONDS),
+                    attempts=Claim.attempts + 1
+                )
+                .returning(*CLAIM_EVENT_COLUMNS)
+                .execution_options(synchronize_session=False)
+            ).all()
+            claim_event_hub.publish(db, [claim_event(row) for row in leased])
+            StatsService.record_claim_transitions(db, [
+                (row.event_id, row.status, ClaimStatus.PROCESSING, None) for row in candidates
+            ])
+            db.commit()
+            return sorted(row.id for row in leased)
+        finally:
+            db.close()
+
+    def renew_leases(self, claim_ids: Sequence[int]) -> Set[int]:
+        """
+        Extend this worker's leases on claims it is still processing
+
+        Returns:
+            IDs of the claims whose lease was renewed; the others were lost
+            (expired and leased by another worker) and must not be sent
+        """
+        if not claim_ids:
+            return set()
+        db = SessionLocal()
+        try:
+            renewed = db.scalars(
+                update(Claim)
+                .where(
+                    Claim.id.in_(claim_ids),
+                    Claim.lease_owner == self.owner,
+                    Claim.status == ClaimStatus.PROCESSING
+                )
+                .values(lease_expires_at=func.now() + timedelta(seconds=self.settings.CLAIM_LEASE_SECONDS))
+                .returning(Claim.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.commit()
+            return set(renewed)
+        finally:
+            db.close()
+
+    def _prepare_claim(self, claim_id: int) -> Optional[Dict]:
+        """Load a leased claim and allocate what it needs before sending"""
+        db = SessionLocal()
+        try:
+            claim = db.query(Claim).filter(
+                Claim.id == claim_id,
+                Claim.lease_owner == self.owner
+            ).first()
+            if claim is None:
+                return None
+
+            reward = db.query(Reward).filter(Reward.id == claim.reward_id).first()
+            organizer_id = db.query(Event.organizer_id).filter(Event.id == claim.event_id).scalar()
+
+            if claim.signed_transaction:
+                # Signed by an earlier attempt that may have reached the network:
+                # send that same transaction again rather than a second transfer
+                return {
+                    "claim_id": claim.id,
+                    "event_id": claim.event_id,
+                    "organizer_id": organizer_id,
+                    "signed_transaction": claim.signed_transaction,
+                    "transaction_hashes": [claim.transaction_hash] + list(claim.replaced_transaction_hashes or []),
+                }
+
+            if claim.transaction_hash:
+                # Broadcast by an earlier lease holder that died before finishing
+                claim.status = ClaimStatus.COMPLETED
+                claim.lease_owner = None
+                claim.lease_expires_at = None
+                claim_event_hub.publish(db, [claim_event(claim)])
+                StatsService.record_claim_transition(
+                    db, claim.event_id, ClaimStatus.PROCESSING, ClaimStatus.COMPLETED,
+                    distributed_amount(reward.reward_type, reward.amount)
+                )
+                db.commit()
+                return None
+
+            participant = db.query(Participant).filter(Participant.id == claim.participant_id).first()
+
+            # NFT rewards with a stocked inventory get a distinct token ID per claim
+            token_id = reward.token_id
+            if reward.reward_type != RewardType.ERC20 and InventoryService.has_inventory(db, reward.id):
+                token_id = InventoryService.reserve(db, reward.id, claim.id)
+            claim.token_id = token_id
+            db.commit()
+
+            return {
+                "claim_id": claim.id,
+                "event_id": claim.event_id,
+                "organizer_id": organizer_id,
+                "reward_type": reward.reward_type,
+                "token_address": reward.token_address,
+                "amount": reward.amount,
+                "token_id": token_id,
+                "wallet_address": participant.wallet_address,
+            }
+        finally:
+            db.close()
+
+    def _record_signed(self, claim_id: int, signed: Dict) -> None:
+        """
+        Store a signed transaction on its claim, in its own commit, before it is broadcast
+
+        Raises when the lease was lost, which stops the broadcast: the claim's
+        new lease holder sends it instead.
+        """
+        db = SessionLocal()
+        try:
+            recorded = db.execute(
+                update(Claim)
+                .where(Claim.id == claim_id, Claim.lease_owner == self.owner)
+                .values(
+                    sender_address=signed["sender_address"],
+                    nonce=signed["nonce"],
+                    gas_price=signed["gas_price"],
+                    transaction_hash=signed["transaction_hash"],
+                    signed_transaction=signed["raw_transaction"],
+                    replaced_transaction_hashes=None
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        if not recorded:
+            raise RuntimeError(f"Lost the lease on claim {claim_id} before broadcasting")
+
+    async def _send(self, job: Dict) -> Dict:
+        """Send the reward transfer for a prepared claim"""
+        from app.services.token_registry import token_registry
+        blockchain_service = await asyncio.to_thread(lambda: self.blockchain_service)
+
+        if job.get("signed_transaction"):
+            return await asyncio.to_thread(
+                blockchain_service.rebroadcast_transaction, job["signed_transaction"], job["transaction_hashes"]
+            )
+
+        reward_type = job["reward_type"]
+        wallet_address = job["wallet_address"]
+        on_signed = functools.partial(self._record_signed, job["claim_id"])
+
+        if reward_type != RewardType.ERC20 and job["token_id"] is None:
+            return {"success": False, "error": "Reward inventory exhausted"}
+
+        try:
+            metadata = await asyncio.to_thread(token_registry.get, blockchain_service.w3, job["token_address"])
+        except Exception as e:
+            logger.warning(f"Could not load token metadata for {job['token_address']}: {str(e)}")
+            metadata = None
+
+        if reward_type == RewardType.ERC20:
+            if metadata is None or metadata.decimals is None:
+                # Guessing the scale could pay out 10^12 times the amount: try again later
+                return {
+                    "success": False,
+                    "error": f"Could not read the decimals of token {job['token_address']}",
+                    "retryable": True
+                }
+            # Convert amount to the token's smallest unit
+            amount_wei = metadata.to_base_units(job["amount"])
+            return await blockchain_service.send_erc20_token_async(
+                job["token_address"],
+                wallet_address,
+                amount_wei,
+                affinity_key=wallet_address,
+                on_signed=on_signed,
+                claim_id=job["claim_id"]
+            )
+        elif reward_type == RewardType.ERC721:
+            if metadata and metadata.supports_erc721 is False:
+                return {"success": False, "error": "Token contract does not support ERC-721"}
+            return await blockchain_service.send_erc721_nft_async(
+                job["token_address"],
+                wallet_address,
+                job["token_id"],
+                affinity_key=wallet_address,
+                on_signed=on_signed,
+                claim_id=job["claim_id"]
+            )
+        elif reward_type == RewardType.ERC1155:
+            if metadata and metadata.supports_erc1155 is False:
+                return {"success": False, "error": "Token contract does not support ERC-1155"}
+            return await blockchain_service.send_erc1155_nft_async(
+                job["token_address"],
+                wallet_address,
+                job["token_id"],
+                affinity_key=wallet_address,
+                on_signed=on_signed,
+                claim_id=job["claim_id"]
+            )
+        return {"success": False, "error": "Unknown reward type"}
+
+    def _finish_claim(self, claim_id: int, result: Dict) -> None:
+        """Record the send result and release the lease"""
+        db = SessionLocal()
+        try:
+            # Locked so the status the stats transition starts from cannot change under us
+            claim = db.query(Claim).filter(
+                Claim.id == claim_id,
+                Claim.lease_owner == self.owner,
+                Claim.status == ClaimStatus.PROCESSING
+            ).with_for_update().first()
+            if claim is None:
+                logger.error(f"Lost the lease on claim {claim_id} before recording its result: {result}")
+                return
+
+            previous_status = claim.status
+            amount = None
+            if result.get("retryable"):
+                # Nothing was sent (RPC circuit open or token decimals unreadable):
+                # queue it again without using up an attempt
+                claim.status = ClaimStatus.PENDING
+                claim.error_message = result.get("error")
+                claim.attempts = max(0, claim.attempts - 1)
+                logger.warning(f"Reward claim {claim.id} deferred: {result.get('error')}")
+            elif result.get("success"):
+                reward = db.query(Reward).filter(Reward.id == claim.reward_id).first()
+                amount = distributed_amount(reward.reward_type, reward.amount)
+                claim.status = ClaimStatus.COMPLETED
+                claim.transaction_hash = result.get("transaction_hash")
+                # A rebroadcast keeps the sender, nonce and gas price stored when it was signed
+                for field in ("sender_address", "nonce", "gas_price"):
+                    if result.get(field) is not None:
+                        setattr(claim, field, result[field])
+                logger.info(f"Reward claim {claim.id} completed: {result.get('transaction_hash')}")
+            else:
+                claim.status = ClaimStatus.FAILED
+                claim.error_message = result.get("error", "Unknown error")
+                if result.get("nonce_consumed"):
+                    # The stored transaction can never be mined; a retry signs a new one
+                    claim.signed_transaction = None
+                    claim.transaction_hash = None
+                    claim.replaced_transaction_hashes = None
+                    claim.sender_address = None
+                    claim.nonce = None
+                    claim.gas_price = None
+                if not claim.signed_transaction:
+                    # Keep the token ID while a signed transfer of it may still be mined
+                    InventoryService.release(db, claim.id)
+                logger.error(f"Reward claim {claim.id} failed: {result.get('error')}")
+
+            claim.lease_owner = None
+            claim.lease_expires_at = None
+            claim_event_hub.publish(db, [claim_event(claim)])
+            StatsService.record_claim_transition(db, claim.event_id, previous_status, claim.status, amount)
+            db.commit()
+        finally:
+            db.close()
+
+    async def process_claim(self, claim_id: int) -> None:
+        """Send the reward for one leased claim"""
+        with tracer.start_span("ClaimWorker.process_claim", {"claim.id": claim_id}):
+            try:
+                job = await asyncio.to_thread(self._prepare_claim, claim_id)
+                if job is None:
+                    return
+                async with self.scheduler.slot(job["organizer_id"], job["event_id"]):
+                    # The claim may have waited for its slot past its lease
+                    if not await asyncio.to_thread(self.renew_leases, [claim_id]):
+                        logger.warning(f"Lost the lease on claim {claim_id} while it waited to be sent")
+                        return
+                    result = await self._send(job)
+            except Exception as e:
+                logger.error(f"Exception processing claim {claim_id}: {str(e)}")
+                result = {"success": False, "error": str(e), "retryable": isinstance(e, CircuitOpenError)}
+            finally:
+                self._held.discard(claim_id)
+            await asyncio.to_thread(self._finish_claim, claim_id, result)
+
+    def wake(self) -> None:
+        """Skip the poll delay, e.g. right after new claims were created"""
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        """Lease and process claims until cancelled"""
+        logger.info(f"Claim worker {self.owner} started")
+        # Claims are leased whenever there is room, not batch by batch, so a
+        # throttled organizer's claims never hold back a whole batch
+        tasks: Set[asyncio.Task] = set()
+        loop = asyncio.get_running_loop()
+        renew_every = self.settings.CLAIM_LEASE_SECONDS / 3
+        renewed_at = loop.time()
+
+        try:
+            while True:
+                if self._held and loop.time() - renewed_at >= renew_every:
+                    renewed_at = loop.time()
+                    try:
+                        await asyncio.to_thread(self.renew_leases, list(self._held))
+                    except Exception as e:
+                        logger.error(f"Claim worker {self.owner} could not renew its leases: {str(e)}")
+
+                pause = self.rpc_breaker.retry_after()
+                if pause:
+                    # The RPC is down: leave claims queued rather than lease and defer them
+                    await asyncio.sleep(pause)
+                    continue
+
+                room = min(self.settings.CLAIM_WORKER_BATCH_SIZE, self.settings.CLAIM_WORKER_CONCURRENCY - len(tasks))
+                claim_ids = []
+                if room > 0:
+                    try:
+                        claim_ids = await asyncio.to_thread(
+                            self.lease_batch, room, self.scheduler.saturated_organizers()
+                        )
+                    except Exception as e:
+                        logger.error(f"Claim worker {self.owner} could not lease claims: {str(e)}")
+
+                if claim_ids:
+                    self._held.update(claim_ids)
+                    for claim_id in claim_ids:
+                        task = asyncio.create_task(self.process_claim(claim_id))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                    continue
+
+                # Lease again on a wakeup, when a claim finishes, or after the poll delay
+                self._wakeup.clear()
+                wakeup = asyncio.ensure_future(self._wakeup.wait())
+                await asyncio.wait(
+                    tasks | {wakeup},
+                    timeout=self.settings.CLAIM_WORKER_POLL_SECONDS,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                wakeup.cancel()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def start(self) -> None:
+        """Run the worker as a task on the current event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run(), name="claim-worker")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# Worker running inside this process, if any
+local_worker: Optional[ClaimWorker] = None
+
+
+def start_local_worker(blockchain_service: Optional[BlockchainServiceSource] = None) -> ClaimWorker:
+    """Start a worker inside the API process (on its event loop)"""
+    global local_worker
+    if local_worker is None:
+        local_worker = ClaimWorker(blockchain_service)
+    local_worker.start()
+    return local_worker
+
+
+async def stop_local_worker() -> None:
+    global local_worker
+    if local_worker is not None:
+        await local_worker.stop()
+        local_worker = None
+
+
+def wake_local_worker() -> None:
+    """Tell the in-process worker new claims are waiting"""
+    if local_worker is not None:
+        local_worker.wake()
+
+
+if __name__ == "__main__":
+    # Dedicated worker process: python -m app.workers.claim_worker
+    local_worker = ClaimWorker()
+    try:
+        asyncio.run(local_worker.run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,377 @@
+"""
+Generate a production-sized synthetic dataset
+
+Fills organizers, events, rewards, participants, event_participants and
+claims with skewed distributions, loaded with COPY:
+
+  - events per organizer and joins per event follow Zipf laws
+    (--organizer-skew, --event-skew): a few organizers run most events and
+    a few events draw most participants
+  - each participant joins a geometric number of events (mean
+    --joins-per-participant), at a random time during the event
+  - --claim-rate of the joins claim every reward of their event, mostly
+    COMPLETED, some FAILED or still PENDING
+
+event_stats and the minute/hour rollups are then built from the generated
+rows, so the stats endpoints agree with the tables. Rows are appended after
+the existing IDs and the same --seed gives the same dataset, so reports of
+benchmarks.query_benchmark stay comparable between runs.
+
+Usage (against a disposable PostgreSQL database at `alembic upgrade head`):
+    DATABASE_URL=postgresql://... python -m benchmarks.generate_dataset
+    DATABASE_URL=postgresql://... python -m benchmarks.generate_dataset --participants 10000 --events 500
+"""
+import argparse
+import bisect
+import csv
+import io
+import itertools
+import random
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import text
+from app.config.database import engine
+from app.models.claim import ClaimStatus
+from app.models.reward import RewardType
+from app.services.archive_service import CLAIM_PARTITION_SIZE, claim_partition_name
+from app.services.worldid_service import WorldIDService
+
+COPY_BATCH_ROWS = 50_000
+
+# (value, weight) of generated rewards and claims
+REWARD_TYPES = ((RewardType.ERC20, 0.7), (RewardType.ERC721, 0.2), (RewardType.ERC1155, 0.1))
+CLAIM_STATUSES = ((ClaimStatus.COMPLETED, 0.88), (ClaimStatus.FAILED, 0.04), (ClaimStatus.PENDING, 0.08))
+
+TOKEN_ADDRESSES = {
+    RewardType.ERC20: "0x" + "20" * 20,
+    RewardType.ERC721: "0x" + "72" * 20,
+    RewardType.ERC1155: "0x" + "55" * 20,
+}
+
+# Statistics of the new events, counted from their generated rows
+EVENT_STATS_SQL = text("""
+    INSERT INTO event_stats (
+        event_id, shard, participant_count,
+        claims_pending, claims_processing, claims_completed, claims_failed, tokens_distributed
+    )
+    SELECT
+        e.id, 0,
+        COALESCE(j.joins, 0),
+        COALESCE(c.pending, 0), COALESCE(c.processing, 0), COALESCE(c.completed, 0), COALESCE(c.failed, 0),
+        COALESCE(c.tokens, 0)
+    FROM events e
+    LEFT JOIN (
+        SELECT event_id, COUNT(*) AS joins FROM event_participants
+        WHERE event_id BETWEEN :first AND :last GROUP BY event_id
+    ) j ON j.event_id = e.id
+    LEFT JOIN (
+        SELECT
+            claims.event_id,
+            COUNT(*) FILTER (WHERE status = 'PENDING') AS pending,
+            COUNT(*) FILTER (WHERE status = 'PROCESSING') AS processing,
+            COUNT(*) FILTER (WHERE status = 'COMPLETED') AS completed,
+            COUNT(*) FILTER (WHERE status = 'FAILED') AS failed,
+            SUM(CASE WHEN status <> 'COMPLETED' THEN 0 WHEN reward_type = 'ERC20' THEN COALESCE(amount, 0) ELSE 1 END) AS tokens
+        FROM claims JOIN rewards ON rewards.id = claims.reward_id
+        WHERE claims.event_id BETWEEN :first AND :last GROUP BY claims.event_id
+    ) c ON c.event_id = e.id
+    WHERE e.id BETWEEN :first AND :last
+""")
+
+# Each join and each claim counted in the bucket it happened in
+EVENT_ROLLUPS_SQL = text("""
+    INSERT INTO event_rollups (
+        event_id, granularity, bucket_start, shard, joins,
+        claims_pending, claims_processing, claims_completed, claims_failed, tokens_distributed
+    )
+    SELECT event_id, :granularity, bucket, 0, SUM(joins), SUM(pending), 0, SUM(completed), SUM(failed), SUM(tokens)
+    FROM (
+        SELECT event_id, date_trunc(:granularity, joined_at) AS bucket,
+            1 AS joins, 0 AS pending, 0 AS completed, 0 AS failed, 0 AS tokens
+        FROM event_participants WHERE event_id BETWEEN :first AND :last
+        UNION ALL
+        SELECT claims.event_id, date_trunc(:granularity, claims.created_at), 0,
+            (status = 'PENDING')::int, (status = 'COMPLETED')::int, (status = 'FAILED')::int,
+            CASE WHEN status <> 'COMPLETED' THEN 0 WHEN reward_type = 'ERC20' THEN COALESCE(amount, 0) ELSE 1 END
+        FROM claims JOIN rewards ON rewards.id = claims.reward_id
+        WHERE claims.event_id BETWEEN :first AND :last
+    ) activity
+    GROUP BY event_id, bucket
+""")
+
+TABLES = ("organizers", "events", "rewards", "participants", "event_participants", "claims")
+
+
+def synthetic_nullifier(participant_id: int) -> str:
+    """WorldID nullifier of a generated participant (its world_id_hash is the hash of this)"""
+    return f"bench-nullifier-{participant_id}"
+
+
+def synthetic_wallet(participant_id: int) -> str:
+    # Decimal digits only: already in checksum form, so lookups by address match
+    return f"0x{participant_id:040d}"
+
+
+class ZipfSampler:
+    """Draws 0..n-1 with probability proportional to 1 / rank ** skew, ranks shuffled over the IDs"""
+
+    def __init__(self, n: int, skew: float, rng: random.Random):
+        self.rng = rng
+        # Popularity is not tied to ID order (the hottest event is not simply the first)
+        self.order = list(range(n))
+        rng.shuffle(self.order)
+        self.cumulative = list(itertools.accumulate(1 / (rank + 1) ** skew for rank in range(n)))
+
+    def sample(self) -> int:
+        return self.order[bisect.bisect(self.cumulative, self.rng.random() * self.cumulative[-1])]
+
+
+class CopyWriter:
+    """Buffers rows of one table and loads them with COPY ... FROM STDIN in batches"""
+
+    def __init__(self, cursor, table: str, columns: Sequence[str]):
+        self.cursor = cursor
+        self.table = table
+        self.sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        self.rows: List[tuple] = []
+        self.count = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.rows) >= COPY_BATCH_ROWS
+
+    def add(self, row: tuple) -> None:
+        self.rows.append(row)
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        buffer = io.StringIO()
+        # None is written as an empty unquoted field, which COPY reads as NULL
+        csv.writer(buffer).writerows(self.rows)
+        buffer.seek(0)
+        self.cursor.copy_expert(self.sql, buffer)
+        self.count += len(self.rows)
+        self.rows = []
+
+
+def flush_in_order(writers: Sequence[CopyWriter], force: bool = False) -> None:
+    """Flush every writer, parents first, once any of them is full (foreign keys are checked per COPY)"""
+    if force or any(writer.full for writer in writers):
+        for writer in writers:
+            writer.flush()
+
+
+def weighted(rng: random.Random, choices) -> object:
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def geometric(rng: random.Random, mean: float, cap: int = 50) -> int:
+    """1, 2, ... with the given mean"""
+    count = 1
+    while count < cap and rng.random() > 1 / mean:
+        count += 1
+    return count
+
+
+def at(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def next_ids(cursor) -> dict:
+    ids = {}
+    for table in TABLES:
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        ids[table] = cursor.fetchone()[0] + 1
+    return ids
+
+
+def prepare_claim_partitions(cursor, first_event_id: int, last_event_id: int) -> None:
+    """Partitions covering the new events, so their claims don't all land in claims_default"""
+    cursor.execute("SELECT relkind FROM pg_class WHERE relname = 'claims'")
+    if cursor.fetchone()[0] != "p":
+        return
+    for lower in range(first_event_id // CLAIM_PARTITION_SIZE * CLAIM_PARTITION_SIZE, last_event_id + 1, CLAIM_PARTITION_SIZE):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {claim_partition_name(lower)} PARTITION OF claims "
+            f"FOR VALUES FROM ({lower}) TO ({lower + CLAIM_PARTITION_SIZE})"
+        )
+
+
+def generate(
+    organizers: int,
+    events: int,
+    participants: int,
+    joins_per_participant: float,
+    claim_rate: float,
+    organizer_skew: float,
+    event_skew: float,
+    days: int,
+    seed: int
+) -> dict:
+    rng = random.Random(seed)
+    now = time.time()
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        ids = next_ids(cursor)
+        first_event_id = ids["events"]
+        last_event_id = first_event_id + events - 1
+
+        # Organizers, events and their rewards
+        organizer_writer = CopyWriter(cursor, "organizers", ("id", "email", "hashed_password", "name", "is_active", "created_at"))
+        event_writer = CopyWriter(cursor, "events", (
+            "id", "organizer_id", "name", "description", "start_date", "end_date", "is_active", "created_at"
+        ))
+        reward_writer = CopyWriter(cursor, "rewards", (
+            "id", "event_id", "reward_type", "token_address", "amount", "token_id", "name"
+        ))
+        started_at = now - days * 86400
+        for i in range(organizers):
+            organizer_id = ids["organizers"] + i
+            organizer_writer.add((
+                organizer_id, f"bench-{organizer_id}@example.com", "-", f"Organizer {organizer_id}", True, at(started_at)
+            ))
+
+        organizer_sampler = ZipfSampler(organizers, organizer_skew, rng)
+        # (start, end, [(reward id, reward type, amount)]) per event index
+        event_windows: List[Tuple[float, float, List[Tuple[int, RewardType, Optional[int]]]]] = []
+        reward_id = ids["rewards"]
+        for i in range(events):
+            event_id = first_event_id + i
+            start = now - rng.random() * days * 86400
+            end = start + rng.uniform(1, 14) * 86400
+            event_writer.add((
+                event_id,
+                ids["organizers"] + organizer_sampler.sample(),
+                f"Event {event_id}",
+                "Synthetic benchmark event",
+                at(start),
+                at(end),
+                end > now,
+                at(start - 86400)
+            ))
+            rewards = []
+            for _ in range(rng.randint(1, 3)):
+                reward_type = weighted(rng, REWARD_TYPES)
+                amount = rng.randint(1, 100) if reward_type == RewardType.ERC20 else None
+                reward_writer.add((
+                    reward_id,
+                    event_id,
+                    reward_type.name,
+                    TOKEN_ADDRESSES[reward_type],
+                    amount,
+                    None if reward_type == RewardType.ERC20 else rng.randint(1, 10_000),
+                    f"{reward_type.value} reward"
+                ))
+                rewards.append((reward_id, reward_type, amount))
+                reward_id += 1
+            event_windows.append((start, min(end, now), rewards))
+            flush_in_order((organizer_writer, event_writer, reward_writer))
+        flush_in_order((organizer_writer, event_writer, reward_writer), force=True)
+        prepare_claim_partitions(cursor, first_event_id, last_event_id)
+
+        # Participants with their joins and claims
+        participant_writer = CopyWriter(cursor, "participants", ("id", "world_id_hash", "wallet_address", "created_at"))
+        join_writer = CopyWriter(cursor, "event_participants", ("id", "event_id", "participant_id", "joined_at"))
+        claim_writer = CopyWriter(cursor, "claims", (
+            "id", "event_id", "participant_id", "reward_id", "status", "transaction_hash", "error_message",
+            "attempts", "created_at"
+        ))
+        event_sampler = ZipfSampler(events, event_skew, rng)
+        join_id = ids["event_participants"]
+        claim_id = ids["claims"]
+        for i in range(participants):
+            participant_id = ids["participants"] + i
+            joined = sorted({event_sampler.sample() for _ in range(geometric(rng, joins_per_participant))})
+            joins = []
+            for event_index in joined:
+                start, end, rewards = event_windows[event_index]
+                joins.append((event_index, start + rng.random() * (end - start), rewards))
+
+            participant_writer.add((
+                participant_id,
+                WorldIDService.hash_world_id(synthetic_nullifier(participant_id)),
+                synthetic_wallet(participant_id),
+                at(min(joined_at for _, joined_at, _ in joins))
+            ))
+            for event_index, joined_at, rewards in joins:
+                event_id = first_event_id + event_index
+                join_writer.add((join_id, event_id, participant_id, at(joined_at)))
+                join_id += 1
+                if rng.random() >= claim_rate:
+                    continue
+                claimed_at = min(joined_at + rng.random() * 3600, now)
+                for reward in rewards:
+                    status = weighted(rng, CLAIM_STATUSES)
+                    claim_writer.add((
+                        claim_id,
+                        event_id,
+                        participant_id,
+                        reward[0],
+                        status.name,
+                        f"0x{claim_id:064x}" if status == ClaimStatus.COMPLETED else None,
+                        "Transaction failed: synthetic failure" if status == ClaimStatus.FAILED else None,
+                        0 if status == ClaimStatus.PENDING else 1,
+                        at(claimed_at)
+                    ))
+                    claim_id += 1
+            flush_in_order((participant_writer, join_writer, claim_writer))
+        flush_in_order((participant_writer, join_writer, claim_writer), force=True)
+
+        # Sequences continue after the explicit IDs
+        for table in TABLES:
+            cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))")
+        connection.commit()
+
+        counts = {
+            writer.table: writer.count
+            for writer in (organizer_writer, event_writer, reward_writer, participant_writer, join_writer, claim_writer)
+        }
+    finally:
+        connection.close()
+
+    with engine.begin() as db:
+        bounds = {"first": first_event_id, "last": last_event_id}
+        db.execute(EVENT_STATS_SQL, bounds)
+        for granularity in ("minute", "hour"):
+            db.execute(EVENT_ROLLUPS_SQL, {**bounds, "granularity": granularity})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as db:
+        for table in TABLES + ("event_stats", "event_rollups"):
+            db.execute(text(f"ANALYZE {table}"))
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--organizers", type=int, default=2_000)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--participants", type=int, default=1_000_000)
+    parser.add_argument("--joins-per-participant", type=float, default=3.0)
+    parser.add_argument("--claim-rate", type=float, default=0.6, help="share of joins that claim")
+    parser.add_argument("--organizer-skew", type=float, default=1.0, help="Zipf exponent of events per organizer")
+    parser.add_argument("--event-skew", type=float, default=1.1, help="Zipf exponent of joins per event")
+    parser.add_argument("--days", type=int, default=365, help="events start within this many days back")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        parser.error("COPY needs PostgreSQL: point DATABASE_URL at a disposable PostgreSQL database")
+
+    started = time.perf_counter()
+    counts = generate(
+        args.organizers,
+        args.events,
+        args.participants,
+        args.joins_per_participant,
+        args.claim_rate,
+        args.organizer_skew,
+        args.event_skew,
+        args.days,
+        args.seed
+    )
+    for table, count in counts.items():
+        print(f"{table + ':':<20} {count}")
+    print(f"elapsed:             {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,98 @@
+"""
+Benchmark API worker cold start
+
+Starts a fresh interpreter per run (like a newly scaled-out worker), imports
+app.main, runs the app's startup and serves one GET /health. Reports the
+import time and the time to first response, plus the slowest imports of the
+last run according to python -X importtime.
+
+Usage:
+    python -m benchmarks.import_time --runs 5
+    python -m benchmarks.import_time --max-seconds 1.5   # exit 1 when slower (for CI)
+
+The chain path must stay out of the API's startup: web3 should not appear
+among the slowest imports unless CLAIM_WORKER_ENABLED pre-warms it.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = r"""
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    response = client.get("/health")
+    first_response = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - started,
+    "first_response_seconds": first_response - started,
+    "status_code": response.status_code,
+}))
+"""
+
+
+def run_once(env: dict) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(completed.stderr)
+    return result
+
+
+def parse_importtime(stderr: str) -> list:
+    """(cumulative microseconds, module) for each top-level-ish import line"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        try:
+            imports.append((int(cumulative), module.rstrip()))
+        except ValueError:
+            continue
+    return imports
+
+
+def run(runs: int, top: int, max_seconds: float) -> int:
+    env = dict(os.environ)
+    # Startup must not wait on the claim worker or chain warm-up to be measured fairly
+    env.setdefault("CLAIM_WORKER_ENABLED", "false")
+    env.setdefault("TRACING_ENABLED", "false")
+
+    results = [run_once(env) for _ in range(runs)]
+    imports = [result["import_seconds"] for result in results]
+    first_responses = [result["first_response_seconds"] for result in results]
+
+    print(f"runs:                     {runs}")
+    print(f"import app.main (median): {statistics.median(imports) * 1000:.0f}ms")
+    print(f"first response (median):  {statistics.median(first_responses) * 1000:.0f}ms")
+    print(f"first response (max):     {max(first_responses) * 1000:.0f}ms")
+    print(f"slowest imports (last run, cumulative):")
+    for cumulative, module in sorted(results[-1]["imports"], reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {module.strip()}")
+
+    if max_seconds and statistics.median(first_responses) > max_seconds:
+        print(f"time to first response exceeds {max_seconds}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-seconds", type=float, default=0)
+    args = parser.parse_args()
+    sys.exit(run(args.runs, args.top, args.max_seconds))
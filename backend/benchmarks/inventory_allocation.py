@@ -0,0 +1,119 @@
+"""
+Benchmark NFT token ID allocation under contention
+
+Stocks a reward with N token IDs, creates one pending claim per token and
+lets W threads reserve IDs concurrently, each reservation in its own
+transaction, like concurrent claim requests do. Reports the allocation rate
+and checks every claim got a distinct ID.
+
+Usage (against a disposable PostgreSQL database):
+    DATABASE_URL=postgresql://... python -m benchmarks.inventory_allocation --tokens 20000 --workers 32
+"""
+import argparse
+import threading
+import time
+import uuid
+from app.config.database import Base, SessionLocal, engine
+from app.models import Organizer, Event, Reward, Participant, Claim
+from app.models.claim import ClaimStatus
+from app.models.reward import RewardType
+from app.services.inventory_service import InventoryService
+
+
+def setup_fixture(tokens: int):
+    """Create an organizer, event, ERC-721 reward, stocked inventory and pending claims"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        run_id = uuid.uuid4().hex[:8]
+        organizer = Organizer(email=f"bench-{run_id}@example.com", hashed_password="-", name="bench")
+        db.add(organizer)
+        db.flush()
+        event = Event(organizer_id=organizer.id, name=f"inventory bench {run_id}")
+        db.add(event)
+        db.flush()
+        reward = Reward(event_id=event.id, reward_type=RewardType.ERC721, token_address="0x" + "00" * 20)
+        db.add(reward)
+        db.flush()
+
+        InventoryService.load_range(db, reward.id, 1, tokens)
+
+        db.execute(Participant.__table__.insert(), [
+            {"world_id_hash": f"{run_id}-{i}", "wallet_address": f"0x{run_id}{i:032x}"}
+            for i in range(tokens)
+        ])
+        participant_ids = [
+            participant_id for (participant_id,) in db.query(Participant.id).filter(
+                Participant.world_id_hash.like(f"{run_id}-%")
+            )
+        ]
+        db.execute(Claim.__table__.insert(), [
+            {"event_id": event.id, "participant_id": participant_id, "reward_id": reward.id, "status": ClaimStatus.PENDING}
+            for participant_id in participant_ids
+        ])
+        claim_ids = [
+            claim_id for (claim_id,) in db.query(Claim.id).filter(Claim.reward_id == reward.id)
+        ]
+        db.commit()
+        return reward.id, claim_ids
+    finally:
+        db.close()
+
+
+def run(tokens: int, workers: int) -> None:
+    reward_id, claim_ids = setup_fixture(tokens)
+    lock = threading.Lock()
+    pending = list(claim_ids)
+    allocated = {}
+    latencies = []
+
+    def worker():
+        db = SessionLocal()
+        try:
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    claim_id = pending.pop()
+                started = time.perf_counter()
+                token_id = InventoryService.reserve(db, reward_id, claim_id)
+                db.commit()
+                elapsed = time.perf_counter() - started
+                with lock:
+                    allocated[claim_id] = token_id
+                    latencies.append(elapsed)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = time.perf_counter() - started
+
+    token_ids = [token_id for token_id in allocated.values() if token_id is not None]
+    latencies.sort()
+    print(f"claims:            {len(claim_ids)}")
+    print(f"workers:           {workers}")
+    print(f"allocated:         {len(token_ids)}")
+    print(f"distinct:          {len(set(token_ids)) == len(token_ids)}")
+    print(f"elapsed:           {total:.2f}s")
+    print(f"allocations/sec:   {len(latencies) / total:.0f}")
+    print(f"p50 latency:       {latencies[len(latencies) // 2] * 1000:.2f}ms")
+    print(f"p99 latency:       {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms")
+
+    db = SessionLocal()
+    try:
+        print(f"left in inventory: {InventoryService.available_count(db, reward_id)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+    run(args.tokens, args.workers)
@@ -0,0 +1,302 @@
+"""
+Time every API route's queries against a generated dataset
+
+Runs each route in-process (TestClient) against a database filled by
+benchmarks.generate_dataset. Event routes run for a hot event (most joins),
+a median one and a cold one, each as its own organizer. For every route the
+report holds the wall time and the SQL statements issued per request (count
+and database time), written as JSON with --output.
+
+Give a previous report as --baseline to compare: a route whose median got
+slower by more than --max-regression (and by at least --min-delta-ms), or
+that issues more statements than before, is flagged and the exit status is 1.
+
+Join and claim run with a WorldID verifier that accepts every proof and with
+the per-IP rate limit cleared between requests, so only the database work is
+timed; they add rows on every run. The claim status stream is left out (it
+does not end).
+
+Usage:
+    DATABASE_URL=postgresql://... python -m benchmarks.query_benchmark --output before.json
+    DATABASE_URL=postgresql://... python -m benchmarks.query_benchmark --baseline before.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+# Settings are read at import: keep the worker and exporters out of the measurements
+os.environ.setdefault("CLAIM_WORKER_ENABLED", "false")
+os.environ.setdefault("TRACING_ENABLED", "false")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func
+import app.main
+from app.config.database import SessionLocal, engine, replicas
+from app.middleware.auth import create_access_token
+from app.middleware.rate_limit import rate_limiter
+from app.models import Organizer, Event, Reward, Participant, Claim
+from app.models.claim import ClaimStatus
+from app.models.event_participant import EventParticipant
+from app.models.event_stats import EventStats
+from app.services.container import get_worldid_service
+from app.services.worldid_service import WorldIDService
+from benchmarks.generate_dataset import synthetic_nullifier, synthetic_wallet
+
+BENCHMARK_EVENT_NAME = "Benchmark event"
+
+
+class AcceptingVerifier(WorldIDService):
+    """Accepts every proof without calling the WorldID API"""
+
+    def verify_proof(self, proof: Dict, signal: Optional[str] = None) -> Dict:
+        return {"success": True, "message": "Verified (benchmark)"}
+
+
+class StatementRecorder:
+    """Counts the SQL statements executed and the time spent in them"""
+
+    def __init__(self, engines):
+        self.statements = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+        for bound in engines:
+            event.listen(bound, "before_cursor_execute", self._before)
+            event.listen(bound, "after_cursor_execute", self._after)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.statements = 0
+            self.seconds = 0.0
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("benchmark_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["benchmark_started"].pop()
+        with self._lock:
+            self.statements += 1
+            self.seconds += elapsed
+
+
+def pick_targets() -> Dict[str, Dict]:
+    """Hot, median and cold events by participant count, with what their routes need"""
+    db = SessionLocal()
+    try:
+        joins = func.sum(EventStats.participant_count)
+        ranked = db.query(EventStats.event_id, joins.label("joins")).join(Event, Event.id == EventStats.event_id).filter(
+            Event.archived_at.is_(None),
+            Event.deleted_at.is_(None)
+        ).group_by(EventStats.event_id).having(joins > 0).order_by(joins.desc(), EventStats.event_id).all()
+        if not ranked:
+            raise SystemExit("No events with participants: run benchmarks.generate_dataset first")
+
+        targets = {}
+        for name, index in (("hot", 0), ("median", len(ranked) // 2), ("cold", len(ranked) - 1)):
+            event_id, participant_count = ranked[index]
+            event_row = db.query(Event).filter(Event.id == event_id).one()
+            organizer = db.query(Organizer).filter(Organizer.id == event_row.organizer_id).one()
+            wallet = db.query(Participant.wallet_address).join(
+                EventParticipant, EventParticipant.participant_id == Participant.id
+            ).filter(EventParticipant.event_id == event_id).order_by(Participant.id).limit(1).scalar()
+            # Joined participants without claims yet, or with only entitlements: each claim request uses up one
+            claimers = [
+                participant_id for (participant_id,) in db.query(EventParticipant.participant_id).outerjoin(
+                    Claim,
+                    (Claim.event_id == EventParticipant.event_id) & (Claim.participant_id == EventParticipant.participant_id)
+                ).filter(
+                    EventParticipant.event_id == event_id,
+                    Claim.id.is_(None) | (Claim.status == ClaimStatus.ENTITLED)
+                ).distinct().order_by(EventParticipant.participant_id).limit(1000)
+            ]
+            targets[name] = {
+                "event_id": event_id,
+                "participants": int(participant_count),
+                "start": event_row.start_date.isoformat() if event_row.start_date else None,
+                "reward_id": db.query(Reward.id).filter(Reward.event_id == event_id).order_by(Reward.id).limit(1).scalar(),
+                "wallet": wallet,
+                "claimers": claimers,
+                "headers": {"Authorization": f"Bearer {create_access_token({'sub': organizer.email})}"},
+            }
+        return targets
+    finally:
+        db.close()
+
+
+def join_body(target: Dict) -> Dict:
+    unique = uuid.uuid4().int
+    return {
+        "world_id_proof": {"nullifier_hash": f"bench-join-{unique}"},
+        "wallet_address": synthetic_wallet(unique % 10**39 + 10**39),
+    }
+
+
+def claim_body(target: Dict) -> Optional[Dict]:
+    if not target["claimers"]:
+        return None
+    return {"world_id_proof": {"nullifier_hash": synthetic_nullifier(target["claimers"].pop())}}
+
+
+def event_routes(target: Dict) -> Dict[str, Callable[[TestClient], Optional[object]]]:
+    """Requests of the routes that take an event, by route name"""
+    event_id = target["event_id"]
+    headers = target["headers"]
+    base = f"/api/organizers/events/{event_id}"
+
+    def claim(client: TestClient):
+        body = claim_body(target)
+        return None if body is None else client.post(f"/api/{event_id}/claim", json=body)
+
+    routes = {
+        "GET /api/{event_id}": lambda client: client.get(f"/api/{event_id}"),
+        "GET /api/profile/{wallet}": lambda client: client.get(f"/api/profile/{target['wallet']}"),
+        "POST /api/{event_id}/join": lambda client: client.post(f"/api/{event_id}/join", json=join_body(target)),
+        "POST /api/{event_id}/claim": claim,
+        "GET /api/organizers/events": lambda client: client.get("/api/organizers/events", headers=headers),
+        "GET /api/organizers/events/{id}": lambda client: client.get(base, headers=headers),
+        "PUT /api/organizers/events/{id}": lambda client: client.put(
+            base, json={"description": "Synthetic benchmark event"}, headers=headers
+        ),
+        "GET /api/organizers/events/{id}/participants": lambda client: client.get(f"{base}/participants", headers=headers),
+        "GET /api/organizers/events/{id}/claims": lambda client: client.get(f"{base}/claims", headers=headers),
+        "GET /api/organizers/events/{id}/export": lambda client: client.get(f"{base}/export?table=claims", headers=headers),
+        "GET /api/organizers/events/{id}/stats": lambda client: client.get(f"{base}/stats", headers=headers),
+        "GET /api/organizers/events/{id}/timeseries": lambda client: client.get(
+            f"{base}/timeseries", params={"granularity": "hour", "start": target["start"]}, headers=headers
+        ),
+    }
+    if target["reward_id"] is not None:
+        routes["GET /api/organizers/events/{id}/rewards/{reward_id}/inventory"] = lambda client: client.get(
+            f"{base}/rewards/{target['reward_id']}/inventory", headers=headers
+        )
+    return routes
+
+
+def global_routes(targets: Dict[str, Dict]) -> Dict[str, Callable[[TestClient], Optional[object]]]:
+    headers = targets["hot"]["headers"]
+    return {
+        "GET /api": lambda client: client.get("/api"),
+        "GET /api/organizers/me": lambda client: client.get("/api/organizers/me", headers=headers),
+        "POST /api/organizers/events": lambda client: client.post(
+            "/api/organizers/events", json={"name": BENCHMARK_EVENT_NAME, "rewards": []}, headers=headers
+        ),
+    }
+
+
+def remove_created_events() -> None:
+    """Drop the events POST /api/organizers/events made, so browse sees the same data next run"""
+    db = SessionLocal()
+    try:
+        db.query(Event).filter(Event.name == BENCHMARK_EVENT_NAME).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def measure(client: TestClient, recorder: StatementRecorder, request, iterations: int, warmup: int) -> Optional[Dict]:
+    wall, database, statements, statuses = [], [], [], set()
+    for i in range(warmup + iterations):
+        rate_limiter.requests.clear()
+        recorder.reset()
+        started = time.perf_counter()
+        response = request(client)
+        elapsed = time.perf_counter() - started
+        if response is None:
+            # Nothing left to request (e.g. no participant left to claim)
+            break
+        if i < warmup:
+            continue
+        wall.append(elapsed)
+        database.append(recorder.seconds)
+        statements.append(recorder.statements)
+        statuses.add(response.status_code)
+    if not wall:
+        return None
+    wall.sort()
+    return {
+        "requests": len(wall),
+        "status": sorted(statuses),
+        "p50_ms": round(statistics.median(wall) * 1000, 3),
+        "p95_ms": round(wall[min(len(wall) - 1, int(len(wall) * 0.95))] * 1000, 3),
+        "db_p50_ms": round(statistics.median(database) * 1000, 3),
+        "statements": int(statistics.median(statements)),
+    }
+
+
+def compare(report: Dict, baseline: Dict, max_regression: float, min_delta_ms: float) -> List[str]:
+    """Routes slower or chattier than in the baseline"""
+    regressions = []
+    print(f"\n{'route':<78} {'p50 ms':>10} {'baseline':>10} {'change':>8} {'stmts':>6} {'before':>6}")
+    for name, result in report["routes"].items():
+        before = baseline.get("routes", {}).get(name)
+        if before is None:
+            print(f"{name:<78} {result['p50_ms']:>10.2f} {'-':>10} {'new':>8} {result['statements']:>6} {'-':>6}")
+            continue
+        change = result["p50_ms"] / before["p50_ms"] - 1 if before["p50_ms"] else 0.0
+        slower = change > max_regression and result["p50_ms"] - before["p50_ms"] >= min_delta_ms
+        chattier = result["statements"] > before["statements"]
+        flag = "  <-- regression" if slower or chattier else ""
+        print(
+            f"{name:<78} {result['p50_ms']:>10.2f} {before['p50_ms']:>10.2f} {change:>+8.0%} "
+            f"{result['statements']:>6} {before['statements']:>6}{flag}"
+        )
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def run(iterations: int, warmup: int) -> Dict:
+    targets = pick_targets()
+    recorder = StatementRecorder([engine] + [replica.engine for replica in replicas])
+    app.main.app.dependency_overrides[get_worldid_service] = lambda: AcceptingVerifier()
+
+    report = {
+        "database": engine.dialect.name,
+        "iterations": iterations,
+        "targets": {name: {"event_id": t["event_id"], "participants": t["participants"]} for name, t in targets.items()},
+        "routes": {},
+    }
+    with TestClient(app.main.app) as client:
+        routes = global_routes(targets)
+        for scale, target in targets.items():
+            routes.update({f"{name} [{scale}]": request for name, request in event_routes(target).items()})
+        for name, request in routes.items():
+            result = measure(client, recorder, request, iterations, warmup)
+            if result is None:
+                continue
+            report["routes"][name] = result
+            print(
+                f"{name:<78} p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+                f"db {result['db_p50_ms']:>9.2f}ms  {result['statements']:>4} stmts  {result['status']}"
+            )
+    app.main.app.dependency_overrides.pop(get_worldid_service, None)
+    remove_created_events()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--baseline", help="report of an earlier run to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed p50 slowdown (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    report = run(args.iterations, args.warmup)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(report, baseline, args.max_regression, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} route(s) regressed")
+            sys.exit(1)
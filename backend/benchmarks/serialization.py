@@ -0,0 +1,144 @@
+"""
+Benchmark the organizer claims list response path
+
+Loads an event with N claims into a scratch database, then compares:
+
+  orm:  ORM objects + lazy participant loads + jsonable_encoder + json.dumps
+        (the previous /events/{id}/claims path)
+  rows: one column-tuple query + orjson (the current path)
+
+and the response size uncompressed, gzip'd and brotli'd (when installed).
+CPU is process time, so waiting on the database is not counted.
+
+Usage:
+    python -m benchmarks.serialization --rows 10000
+    python -m benchmarks.serialization --database-url postgresql://...   # disposable database
+"""
+import argparse
+import json
+import time
+import orjson
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config.database import Base
+from app.middleware.compression import brotli, compress
+from app.models import Organizer, Event, Reward, Participant, Claim
+from app.models.claim import ClaimStatus
+from app.models.reward import RewardType
+
+
+def setup_fixture(db, rows: int) -> int:
+    organizer = Organizer(email="bench-serialization@example.com", hashed_password="-", name="bench")
+    db.add(organizer)
+    db.flush()
+    event = Event(organizer_id=organizer.id, name="serialization bench")
+    db.add(event)
+    db.flush()
+    reward = Reward(event_id=event.id, reward_type=RewardType.ERC20, token_address="0x" + "00" * 20, amount=1)
+    db.add(reward)
+    db.flush()
+    db.execute(Participant.__table__.insert(), [
+        {"world_id_hash": f"bench-{i}", "wallet_address": f"0x{i:040x}"}
+        for i in range(rows)
+    ])
+    participant_ids = [participant_id for (participant_id,) in db.query(Participant.id)]
+    statuses = list(ClaimStatus)
+    db.execute(Claim.__table__.insert(), [
+        {
+            "event_id": event.id,
+            "participant_id": participant_id,
+            "reward_id": reward.id,
+            "status": statuses[i % len(statuses)],
+            "transaction_hash": f"0x{i:064x}",
+        }
+        for i, participant_id in enumerate(participant_ids)
+    ])
+    db.commit()
+    return event.id
+
+
+def orm_path(db, event_id: int) -> bytes:
+    claims = db.query(Claim).filter(Claim.event_id == event_id).all()
+    content = {
+        "event_id": event_id,
+        "claims": [
+            {
+                "id": claim.id,
+                "participant_id": claim.participant_id,
+                "wallet_address": claim.participant.wallet_address,
+                "reward_id": claim.reward_id,
+                "status": claim.status,
+                "transaction_hash": claim.transaction_hash,
+                "created_at": claim.created_at
+            }
+            for claim in claims
+        ],
+        "count": len(claims)
+    }
+    # What JSONResponse does with a returned dict
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def rows_path(db, event_id: int) -> bytes:
+    claims = [
+        row._asdict() for row in db.query(
+            Claim.id,
+            Claim.participant_id,
+            Participant.wallet_address,
+            Claim.reward_id,
+            Claim.status,
+            Claim.transaction_hash,
+            Claim.created_at
+        ).join(Participant, Participant.id == Claim.participant_id).filter(
+            Claim.event_id == event_id
+        ).order_by(Claim.id)
+    ]
+    return orjson.dumps({"event_id": event_id, "claims": claims, "count": len(claims)})
+
+
+def measure(session_factory, path, event_id: int, repeat: int):
+    cpu, wall = [], []
+    body = b""
+    for _ in range(repeat):
+        db = session_factory()
+        try:
+            started_cpu, started_wall = time.process_time(), time.perf_counter()
+            body = path(db, event_id)
+            cpu.append(time.process_time() - started_cpu)
+            wall.append(time.perf_counter() - started_wall)
+        finally:
+            db.close()
+    return min(cpu), min(wall), body
+
+
+def run(database_url: str, rows: int, repeat: int) -> None:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    try:
+        event_id = setup_fixture(db, rows)
+    finally:
+        db.close()
+
+    print(f"rows: {rows}  (best of {repeat})")
+    print(f"{'path':<6}{'cpu ms':>10}{'wall ms':>10}{'bytes':>12}{'gzip':>10}{'br':>10}")
+    for name, path in (("orm", orm_path), ("rows", rows_path)):
+        cpu, wall, body = measure(session_factory, path, event_id, repeat)
+        gzipped = len(compress(body, "gzip"))
+        brotlied = len(compress(body, "br")) if brotli is not None else "-"
+        print(f"{name:<6}{cpu * 1000:>10.1f}{wall * 1000:>10.1f}{len(body):>12}{gzipped:>10}{brotlied:>10}")
+
+    started = time.process_time()
+    compress(body, "gzip")
+    print(f"gzip cpu for the rows body: {(time.process_time() - started) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.database_url, args.rows, args.repeat)
@@ -0,0 +1,63 @@
+import os
+import tempfile
+
+# Settings are read at import time: point the app at a throwaway database and
+# keep logs, tracing and the in-process worker out of the way. SQLite unless
+# TEST_DATABASE_URL names an (empty) PostgreSQL database; tests of queries
+# only PostgreSQL can run (LATERAL, SKIP LOCKED, interval arithmetic) are
+# skipped on SQLite.
+_database_dir = tempfile.mkdtemp(prefix="worldid-tests-")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or (
+    f"sqlite:///{os.path.join(_database_dir, 'test.db')}"
+)
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ["LOG_FILE"] = ""
+os.environ["TRACING_ENABLED"] = "false"
+os.environ["CLAIM_WORKER_ENABLED"] = "false"
+os.environ["PROFILING_ENABLED"] = "false"
+
+import pytest  # noqa: E402
+from app.config.database import Base, SessionLocal, engine  # noqa: E402
+import app.models  # noqa: E402,F401  (registers every table on Base.metadata)
+from app.models.event import Event  # noqa: E402
+from app.models.organizer import Organizer  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.models.reward import Reward, RewardType  # noqa: E402
+
+postgresql_only = pytest.mark.skipif(
+    engine.dialect.name != "postgresql", reason="needs PostgreSQL (set TEST_DATABASE_URL)"
+)
+
+
+@pytest.fixture
+def db():
+    """Session on a freshly created schema, dropped again after the test"""
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def event(db) -> Event:
+    """
+    Event 1 of organizer 1, with an ERC-20 reward (1), an ERC-721 reward (2)
+    and participants 1-3 (not joined)
+    """
+    db.add(Organizer(id=1, email="organizer@example.com", hashed_password="-", name="Organizer"))
+    db.flush()
+    event = Event(id=1, organizer_id=1, name="Event", is_active=True)
+    db.add(event)
+    db.flush()
+    db.add_all([
+        Reward(id=1, event_id=1, reward_type=RewardType.ERC20, token_address="0x" + "aa" * 20, amount=1),
+        Reward(id=2, event_id=1, reward_type=RewardType.ERC721, token_address="0x" + "bb" * 20, token_id=1),
+    ])
+    db.add_all([
+        Participant(id=i, world_id_hash=f"0xworld{i}", wallet_address="0x" + f"{i:02x}" * 20) for i in (1, 2, 3)
+    ])
+    db.commit()
+    return event
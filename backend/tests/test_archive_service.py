@@ -0,0 +1,52 @@
+import os
+from app.config.worker import WorkerSettings
+from app.models.claim import Claim, ClaimStatus
+from app.models.event import Event
+from app.models.event_participant import EventParticipant
+from app.services.archive_service import ArchiveService
+
+
+def seed(db, claim_status: ClaimStatus) -> None:
+    db.add(EventParticipant(event_id=1, participant_id=1))
+    db.add(Claim(id=1, event_id=1, participant_id=1, reward_id=1, status=claim_status))
+    db.commit()
+
+
+def settings(tmp_path) -> WorkerSettings:
+    return WorkerSettings(ARCHIVE_DIR=str(tmp_path), EVENT_DELETE_CHUNK_SIZE=10)
+
+
+def test_a_finished_event_is_exported_and_removed(db, event, tmp_path):
+    seed(db, ClaimStatus.COMPLETED)
+    assert ArchiveService.archive_event(db, 1, settings(tmp_path))
+    assert os.path.exists(ArchiveService.archive_path(1, "claims", settings(tmp_path)))
+    assert db.query(Claim).count() == 0
+    event = db.query(Event).one()
+    assert event.archived_at is not None
+    assert event.is_active is False
+
+
+def test_an_event_with_claims_in_flight_is_left_open(db, event, tmp_path):
+    seed(db, ClaimStatus.PENDING)
+    assert not ArchiveService.archive_event(db, 1, settings(tmp_path))
+    assert db.query(Event).one().is_active is True
+    assert db.query(Claim).count() == 1
+
+
+def test_a_claim_queued_during_the_export_is_not_deleted(db, event, tmp_path, monkeypatch):
+    seed(db, ClaimStatus.COMPLETED)
+    write_archive = ArchiveService.write_archive
+
+    def write_and_race(session, event_id, table, worker_settings):
+        path = write_archive(session, event_id, table, worker_settings)
+        if table == "participants":
+            # A claim request that read the event before it was closed commits now
+            db.add(Claim(id=2, event_id=1, participant_id=1, reward_id=2, status=ClaimStatus.PENDING))
+            db.commit()
+        return path
+
+    monkeypatch.setattr(ArchiveService, "write_archive", staticmethod(write_and_race))
+    assert not ArchiveService.archive_event(db, 1, settings(tmp_path))
+    assert db.query(Claim).count() == 2
+    # The next pass exports again instead of trusting files that miss the claim
+    assert not os.path.exists(ArchiveService.archive_path(1, "claims", settings(tmp_path)))
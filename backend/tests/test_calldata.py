@@ -0,0 +1,60 @@
+import pytest
+from eth_abi import encode
+from app.services.calldata import (
+    ERC20_TRANSFER_SELECTOR,
+    ERC721_SAFE_TRANSFER_SELECTOR,
+    ERC1155_SAFE_TRANSFER_SELECTOR,
+    MAX_UINT256,
+    address_to_int,
+    encode_erc20_transfer,
+    encode_erc721_transfer,
+    encode_erc1155_transfer,
+)
+
+SENDER = "0x" + "ab" * 20
+RECIPIENT = "0x52908400098527886E0F7030069857D2E4169EE7"
+
+
+def abi_calldata(selector: bytes, types, values) -> str:
+    return "0x" + (selector + encode(types, values)).hex()
+
+
+def test_erc20_transfer_matches_abi_encoding():
+    assert encode_erc20_transfer(RECIPIENT, 10 ** 18) == abi_calldata(
+        ERC20_TRANSFER_SELECTOR, ["address", "uint256"], [RECIPIENT, 10 ** 18]
+    )
+
+
+def test_erc721_transfer_matches_abi_encoding():
+    assert encode_erc721_transfer(SENDER, RECIPIENT, 42) == abi_calldata(
+        ERC721_SAFE_TRANSFER_SELECTOR, ["address", "address", "uint256"], [SENDER, RECIPIENT, 42]
+    )
+
+
+def test_erc1155_transfer_matches_abi_encoding_with_empty_data():
+    assert encode_erc1155_transfer(SENDER, RECIPIENT, 7, 3) == abi_calldata(
+        ERC1155_SAFE_TRANSFER_SELECTOR,
+        ["address", "address", "uint256", "uint256", "bytes"],
+        [SENDER, RECIPIENT, 7, 3, b""]
+    )
+
+
+def test_templates_are_not_mutated_between_renders():
+    first = encode_erc721_transfer(SENDER, RECIPIENT, 1)
+    encode_erc721_transfer(SENDER, "0x" + "11" * 20, MAX_UINT256)
+    assert encode_erc721_transfer(SENDER, RECIPIENT, 1) == first
+
+
+def test_uint256_bounds():
+    assert encode_erc20_transfer(RECIPIENT, MAX_UINT256).endswith("f" * 64)
+    with pytest.raises(ValueError):
+        encode_erc20_transfer(RECIPIENT, MAX_UINT256 + 1)
+    with pytest.raises(ValueError):
+        encode_erc20_transfer(RECIPIENT, -1)
+
+
+def test_address_validation():
+    assert address_to_int("0x" + "00" * 19 + "01") == 1
+    assert address_to_int("ff" * 20) == 2 ** 160 - 1
+    with pytest.raises(ValueError):
+        address_to_int("0x1234")
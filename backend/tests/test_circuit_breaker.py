@@ -0,0 +1,127 @@
+import pytest
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+def breaker(**overrides) -> CircuitBreaker:
+    options = dict(
+        window_size=4, minimum_calls=4, failure_rate=0.5, slow_call_rate=0.75, open_seconds=10, half_open_calls=2
+    )
+    options.update(overrides)
+    return CircuitBreaker("test", slow_call_seconds=1.0, **options)
+
+
+def fail():
+    raise OSError("connection refused")
+
+
+def call_and_fail(cb: CircuitBreaker) -> None:
+    with pytest.raises(OSError):
+        cb.call(fail)
+
+
+def test_stays_closed_until_the_window_holds_minimum_calls(clock):
+    cb = breaker()
+    for _ in range(3):
+        call_and_fail(cb)
+    assert cb.state == CLOSED
+
+
+def test_opens_at_the_failure_rate_and_rejects_calls(clock):
+    cb = breaker()
+    cb.call(lambda: None)
+    cb.call(lambda: None)
+    call_and_fail(cb)
+    call_and_fail(cb)
+    assert cb.state == OPEN
+
+    calls = []
+    with pytest.raises(CircuitOpenError) as rejected:
+        cb.call(calls.append, 1)
+    assert calls == []
+    assert rejected.value.retry_after == pytest.approx(10)
+    clock.now += 4
+    assert cb.retry_after() == pytest.approx(6)
+
+
+def test_opens_at_the_slow_call_rate():
+    cb = breaker()
+    for _ in range(3):
+        cb.record(True, 2.0)
+    cb.record(True, 0.1)
+    assert cb.state == OPEN
+
+
+def test_errors_from_a_healthy_upstream_do_not_count(clock):
+    cb = breaker()
+
+    def revert():
+        raise ValueError("execution reverted")
+
+    for _ in range(4):
+        with pytest.raises(ValueError):
+            cb.call(revert, is_failure=lambda e: isinstance(e, OSError))
+    assert cb.state == CLOSED
+
+
+def test_half_open_probes_close_the_breaker(clock):
+    cb = breaker()
+    for _ in range(4):
+        call_and_fail(cb)
+    clock.now += 10
+    assert cb.state == HALF_OPEN
+    assert cb.retry_after() == 0
+
+    cb.call(lambda: None)
+    assert cb.state == HALF_OPEN
+    cb.call(lambda: None)
+    assert cb.state == CLOSED
+
+
+def test_half_open_admits_only_the_probe_calls(clock):
+    cb = breaker()
+    for _ in range(4):
+        call_and_fail(cb)
+    clock.now += 10
+    cb.before_call()
+    cb.before_call()
+    with pytest.raises(CircuitOpenError):
+        cb.before_call()
+
+
+def test_a_failed_probe_opens_the_breaker_again(clock):
+    cb = breaker()
+    for _ in range(4):
+        call_and_fail(cb)
+    clock.now += 10
+    call_and_fail(cb)
+    assert cb.state == OPEN
+    assert cb.retry_after() == pytest.approx(10)
+
+
+def test_closing_starts_a_fresh_window(clock):
+    cb = breaker()
+    for _ in range(4):
+        call_and_fail(cb)
+    clock.now += 10
+    cb.call(lambda: None)
+    cb.call(lambda: None)
+    # The failures that opened it are forgotten
+    for _ in range(3):
+        call_and_fail(cb)
+    assert cb.state == CLOSED
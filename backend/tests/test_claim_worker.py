@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+from conftest import postgresql_only
+from app.config.worker import WorkerSettings
+from app.models.claim import Claim, ClaimStatus
+from app.workers.claim_worker import ClaimWorker
+
+# Leasing relies on LATERAL, SKIP LOCKED and interval arithmetic
+pytestmark = postgresql_only
+
+SETTINGS = WorkerSettings(CLAIM_LEASE_SECONDS=300, CLAIM_MAX_ATTEMPTS=3)
+
+
+def queue(db, *claim_ids: int, **columns) -> None:
+    columns.setdefault("status", ClaimStatus.PENDING)
+    for claim_id in claim_ids:
+        db.add(Claim(id=claim_id, event_id=1, participant_id=claim_id, reward_id=1, **columns))
+    db.commit()
+
+
+def claims(db) -> dict:
+    db.expire_all()
+    return {claim.id: claim for claim in db.query(Claim)}
+
+
+def test_pending_claims_are_leased_to_one_worker(db, event):
+    queue(db, 1, 2, 3)
+    worker = ClaimWorker(settings=SETTINGS)
+    assert worker.lease_batch(2) == [1, 2]
+
+    leased = claims(db)
+    for claim_id in (1, 2):
+        assert leased[claim_id].status == ClaimStatus.PROCESSING
+        assert leased[claim_id].lease_owner == worker.owner
+        assert leased[claim_id].lease_expires_at is not None
+        assert leased[claim_id].attempts == 1
+    assert leased[3].status == ClaimStatus.PENDING
+    # A second worker only gets what is left
+    assert ClaimWorker(settings=SETTINGS).lease_batch(10) == [3]
+
+
+def test_only_the_owner_renews_a_lease(db, event):
+    queue(db, 1, 2)
+    first, second = ClaimWorker(settings=SETTINGS), ClaimWorker(settings=SETTINGS)
+    assert first.lease_batch(1) == [1]
+    assert second.lease_batch(1) == [2]
+    assert first.renew_leases([1, 2]) == {1}
+    assert first.renew_leases([]) == set()
+
+
+def test_an_expired_lease_is_taken_over_by_another_worker(db, event):
+    crashed = datetime.now(timezone.utc) - timedelta(minutes=1)
+    queue(db, 1, status=ClaimStatus.PROCESSING, lease_owner="crashed", lease_expires_at=crashed, attempts=1)
+    worker = ClaimWorker(settings=SETTINGS)
+    assert worker.lease_batch(10) == [1]
+
+    claim = claims(db)[1]
+    assert claim.lease_owner == worker.owner
+    assert claim.attempts == 2
+    # Should the first worker come back, it has lost the claim and must not send it
+    returning = ClaimWorker(settings=SETTINGS)
+    returning.owner = "crashed"
+    assert returning.renew_leases([1]) == set()
+
+
+def test_a_claim_that_kept_expiring_is_failed(db, event):
+    crashed = datetime.now(timezone.utc) - timedelta(minutes=1)
+    queue(db, 1, status=ClaimStatus.PROCESSING, lease_owner="crashed", lease_expires_at=crashed, attempts=3)
+    assert ClaimWorker(settings=SETTINGS).lease_batch(10) == []
+
+    claim = claims(db)[1]
+    assert claim.status == ClaimStatus.FAILED
+    assert claim.lease_owner is None
+    assert claim.error_message == "Claim processing did not finish"
@@ -0,0 +1,99 @@
+import gzip
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, choose_encoding, parse_accept_encoding
+
+LARGE = "x" * 4096
+
+
+class FakeBrotli:
+    @staticmethod
+    def compress(body: bytes, quality: int) -> bytes:
+        return b"br:" + body
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", FakeBrotli)
+
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+
+def test_parse_accept_encoding_orders_by_q():
+    assert parse_accept_encoding("gzip;q=0.5, br, identity;q=0, deflate;q=bad") == [
+        ("br", 1.0), ("gzip", 0.5), ("identity", 0.0), ("deflate", 0.0)
+    ]
+    assert parse_accept_encoding(None) == []
+
+
+def test_brotli_wins_ties_when_available(with_brotli):
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("*") == "br"
+    assert choose_encoding("br;q=0.5, gzip") == "gzip"
+
+
+def test_only_gzip_without_brotli(without_brotli):
+    assert choose_encoding("br, gzip;q=0.1") == "gzip"
+    assert choose_encoding("br") is None
+    assert choose_encoding("*") == "gzip"
+
+
+def test_refused_and_unknown_codings(without_brotli):
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("deflate, identity") is None
+    assert choose_encoding("") is None
+
+
+def make_client() -> TestClient:
+    async def large(request):
+        return PlainTextResponse(LARGE)
+
+    async def small(request):
+        return PlainTextResponse("ok")
+
+    async def events(request):
+        async def stream():
+            yield "data: " + LARGE + "\n\n"
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    app = Starlette(routes=[Route("/large", large), Route("/small", small), Route("/events", events)])
+    return TestClient(CompressionMiddleware(app, minimum_size=1024))
+
+
+def test_large_bodies_are_compressed(without_brotli):
+    response = make_client().get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == LARGE
+
+
+def test_negotiated_brotli_is_used(with_brotli):
+    response = make_client().get("/large", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["content-length"] == str(len(b"br:" + LARGE.encode()))
+
+
+def test_small_bodies_are_sent_as_is(without_brotli):
+    response = make_client().get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == "ok"
+
+
+def test_event_streams_pass_through(without_brotli):
+    response = make_client().get("/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert LARGE in response.text
+
+
+def test_no_accept_encoding_means_no_compression(without_brotli):
+    response = make_client().get("/large", headers={"Accept-Encoding": ""})
+    assert "content-encoding" not in response.headers
+    assert gzip.decompress(gzip.compress(b"")) == b""
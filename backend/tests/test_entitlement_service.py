@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+from app.models.claim import Claim, ClaimStatus
+from app.models.event import Event
+from app.models.event_participant import EventParticipant
+from app.services.entitlement_service import EntitlementService
+
+
+def join(db, *participant_ids: int) -> None:
+    db.add_all([EventParticipant(event_id=1, participant_id=participant_id) for participant_id in participant_ids])
+    db.commit()
+
+
+def statuses(db) -> dict:
+    db.expire_all()
+    return {(claim.participant_id, claim.reward_id): claim.status for claim in db.query(Claim)}
+
+
+def test_the_snapshot_entitles_every_joined_participant_to_every_reward(db, event):
+    join(db, 1, 2)
+    assert EntitlementService.snapshot_event(db, 1) == 4
+    assert statuses(db) == {
+        (participant_id, reward_id): ClaimStatus.ENTITLED for participant_id in (1, 2) for reward_id in (1, 2)
+    }
+    assert db.query(Event).one().entitlements_snapshot_at is not None
+
+
+def test_the_snapshot_can_be_rerun_and_leaves_existing_claims_alone(db, event):
+    join(db, 1)
+    db.add(Claim(event_id=1, participant_id=1, reward_id=1, status=ClaimStatus.COMPLETED))
+    db.commit()
+    assert EntitlementService.snapshot_event(db, 1) == 1
+
+    join(db, 2)
+    assert EntitlementService.snapshot_event(db, 1) == 2
+    assert statuses(db)[(1, 1)] == ClaimStatus.COMPLETED
+    assert len(statuses(db)) == 4
+
+
+def test_claiming_queues_only_the_participants_own_entitlements(db, event):
+    join(db, 1, 2)
+    EntitlementService.snapshot_event(db, 1)
+
+    claims = EntitlementService.claim(db, 1, "0xworld1", "0x" + "01" * 20)
+    db.commit()
+    assert sorted(claim.reward_id for claim in claims) == [1, 2]
+    assert statuses(db) == {
+        (1, 1): ClaimStatus.PENDING,
+        (1, 2): ClaimStatus.PENDING,
+        (2, 1): ClaimStatus.ENTITLED,
+        (2, 2): ClaimStatus.ENTITLED,
+    }
+    # Nothing left to claim a second time
+    assert EntitlementService.claim(db, 1, "0xworld1") == []
+
+
+def test_claiming_with_someone_elses_wallet_claims_nothing(db, event):
+    join(db, 1)
+    EntitlementService.snapshot_event(db, 1)
+    assert EntitlementService.claim(db, 1, "0xworld1", "0x" + "02" * 20) == []
+    assert set(statuses(db).values()) == {ClaimStatus.ENTITLED}
+
+
+def test_dispatch_queues_every_entitlement_of_the_event(db, event):
+    join(db, 1, 2, 3)
+    EntitlementService.snapshot_event(db, 1)
+    EntitlementService.claim(db, 1, "0xworld3")
+    assert EntitlementService.dispatch(db, 1) == 4
+    db.commit()
+    assert set(statuses(db).values()) == {ClaimStatus.PENDING}
+
+
+def test_only_ended_events_are_snapshotted_by_the_background_pass(db, event):
+    join(db, 1)
+    assert EntitlementService.snapshot_due_events(db) == []
+
+    db.query(Event).update({Event.end_date: datetime.now(timezone.utc) - timedelta(hours=1)})
+    db.commit()
+    assert EntitlementService.snapshot_due_events(db) == [1]
+    assert EntitlementService.snapshot_due_events(db) == []
@@ -0,0 +1,59 @@
+import threading
+from app.config.database import SessionLocal
+from app.services.inventory_service import InventoryService
+
+# The ERC-721 reward of the event fixture
+REWARD_ID = 2
+
+
+def stock(db, count: int) -> None:
+    InventoryService.load_range(db, REWARD_ID, 100, 100 + count - 1)
+    db.commit()
+
+
+def test_reserve_hands_out_free_ids_until_exhausted(db, event):
+    stock(db, 2)
+    assert InventoryService.reserve(db, REWARD_ID, claim_id=1) == 100
+    assert InventoryService.reserve(db, REWARD_ID, claim_id=2) == 101
+    assert InventoryService.reserve(db, REWARD_ID, claim_id=3) is None
+    assert InventoryService.available_count(db, REWARD_ID) == 0
+
+
+def test_reserve_is_idempotent_per_claim(db, event):
+    stock(db, 3)
+    first = InventoryService.reserve(db, REWARD_ID, claim_id=7)
+    assert InventoryService.reserve(db, REWARD_ID, claim_id=7) == first
+    assert InventoryService.available_count(db, REWARD_ID) == 2
+
+
+def test_released_ids_go_back_to_the_pool(db, event):
+    stock(db, 1)
+    token_id = InventoryService.reserve(db, REWARD_ID, claim_id=1)
+    InventoryService.release(db, claim_id=1)
+    assert InventoryService.reserve(db, REWARD_ID, claim_id=2) == token_id
+
+
+def test_concurrent_reservers_get_distinct_ids(db, event):
+    stock(db, 5)
+    claims = range(1, 9)
+    results = {}
+    start = threading.Barrier(len(claims))
+
+    def reserve(claim_id: int) -> None:
+        session = SessionLocal()
+        try:
+            start.wait()
+            results[claim_id] = InventoryService.reserve(session, REWARD_ID, claim_id)
+            session.commit()
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=reserve, args=(claim_id,)) for claim_id in claims]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reserved = [token_id for token_id in results.values() if token_id is not None]
+    assert sorted(reserved) == [100, 101, 102, 103, 104]
+    assert list(results.values()).count(None) == 3
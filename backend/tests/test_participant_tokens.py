@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+from jose import jwt
+from app.middleware import auth
+from app.middleware.auth import (
+    create_participant_token,
+    purge_used_participant_tokens,
+    redeem_participant_token,
+    verify_participant_token,
+)
+
+WORLD_ID_HASH = "0xabc"
+WALLET = "0x0000000000000000000000000000000000000001"
+
+
+def test_token_round_trip():
+    session = verify_participant_token(create_participant_token(WORLD_ID_HASH, WALLET, 5), 5)
+    assert session["world_id_hash"] == WORLD_ID_HASH
+    assert session["wallet_address"] == WALLET
+    assert session["jti"]
+    assert session["expires_at"].tzinfo is not None
+
+
+def test_token_is_bound_to_its_event():
+    assert verify_participant_token(create_participant_token(WORLD_ID_HASH, WALLET, 5), 6) is None
+
+
+def test_organizer_tokens_are_not_participant_tokens():
+    token = auth.create_access_token({"sub": "organizer@example.com", "event_id": 5})
+    assert verify_participant_token(token, 5) is None
+
+
+def test_expired_and_tampered_tokens_are_rejected():
+    expired = jwt.encode(
+        {
+            "sub": WORLD_ID_HASH,
+            "wallet": WALLET,
+            "event_id": 5,
+            "typ": auth.PARTICIPANT_TOKEN_TYPE,
+            "jti": "old",
+            "exp": datetime.utcnow() - timedelta(seconds=1),
+        },
+        auth.SECRET_KEY,
+        algorithm=auth.ALGORITHM
+    )
+    assert verify_participant_token(expired, 5) is None
+    assert verify_participant_token(create_participant_token(WORLD_ID_HASH, WALLET, 5) + "x", 5) is None
+
+
+def test_a_token_is_redeemed_once(db):
+    session = verify_participant_token(create_participant_token(WORLD_ID_HASH, WALLET, 5), 5)
+    assert redeem_participant_token(db, session) is True
+    db.commit()
+    assert redeem_participant_token(db, session) is False
+
+
+def test_reuse_is_allowed_when_tokens_are_not_single_use(db, monkeypatch):
+    monkeypatch.setattr(auth, "PARTICIPANT_TOKEN_SINGLE_USE", False)
+    session = verify_participant_token(create_participant_token(WORLD_ID_HASH, WALLET, 5), 5)
+    assert redeem_participant_token(db, session) is True
+    assert redeem_participant_token(db, session) is True
+
+
+def test_expired_redemptions_are_purged(db):
+    session = verify_participant_token(create_participant_token(WORLD_ID_HASH, WALLET, 5), 5)
+    redeem_participant_token(db, dict(session, expires_at=datetime.utcnow() - timedelta(days=1)))
+    db.commit()
+    assert purge_used_participant_tokens(db) == 1
+    assert redeem_participant_token(db, session) is True
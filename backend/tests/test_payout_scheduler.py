@@ -0,0 +1,119 @@
+import asyncio
+from types import SimpleNamespace
+from typing import List, Tuple
+import pytest
+from app.config.worker import WorkerSettings
+from app.services import payout_scheduler
+from app.services.payout_scheduler import PayoutScheduler, parse_organizer_values
+
+
+class Clock:
+    """Frozen stand-in for the scheduler's time.monotonic; the event loop keeps the real clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def scheduler(**overrides) -> PayoutScheduler:
+    settings = dict(PAYOUT_SEND_CONCURRENCY=1, PAYOUT_ORGANIZER_RATE=0, PAYOUT_ORGANIZER_RATES="", PAYOUT_ORGANIZER_WEIGHTS="")
+    settings.update(overrides)
+    return PayoutScheduler(WorkerSettings(**settings))
+
+
+async def dispatch_order(scheduler: PayoutScheduler, claims: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Queue every (organizer, event) claim behind a held slot, then release and record the send order"""
+    order = []
+    await scheduler.acquire(0, 0)
+
+    async def send(organizer_id: int, event_id: int):
+        async with scheduler.slot(organizer_id, event_id):
+            order.append((organizer_id, event_id))
+
+    tasks = [asyncio.create_task(send(*claim)) for claim in claims]
+    await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_parse_organizer_values():
+    assert parse_organizer_values("12:4, 40:0.5,") == {12: 4.0, 40: 0.5}
+    assert parse_organizer_values("") == {}
+
+
+def test_organizers_share_slots_in_proportion_to_their_weights():
+    claims = [(1, 10)] * 6 + [(2, 20)] * 6
+    order = asyncio.run(dispatch_order(scheduler(PAYOUT_ORGANIZER_WEIGHTS="1:2"), claims))
+    first_six = [organizer_id for organizer_id, _ in order[:6]]
+    assert first_six.count(1) == 4
+    assert first_six.count(2) == 2
+
+
+def test_a_large_backlog_does_not_starve_a_small_organizer():
+    claims = [(1, 10)] * 20 + [(2, 20)]
+    order = asyncio.run(dispatch_order(scheduler(), claims))
+    assert order.index((2, 20)) <= 1
+
+
+def test_events_of_one_organizer_take_turns():
+    claims = [(1, 10)] * 3 + [(1, 11)] * 3
+    order = asyncio.run(dispatch_order(scheduler(), claims))
+    assert [event_id for _, event_id in order] == [10, 11, 10, 11, 10, 11]
+
+
+def test_token_bucket_caps_an_organizers_send_rate(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(payout_scheduler, "time", SimpleNamespace(monotonic=clock))
+    sched = scheduler(PAYOUT_SEND_CONCURRENCY=10, PAYOUT_ORGANIZER_RATES="1:2")
+    queue = sched._queue(1)
+
+    # A full bucket holds max(1, rate) tokens
+    assert queue.throttled_for(clock.now) == 0
+    queue.take_token()
+    queue.take_token()
+    assert queue.throttled_for(clock.now) == pytest.approx(0.5)
+    clock.now += 0.25
+    assert queue.throttled_for(clock.now) == pytest.approx(0.25)
+    clock.now += 0.25
+    assert queue.throttled_for(clock.now) == 0
+
+
+def test_throttled_organizers_wait_while_others_send(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(payout_scheduler, "time", SimpleNamespace(monotonic=clock))
+
+    async def run():
+        sched = scheduler(PAYOUT_SEND_CONCURRENCY=10, PAYOUT_ORGANIZER_RATES="1:1")
+        sent = []
+
+        async def send(organizer_id: int):
+            async with sched.slot(organizer_id, organizer_id):
+                sent.append(organizer_id)
+
+        tasks = [asyncio.create_task(send(1)) for _ in range(3)] + [asyncio.create_task(send(2)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        # Organizer 1 spent its single token; organizer 2 is uncapped
+        assert sorted(sent) == [1, 2, 2, 2]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(run())
+
+
+def test_saturated_organizers_are_reported():
+    async def run():
+        sched = scheduler(PAYOUT_MAX_QUEUED_PER_ORGANIZER=2)
+        await sched.acquire(0, 0)
+        waiters = [asyncio.create_task(sched.acquire(1, 10)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert sched.saturated_organizers() == [1]
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        assert sched.saturated_organizers() == []
+
+    asyncio.run(run())
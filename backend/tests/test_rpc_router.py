@@ -0,0 +1,110 @@
+import json
+import threading
+from app.config.blockchain import BlockchainSettings
+from app.services.rpc_router import RpcRouter
+
+SETTINGS = BlockchainSettings(
+    RPC_HEDGE_MIN_DELAY_MS=10,
+    RPC_HEDGE_MAX_DELAY_MS=50,
+    RPC_ENDPOINT_FAILURE_THRESHOLD=2,
+    RPC_ENDPOINT_COOLDOWN_SECONDS=60,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body=None):
+        self.status_code = status_code
+        self.body = body
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    """An endpoint's HTTP session answering every call with a fixed result"""
+
+    def __init__(self, result=None, status_code: int = 200, hold: threading.Event = None):
+        self.result = result
+        self.status_code = status_code
+        self.hold = hold
+        self.calls = 0
+
+    def post(self, url, data=None, json=None, headers=None, timeout=None):
+        self.calls += 1
+        if self.hold is not None:
+            self.hold.wait(5)
+        request = json if json is not None else _decode(data)
+        return FakeResponse(self.status_code, {"jsonrpc": "2.0", "id": request["id"], "result": self.result})
+
+    def close(self) -> None:
+        pass
+
+
+def _decode(data: bytes) -> dict:
+    return json.loads(data)
+
+
+def router(*sessions: FakeSession) -> RpcRouter:
+    rpc = RpcRouter([f"http://node{i}.test" for i in range(len(sessions))], SETTINGS)
+    for endpoint, session in zip(rpc.endpoints, sessions):
+        endpoint.session = session
+    return rpc
+
+
+def body(method: str, params=()) -> bytes:
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": list(params)}).encode()
+
+
+def test_a_slow_read_is_hedged_to_the_next_endpoint():
+    release = threading.Event()
+    slow, fast = FakeSession("0x1", hold=release), FakeSession("0x2")
+    rpc = router(slow, fast)
+    try:
+        assert rpc.request("eth_blockNumber", body("eth_blockNumber"))["result"] == "0x2"
+        assert slow.calls == 1 and fast.calls == 1
+    finally:
+        release.set()
+        rpc.close()
+
+
+def test_a_fast_read_is_not_hedged():
+    first, second = FakeSession("0x1"), FakeSession("0x2")
+    rpc = router(first, second)
+    try:
+        assert rpc.request("eth_chainId", body("eth_chainId"))["result"] == "0x1"
+        assert second.calls == 0
+    finally:
+        rpc.close()
+
+
+def test_a_failing_endpoint_falls_back_and_leaves_rotation():
+    down, up = FakeSession(status_code=503), FakeSession("0x2")
+    rpc = router(down, up)
+    try:
+        for _ in range(SETTINGS.RPC_ENDPOINT_FAILURE_THRESHOLD):
+            assert rpc.request("eth_gasPrice", body("eth_gasPrice"))["result"] == "0x2"
+        assert not rpc.endpoints[0].healthy()
+        assert rpc.ranked()[0] is rpc.endpoints[1]
+    finally:
+        rpc.close()
+
+
+def test_the_highest_nonce_any_endpoint_reports_wins():
+    rpc = router(FakeSession("0x5"), FakeSession("0x7"), FakeSession("0x6"))
+    try:
+        response = rpc.request("eth_getTransactionCount", body("eth_getTransactionCount", ["0xabc", "pending"]))
+        assert response["result"] == "0x7"
+    finally:
+        rpc.close()
+
+
+def test_the_highest_nonce_ignores_endpoints_that_fail():
+    rpc = router(FakeSession("0x5"), FakeSession(status_code=502), FakeSession("0x4"))
+    try:
+        response = rpc.request("eth_getTransactionCount", body("eth_getTransactionCount", ["0xabc", "pending"]))
+        assert response["result"] == "0x5"
+    finally:
+        rpc.close()
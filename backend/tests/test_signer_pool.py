@@ -0,0 +1,107 @@
+import pytest
+from app.config.blockchain import BlockchainSettings
+from app.services.signer_pool import SignerPool
+
+KEYS = ["0x" + f"{i:02x}" * 32 for i in (1, 2)]
+
+
+class PendingCount:
+    """Stands in for eth_getTransactionCount(address, "pending")"""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.reads = 0
+
+    def __call__(self) -> int:
+        self.reads += 1
+        return self.count
+
+
+def pool(**overrides) -> SignerPool:
+    settings = dict(SIGNER_STRATEGY="least_loaded", SIGNER_FAILURE_THRESHOLD=3, SIGNER_COOLDOWN_SECONDS=30)
+    settings.update(overrides)
+    return SignerPool(KEYS, BlockchainSettings(**settings))
+
+
+def test_each_lane_counts_its_own_nonces_from_one_read():
+    signers = pool()
+    chain = PendingCount(7)
+    first = signers.acquire()
+    second = signers.acquire()
+    assert first is not second
+    assert [first.reserve_nonce(chain) for _ in range(3)] == [7, 8, 9]
+    assert chain.reads == 1
+
+
+def test_least_loaded_lane_is_chosen():
+    signers = pool()
+    busy = signers.acquire()
+    assert signers.acquire() is not busy
+
+
+def test_hash_strategy_pins_a_recipient_to_a_lane():
+    signers = pool(SIGNER_STRATEGY="hash")
+    lane = signers.acquire(affinity_key="0xAbC")
+    signers.release(lane, True)
+    assert signers.acquire(affinity_key="0xabc") is lane
+
+
+def test_a_failure_while_other_sends_are_in_flight_does_not_resync():
+    signers = pool(SIGNER_FAILURE_THRESHOLD=10)
+    lane = signers.lanes[0]
+    chain = PendingCount(7)
+    for _ in range(3):
+        signers.acquire()  # two sends on lane 0, one on lane 1
+    lane.reserve_nonce(chain)  # 7
+    lane.reserve_nonce(chain)  # 8, still being broadcast
+
+    signers.release(lane, False, "timeout")
+    assert lane.next_nonce == 9
+    assert lane.resync_pending
+
+    # Once the lane is idle the nonce is re-read, filling the gap 7 left
+    signers.release(lane, True)
+    chain.count = 7
+    assert lane.reserve_nonce(chain) == 7
+    assert not lane.resync_pending
+
+
+def test_a_nonce_that_never_left_is_handed_out_again():
+    signers = pool()
+    chain = PendingCount(3)
+    lane = signers.acquire()
+    nonce = lane.reserve_nonce(chain)
+    signers.release(lane, False, "Not broadcast: lease lost", unused_nonce=nonce)
+    assert lane.reserve_nonce(chain) == 3
+    assert chain.reads == 1
+
+
+def test_an_unused_nonce_behind_later_reservations_waits_for_a_resync():
+    signers = pool()
+    chain = PendingCount(3)
+    lane = signers.lanes[0]
+    for _ in range(3):
+        signers.acquire()
+    unused = lane.reserve_nonce(chain)
+    lane.reserve_nonce(chain)
+    signers.release(lane, False, "Signing failed", unused_nonce=unused)
+    assert lane.next_nonce == 5
+    assert lane.resync_pending
+
+
+def test_repeated_failures_take_a_lane_out_of_rotation():
+    signers = pool(SIGNER_FAILURE_THRESHOLD=2)
+    lane = signers.lanes[0]
+    for _ in range(2):
+        lane.in_flight += 1
+        signers.release(lane, False, "insufficient funds")
+    assert lane.unhealthy_reason == "insufficient funds"
+    assert all(signers.acquire() is signers.lanes[1] for _ in range(3))
+
+
+@pytest.mark.parametrize("success", [True, False])
+def test_release_frees_the_lane(success):
+    signers = pool()
+    lane = signers.acquire()
+    signers.release(lane, success)
+    assert lane.in_flight == 0
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta, timezone
+from app.config.worker import WorkerSettings
+from app.models.event_rollup import EventRollup
+from app.services.stats_service import StatsService, bucket_start
+
+
+def rollup(granularity: str, age: timedelta) -> EventRollup:
+    moment = bucket_start(datetime.now(timezone.utc) - age, granularity)
+    return EventRollup(event_id=1, granularity=granularity, bucket_start=moment, shard=0, joins=1)
+
+
+def test_old_minute_buckets_are_pruned_and_hour_buckets_kept(db, event):
+    db.add_all([
+        rollup("minute", timedelta(days=8)),
+        rollup("minute", timedelta(minutes=5)),
+        rollup("hour", timedelta(days=8)),
+    ])
+    db.commit()
+
+    assert StatsService.prune_minute_rollups(db, WorkerSettings(ROLLUP_MINUTE_RETENTION_DAYS=7)) == 1
+    remaining = sorted((row.granularity, row.joins) for row in db.query(EventRollup))
+    assert remaining == [("hour", 1), ("minute", 1)]
+
+
+def test_recorded_activity_lands_in_both_granularities(db, event):
+    StatsService.record_join(db, 1)
+    db.commit()
+    assert sorted(row.granularity for row in db.query(EventRollup)) == ["hour", "minute"]
+    assert StatsService.prune_minute_rollups(db, WorkerSettings(ROLLUP_MINUTE_RETENTION_DAYS=7)) == 0
@@ -0,0 +1,103 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from eth_abi import encode
+from web3.exceptions import ContractLogicError
+from app.models.reward import RewardType
+from app.services.token_registry import DEFAULT_DECIMALS, TokenMetadata, TokenRegistry
+from app.workers.claim_worker import ClaimWorker
+
+TOKEN = "0x" + "12" * 20
+RECIPIENT = "0x" + "34" * 20
+
+
+class FakeWeb3:
+    """Answers eth_call with a queued list of results; an Exception is raised instead of returned"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+        self.eth = SimpleNamespace(call=self._call)
+
+    @staticmethod
+    def to_checksum_address(address: str) -> str:
+        return address
+
+    def _call(self, transaction):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def aggregate3(*results) -> bytes:
+    return encode(["(bool,bytes)[]"], [list(results)])
+
+
+def uint8(value: int):
+    return True, encode(["uint8"], [value])
+
+
+NOT_ERC165 = (False, b"")
+
+
+def test_decimals_are_read_and_cached():
+    w3 = FakeWeb3(aggregate3(uint8(6), NOT_ERC165, NOT_ERC165))
+    registry = TokenRegistry()
+    assert registry.get(w3, TOKEN).to_base_units("1.5") == 1_500_000
+    assert registry.get(w3, TOKEN).decimals == 6
+    assert w3.calls == 1
+
+
+def test_a_reverting_decimals_falls_back_to_the_default_and_is_cached():
+    w3 = FakeWeb3(aggregate3((False, b""), NOT_ERC165, NOT_ERC165))
+    registry = TokenRegistry()
+    assert registry.get(w3, TOKEN).decimals == DEFAULT_DECIMALS
+    registry.get(w3, TOKEN)
+    assert w3.calls == 1
+
+
+def test_a_failed_rpc_call_leaves_decimals_unknown_and_uncached():
+    outage = ConnectionError("connection reset")
+    # Multicall3 fails, then each of the three individual probes
+    w3 = FakeWeb3(outage, outage, outage, outage, aggregate3(uint8(6), NOT_ERC165, NOT_ERC165))
+    registry = TokenRegistry()
+    metadata = registry.get(w3, TOKEN)
+    assert metadata.decimals is None
+    with pytest.raises(ValueError):
+        metadata.to_base_units(1)
+    assert registry.get(w3, TOKEN).decimals == 6
+
+
+def test_individual_probes_tell_reverts_from_outages():
+    w3 = FakeWeb3(
+        ConnectionError("no multicall"),
+        ContractLogicError("execution reverted"),
+        ContractLogicError("execution reverted"),
+        ContractLogicError("execution reverted"),
+    )
+    assert TokenRegistry().get(w3, TOKEN).decimals == DEFAULT_DECIMALS
+
+
+def test_erc20_claims_with_unknown_decimals_are_deferred_without_sending(monkeypatch):
+    from app.services import token_registry
+
+    def send_erc20_token_async(*args, **kwargs):
+        raise AssertionError("sent a transfer with unknown decimals")
+
+    service = SimpleNamespace(w3=None, send_erc20_token_async=send_erc20_token_async)
+    monkeypatch.setattr(
+        token_registry.token_registry, "get", lambda w3, address: TokenMetadata(address, None, None, None)
+    )
+    job = {
+        "claim_id": 1,
+        "reward_type": RewardType.ERC20,
+        "token_address": TOKEN,
+        "wallet_address": RECIPIENT,
+        "amount": 1,
+        "token_id": None,
+    }
+    result = asyncio.run(ClaimWorker(service)._send(job))
+    assert result["success"] is False
+    assert result["retryable"] is True
@@ -0,0 +1,105 @@
+import asyncio
+from app.config.blockchain import BlockchainSettings
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.signer_pool import SignerLane
+from app.services.tx_pipeline import TransactionPipeline
+
+LANE = SignerLane(0, "0x" + "01" * 32)
+SETTINGS = BlockchainSettings(
+    TX_SIGNING_WORKERS=2,
+    TX_SIGNING_POOL="thread",
+    TX_BROADCAST_BATCH_SIZE=10,
+    TX_BROADCAST_BATCH_WAIT_MS=50,
+)
+
+
+class FakeRouter:
+    """Answers each batch with an error for the listed nonces and a hash for the rest"""
+
+    def __init__(self, rejected_nonces=()):
+        self.rejected_nonces = set(rejected_nonces)
+        self.batches = []
+        self.nonce_by_raw = {}
+
+    def broadcast_batch(self, payload):
+        self.batches.append(payload)
+        responses = []
+        for call in payload:
+            nonce = self.nonce_by_raw[call["params"][0]]
+            if nonce in self.rejected_nonces:
+                responses.append({"jsonrpc": "2.0", "id": call["id"], "error": {"message": "nonce too low"}})
+            else:
+                responses.append({"jsonrpc": "2.0", "id": call["id"], "result": "0xhash"})
+        return responses
+
+
+class OpenBreaker:
+    def call(self, func, *args, **kwargs):
+        raise CircuitOpenError("ethereum_rpc", 5)
+
+
+def transaction(nonce: int) -> dict:
+    return {"to": "0x" + "11" * 20, "data": "0x", "gas": 21000, "gasPrice": 10 ** 9, "nonce": nonce, "chainId": 1}
+
+
+def submit_all(pipeline: TransactionPipeline, transactions, on_signed=None):
+    async def run():
+        try:
+            return await asyncio.gather(*(pipeline.submit(LANE, tx, on_signed) for tx in transactions))
+        finally:
+            await pipeline.stop()
+
+    return asyncio.run(run())
+
+
+def remember_nonces(router: FakeRouter):
+    def on_signed(signed):
+        router.nonce_by_raw[signed["raw_transaction"]] = signed["nonce"]
+    return on_signed
+
+
+def test_each_transaction_gets_its_own_response_from_one_batch():
+    router = FakeRouter(rejected_nonces={1})
+    pipeline = TransactionPipeline(router, SETTINGS)
+    results = submit_all(pipeline, [transaction(n) for n in range(3)], remember_nonces(router))
+
+    assert len(router.batches) == 1
+    assert [result["success"] for result in results] == [True, False, True]
+    assert [result.get("nonce") for result in results] == [0, None, 2]
+    assert results[1]["error"] == "Transaction failed: nonce too low"
+    assert "broadcast" not in results[1]
+
+
+def test_an_open_circuit_fails_the_batch_as_retryable_and_unsent():
+    router = FakeRouter()
+    pipeline = TransactionPipeline(router, SETTINGS)
+    pipeline.breaker = OpenBreaker()
+    results = submit_all(pipeline, [transaction(n) for n in range(2)], remember_nonces(router))
+
+    assert router.batches == []
+    for result in results:
+        assert result["success"] is False
+        assert result["retryable"] is True
+        assert result["broadcast"] is False
+
+
+def test_a_transaction_that_fails_to_sign_is_never_broadcast():
+    router = FakeRouter()
+    unsignable = dict(transaction(0), gas="not a number")
+    (result,) = submit_all(TransactionPipeline(router, SETTINGS), [unsignable])
+
+    assert router.batches == []
+    assert result["success"] is False
+    assert result["error"].startswith("Signing failed")
+    assert result["broadcast"] is False
+
+
+def test_a_failing_on_signed_callback_stops_the_broadcast():
+    router = FakeRouter()
+
+    def refuse(signed):
+        raise RuntimeError("database unavailable")
+
+    (result,) = submit_all(TransactionPipeline(router, SETTINGS), [transaction(0)], refuse)
+    assert router.batches == []
+    assert result == {"success": False, "error": "Not broadcast: database unavailable", "broadcast": False}
@@ -0,0 +1,127 @@
+from types import SimpleNamespace
+from app.config.blockchain import BlockchainSettings
+from app.config.database import SessionLocal
+from app.models.claim import Claim, ClaimStatus
+from app.services.signer_pool import SignerLane
+from app.services.tx_watchdog import TransactionWatchdog
+
+GWEI = 10 ** 9
+
+
+class FakeChain:
+    """The RPC calls the watchdog makes, with a mempool that accepts every replacement"""
+
+    def __init__(self, mined_nonce: int = 0, network_gas_price: int = GWEI):
+        self.mined_nonce = mined_nonce
+        self.network_gas_price = network_gas_price
+        self.broadcast = []
+        self.receipts = {}
+        self.w3 = SimpleNamespace(eth=SimpleNamespace(
+            get_transaction_count=lambda address, block: self.mined_nonce,
+            send_raw_transaction=self._send_raw_transaction,
+        ))
+
+    def _send_raw_transaction(self, raw: bytes) -> bytes:
+        self.broadcast.append(raw)
+        return bytes([len(self.broadcast)]) * 32
+
+    def _rpc(self, method, call, *args):
+        if method == "eth_gasPrice":
+            return self.network_gas_price
+        return call(*args)
+
+    def get_transaction_receipt(self, tx_hash: str):
+        return self.receipts.get(tx_hash)
+
+
+def watchdog(**overrides) -> TransactionWatchdog:
+    settings = dict(
+        TX_WATCHDOG_ENABLED=True,
+        TX_STUCK_AFTER_SECONDS=0,
+        TX_FEE_BUMP_PERCENT=15,
+        TX_MAX_GAS_PRICE_WEI=100 * GWEI,
+        TX_MAX_REPLACEMENTS=5,
+    )
+    settings.update(overrides)
+    return TransactionWatchdog(BlockchainSettings(**settings))
+
+
+def transaction(nonce: int = 0, gas_price: int = 10 * GWEI):
+    return {"to": "0x" + "11" * 20, "data": "0x", "gas": 21000, "gasPrice": gas_price, "nonce": nonce, "chainId": 1}
+
+
+LANE = SignerLane(0, "0x" + "01" * 32)
+
+
+def test_a_stuck_transaction_is_replaced_with_a_bumped_fee():
+    chain = FakeChain()
+    dog = watchdog()
+    dog.track(chain, LANE, transaction(gas_price=10 * GWEI), "0xoriginal")
+    dog.check()
+    item = dog._in_flight[(LANE.address, 0)]
+    assert item.transaction["gasPrice"] == 10 * GWEI * 115 // 100 + 1
+    assert item.transaction["nonce"] == 0
+    assert len(item.tx_hashes) == 2
+    assert len(chain.broadcast) == 1
+
+
+def test_the_network_price_wins_when_it_is_higher_than_the_bump():
+    chain = FakeChain(network_gas_price=40 * GWEI)
+    dog = watchdog()
+    dog.track(chain, LANE, transaction(gas_price=10 * GWEI), "0xoriginal")
+    dog.check()
+    assert dog._in_flight[(LANE.address, 0)].transaction["gasPrice"] == 40 * GWEI
+
+
+def test_no_replacement_above_the_gas_price_cap():
+    chain = FakeChain()
+    dog = watchdog(TX_MAX_GAS_PRICE_WEI=11 * GWEI)
+    dog.track(chain, LANE, transaction(gas_price=10 * GWEI), "0xoriginal")
+    dog.check()
+    assert chain.broadcast == []
+    assert dog._in_flight[(LANE.address, 0)].replacements == 0
+
+
+def test_replacements_stop_at_the_limit():
+    chain = FakeChain()
+    dog = watchdog(TX_MAX_REPLACEMENTS=2)
+    dog.track(chain, LANE, transaction(), "0xoriginal")
+    for _ in range(4):
+        dog.check()
+    assert len(chain.broadcast) == 2
+
+
+def test_mined_transactions_are_forgotten():
+    chain = FakeChain(mined_nonce=1)
+    dog = watchdog()
+    dog.track(chain, LANE, transaction(nonce=0), "0xoriginal")
+    dog.check()
+    assert dog.in_flight_count() == 0
+    assert chain.broadcast == []
+
+
+def test_replacements_are_recorded_on_the_tracked_claim_only(db, event):
+    # Two claims on the same sender and nonce: 2 was re-signed after 1's nonce was reissued
+    for claim_id in (1, 2):
+        db.add(Claim(
+            id=claim_id, event_id=1, participant_id=claim_id, reward_id=1, status=ClaimStatus.PROCESSING,
+            sender_address=LANE.address, nonce=0, transaction_hash=f"0xclaim{claim_id}"
+        ))
+    db.commit()
+
+    chain = FakeChain()
+    dog = watchdog()
+    dog.track(chain, LANE, transaction(), "0xclaim1", claim_id=1)
+    dog.check()
+    replacement = dog._in_flight[(LANE.address, 0)].tx_hashes[-1]
+
+    session = SessionLocal()
+    try:
+        first, second = session.query(Claim).order_by(Claim.id).all()
+        assert first.transaction_hash == replacement
+        assert first.replaced_transaction_hashes == ["0xclaim1"]
+        assert first.gas_price == 10 * GWEI * 115 // 100 + 1
+        assert second.transaction_hash == "0xclaim2"
+        assert second.replaced_transaction_hashes is None
+    finally:
+        session.close()